@@ -1,80 +1,400 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import hashlib
+import json
 import logging
+import math
+import signal
 import time
 from pathlib import Path
+from typing import Any, Awaitable, Callable, Coroutine, Iterable
 
 import discord
 from discord import app_commands
 
-from discord_crypto_spam_destroyer.config import ResolvedSettings, Settings, load_settings, resolve_settings
+from discord_crypto_spam_destroyer.config import (
+    ResolvedSettings,
+    Settings,
+    load_settings,
+    reload_multi_server_config,
+    resolve_settings,
+)
 from discord_crypto_spam_destroyer.models import VisionResult
 from discord_crypto_spam_destroyer.utils.image import DownloadedImage
 from discord_crypto_spam_destroyer.discord_ui.mod_report import (
+    ReportButton,
     ReportContext,
     ReportView,
     build_indicator_text,
     build_mod_files,
     build_report_embed,
+    build_report_view,
+    build_wave_text,
 )
 from discord_crypto_spam_destroyer.discord_ui.report_store import ReportRecord, ReportStore
+from discord_crypto_spam_destroyer.hashes.fingerprint import (
+    FileFingerprintStore,
+    attachment_fingerprint,
+    match_fingerprints,
+)
 from discord_crypto_spam_destroyer.hashes.phash import compute_phashes
 from discord_crypto_spam_destroyer.hashes.store import FileHashStore, match_hashes
 from discord_crypto_spam_destroyer.moderation.actions import apply_high_action, safe_delete
-from discord_crypto_spam_destroyer.moderation.decision import decision_from_result
+from discord_crypto_spam_destroyer.moderation.cleanup import bulk_delete_recent
+from discord_crypto_spam_destroyer.moderation.scheduler import ActionScheduler
+from discord_crypto_spam_destroyer.moderation.decision import (
+    Verdict,
+    decision_from_result,
+    merge_vision_results,
+)
 from discord_crypto_spam_destroyer.moderation.gating import select_images
-from discord_crypto_spam_destroyer.utils.image import is_image_attachment, read_attachment, to_data_url
-from discord_crypto_spam_destroyer.vision.openai_client import classify_images
+from discord_crypto_spam_destroyer.pipeline.delay import DelayScheduler
+from discord_crypto_spam_destroyer.pipeline.queue import FairWorkQueue
+from discord_crypto_spam_destroyer.pipeline.recent import RecentMessageIndex
+from discord_crypto_spam_destroyer.pipeline.waves import (
+    SpamWave,
+    WaveAggregator,
+    attachment_signature,
+)
+from discord_crypto_spam_destroyer.telemetry.metrics import (
+    API_ERRORS,
+    BREAKER_OPEN,
+    CACHE_LOOKUPS,
+    DOWNLOAD_SECONDS,
+    HASH_HITS,
+    PREPARE_SECONDS,
+    QUEUE,
+    REGISTRY,
+    REPORT_SECONDS,
+    VERDICTS,
+    VISION_SECONDS,
+    VISION_TOKENS,
+    JSON_CONTENT_TYPE,
+    MetricsServer,
+)
+from discord_crypto_spam_destroyer.telemetry.health import LoopMonitor
+from discord_crypto_spam_destroyer.telemetry.tracing import Tracer, span
+from discord_crypto_spam_destroyer.utils.image import (
+    EncodedImage,
+    ImageEncoderOptions,
+    PreparedBatch,
+    decode_batch,
+    encode_batch,
+    is_image_attachment,
+)
+from discord_crypto_spam_destroyer.utils.files import atomic_write_text
+from discord_crypto_spam_destroyer.utils.download import AttachmentDownloader, rendition_size
+from discord_crypto_spam_destroyer.utils.guild_cache import GuildMetadataCache, MemberCache
+from discord_crypto_spam_destroyer.vision.backends import (
+    VisionBackend,
+    build_vision_backend,
+    vision_backend_key,
+)
+from discord_crypto_spam_destroyer.vision.breaker import CircuitBreaker
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("discord_crypto_spam_destroyer")
 
+# Hashing gets its own budget so a slow encode never costs the known-bad hash check.
+HASH_TIMEOUT_S = 2.0
+ENCODE_TIMEOUT_S = 4.0
+# Vision backends dropped by a config reload may still be serving calls; close them later.
+VISION_BACKEND_CLOSE_DELAY_S = 120.0
+RESTORE_CONCURRENCY = 8
+# How often the fingerprint file is checked for entries added by other processes.
+FINGERPRINT_REFRESH_S = 5.0
 
-class CryptoSpamBot(discord.Client):
+
+def _log_task_failure(task: asyncio.Task[None]) -> None:
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        name = getattr(task.get_coro(), "__qualname__", task.get_name())
+        logger.error("Background task %s failed", name, exc_info=exc)
+
+
+class CryptoSpamBot(discord.AutoShardedClient):
     def __init__(self, settings: Settings) -> None:
         intents = discord.Intents.default()
         intents.message_content = True
         intents.guilds = True
-        super().__init__(intents=intents)
+        # Without SHARD_COUNT discord.py uses the recommended count and runs every shard here.
+        super().__init__(
+            intents=intents,
+            shard_count=settings.shard_count,
+            shard_ids=list(settings.shard_ids) if settings.shard_ids else None,
+        )
         self.settings = settings
         self.hash_store = FileHashStore(Path(settings.known_bad_hash_path))
+        self.fingerprint_store = FileFingerprintStore(Path(settings.known_bad_fingerprint_path))
+        self._fingerprints_checked_at = 0.0
         self.tree = app_commands.CommandTree(self)
         self._report_cooldown: dict[tuple[int, int], float] = {}
         self._settings_cache: dict[int, ResolvedSettings] = {}
         self._missing_mod_channel_warned: set[int] = set()
-        self.report_store = ReportStore(Path("data") / "report_store.json")
+        self._vision_backends: dict[tuple[str, str | None, str | None, str], VisionBackend] = {}
+        self._vision_breakers: dict[tuple[str, str | None, str | None, str], CircuitBreaker] = {}
+        self.report_store = ReportStore(
+            Path("data") / "report_store.sqlite3",
+            legacy_path=Path("data") / "report_store.json",
+        )
+        self.downloader = AttachmentDownloader(
+            settings.download_concurrency,
+            settings.download_budget_bytes,
+        )
+        self.work_queue = FairWorkQueue(
+            settings.queue_workers,
+            settings.queue_max_depth,
+            hash_only_depth=settings.queue_hash_only_depth,
+            max_per_guild=settings.queue_max_per_guild,
+        )
+        self.delay_scheduler = DelayScheduler()
+        self.actions = ActionScheduler(settings.action_concurrency, settings.report_concurrency)
+        self.guild_cache = GuildMetadataCache()
+        self.member_cache = MemberCache(settings.member_cache_ttl_s)
+        self.waves = WaveAggregator()
+        self.recent_messages = RecentMessageIndex()
+        self._ready_once = False
+        self._reload_lock = asyncio.Lock()
+        self._config_stamp = self._multi_server_config_stamp()
+        self._config_watch_task: asyncio.Task[None] | None = None
+        self.tracer = Tracer(settings.trace_sample_rate, settings.trace_slow_threshold_s)
+        self.loop_monitor = LoopMonitor(settings.loop_stall_threshold_s)
+        self._started_at = time.monotonic()
+        # Shard id -> when it disconnected; cleared once it connects or resumes.
+        self._shards_down: dict[int, float] = {}
+        self.metrics_server: MetricsServer | None = None
+        if settings.metrics_port:
+            self.metrics_server = MetricsServer(settings.metrics_host, settings.metrics_port)
+            self.metrics_server.routes["/healthz"] = self._healthz
+            self.metrics_server.routes["/readyz"] = self._readyz
+            self.metrics_server.content_types["/healthz"] = JSON_CONTENT_TYPE
+            self.metrics_server.content_types["/readyz"] = JSON_CONTENT_TYPE
+            REGISTRY.add_collector(self._collect_metrics)
+        self._background_tasks: set[asyncio.Task[None]] = set()
+
+    async def setup_hook(self) -> None:
+        # Runs once per process, after login and before the first gateway connection.
+        self.add_dynamic_items(ReportButton)
+        await self._register_commands()
+        if hasattr(signal, "SIGHUP"):
+            try:
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGHUP,
+                    lambda: self._spawn(self._reload_config_logged("SIGHUP")),
+                )
+            except (NotImplementedError, RuntimeError):
+                logger.info("SIGHUP config reload is not available on this platform")
+        if self.settings.multi_server_config_path and self.settings.config_reload_interval_s > 0:
+            self._config_watch_task = asyncio.create_task(self._watch_multi_server_config())
+        await self._load_fingerprints()
+        self.loop_monitor.start()
+        self.work_queue.start()
+        self.delay_scheduler.start()
+        self.actions.start()
+        if self.metrics_server is not None:
+            try:
+                await self.metrics_server.start()
+            except OSError:
+                logger.exception("Could not start the metrics server; continuing without it")
+                self.metrics_server = None
+
+    async def close(self) -> None:
+        if self._config_watch_task is not None:
+            self._config_watch_task.cancel()
+        await self.delay_scheduler.stop()
+        await self.work_queue.stop()
+        await self.actions.stop()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await self.loop_monitor.stop()
+        await self.downloader.aclose()
+        self.report_store.close()
+        await super().close()
+
+    def _collect_metrics(self) -> None:
+        stats = self.work_queue.stats
+        QUEUE.set(self.work_queue.depth, stat="depth")
+        QUEUE.set(stats.submitted, stat="submitted")
+        QUEUE.set(stats.processed, stat="processed")
+        QUEUE.set(stats.degraded, stat="degraded")
+        QUEUE.set(stats.dropped, stat="dropped")
+        QUEUE.set(stats.failed, stat="failed")
+        QUEUE.set(self.delay_scheduler.pending, stat="delayed")
+        QUEUE.set(self.actions.pending, stat="actions_pending")
+        for breaker in self._vision_breakers.values():
+            BREAKER_OPEN.set(int(breaker.state != "closed"), breaker=breaker.name)
+
+    def _health_snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "gateway": {
+                "ready": self.is_ready(),
+                "latency_s": round(self.latency, 3) if math.isfinite(self.latency) else None,
+                "shards_down_s": {
+                    str(shard_id): round(now - since, 1)
+                    for shard_id, since in sorted(self._shards_down.items())
+                },
+            },
+            "loop": {
+                "lag_s": round(self.loop_monitor.lag_s, 4),
+                "max_lag_s": round(self.loop_monitor.max_lag_s, 4),
+                "stalls": self.loop_monitor.stalls,
+            },
+            "queue": {
+                "depth": self.work_queue.depth,
+                "oldest_wait_s": round(self.work_queue.oldest_wait_s(), 1),
+                "delayed": self.delay_scheduler.pending,
+                "actions_pending": self.actions.pending,
+            },
+            "breakers": {
+                breaker.name: breaker.state for breaker in self._vision_breakers.values()
+            },
+        }
+
+    def _health_problems(self) -> list[str]:
+        timeout = self.settings.health_stall_timeout_s
+        problems: list[str] = []
+        if self.is_closed():
+            problems.append("client is closed")
+        if timeout <= 0:
+            return problems
+        now = time.monotonic()
+        if not self.is_ready() and now - self._started_at > timeout:
+            problems.append(f"gateway not ready after {timeout:.0f}s")
+        for shard_id, since in sorted(self._shards_down.items()):
+            if now - since > timeout:
+                problems.append(f"shard {shard_id} disconnected for {now - since:.0f}s")
+        if self.work_queue.oldest_wait_s() > timeout:
+            problems.append(f"queued work not picked up for {timeout:.0f}s")
+        return problems
+
+    async def _healthz(self) -> tuple[int, str]:
+        # Liveness: an answer means the loop is running; a wedged loop times the probe out.
+        problems = self._health_problems()
+        snapshot = self._health_snapshot()
+        snapshot["status"] = "unhealthy" if problems else "ok"
+        snapshot["problems"] = problems
+        return (503 if problems else 200), json.dumps(snapshot)
+
+    async def _readyz(self) -> tuple[int, str]:
+        ready = self.is_ready() and not self._shards_down and not self.is_closed()
+        snapshot = self._health_snapshot()
+        snapshot["status"] = "ready" if ready else "not_ready"
+        return (200 if ready else 503), json.dumps(snapshot)
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        task.add_done_callback(_log_task_failure)
 
     async def on_ready(self) -> None:
         logger.info("Logged in as %s", self.user)
+        # on_ready fires again after every gateway reconnect; the rest only runs the first time.
+        if self._ready_once:
+            return
+        self._ready_once = True
         await self._validate_guild_settings()
-        await self._register_commands()
-        await self._restore_persistent_views()
+        # Restoring older report views costs REST calls per report; moderation starts now.
+        self._spawn(self._restore_persistent_views())
+
+    async def on_shard_disconnect(self, shard_id: int) -> None:
+        self._shards_down.setdefault(shard_id, time.monotonic())
+
+    async def on_shard_connect(self, shard_id: int) -> None:
+        self._shards_down.pop(shard_id, None)
+
+    async def on_shard_resumed(self, shard_id: int) -> None:
+        self._shards_down.pop(shard_id, None)
 
     async def on_message(self, message: discord.Message) -> None:
         if not message.guild or message.author.bot:
             return
+        guild = message.guild
+        self.recent_messages.add(guild.id, message.author.id, message.id, message.channel.id)
 
         attachments = [a for a in message.attachments if is_image_attachment(a)]
         if not attachments:
             return
 
-        handler_start = time.monotonic()
-        if message.guild is None:
-            logger.info("Message %s missing guild before processing", message.id)
-            return
-        guild = message.guild
         settings = self._get_resolved_settings(guild.id)
 
         if settings.message_processing_delay_s > 0:
-            delay_start = time.monotonic()
-            await asyncio.sleep(settings.message_processing_delay_s)
+            self.delay_scheduler.schedule(
+                message.id,
+                settings.message_processing_delay_s,
+                functools.partial(self._after_processing_delay, message, settings),
+            )
+            return
+
+        self._enqueue_message(message, attachments, settings)
+
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
+        self.recent_messages.discard(payload.message_id)
+        if self.delay_scheduler.discard(payload.message_id):
+            logger.info("Message %s was deleted before processing", payload.message_id)
+
+    async def on_raw_bulk_message_delete(
+        self, payload: discord.RawBulkMessageDeleteEvent
+    ) -> None:
+        for message_id in payload.message_ids:
+            self.recent_messages.discard(message_id)
+            if self.delay_scheduler.discard(message_id):
+                logger.info("Message %s was deleted before processing", message_id)
+
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
+        # Cached messages are updated in place by discord.py, so the copy we hold is current.
+        # Otherwise the edit happened out of sight and the message is re-fetched when due.
+        if payload.cached_message is None:
+            self.delay_scheduler.mark_stale(payload.message_id)
+
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        self.guild_cache.invalidate(channel.guild.id)
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self.guild_cache.invalidate(channel.guild.id)
+
+    async def on_guild_channel_update(
+        self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel
+    ) -> None:
+        self.guild_cache.invalidate(after.guild.id)
+
+    async def on_guild_role_create(self, role: discord.Role) -> None:
+        self.guild_cache.invalidate(role.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role) -> None:
+        self.guild_cache.invalidate(role.guild.id)
+        self.member_cache.invalidate(role.guild.id)
+
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role) -> None:
+        self.guild_cache.invalidate(after.guild.id)
+
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild) -> None:
+        self.guild_cache.invalidate(after.id)
+
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.guild_cache.invalidate(guild.id)
+        self.member_cache.invalidate(guild.id)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        # Without the members intent this only fires for the bot's own member, whose roles
+        # decide which channels we can post fallback warnings in.
+        if self.user is not None and after.id == self.user.id:
+            self.guild_cache.invalidate(after.guild.id)
+
+    async def _after_processing_delay(
+        self,
+        message: discord.Message,
+        settings: ResolvedSettings,
+        stale: bool,
+    ) -> None:
+        if stale:
             if settings.debug_logs:
-                logger.info(
-                    "Message %s processing delay took %.2fs",
-                    message.id,
-                    time.monotonic() - delay_start,
-                )
+                logger.info("Message %s edited while uncached, re-fetching", message.id)
             try:
                 message = await message.channel.fetch_message(message.id)
             except discord.NotFound:
@@ -91,11 +411,333 @@ class CryptoSpamBot(discord.Client):
                 logger.info("Message %s missing guild after delay", message.id)
                 return
 
-            attachments = [a for a in message.attachments if is_image_attachment(a)]
-            if not attachments:
-                return
+        attachments = [a for a in message.attachments if is_image_attachment(a)]
+        if not attachments:
+            return
+        self._enqueue_message(message, attachments, settings)
 
+    def _enqueue_message(
+        self,
+        message: discord.Message,
+        attachments: list[discord.Attachment],
+        settings: ResolvedSettings,
+    ) -> None:
+        priority = False
+        if settings.fingerprint_mode != "off":
+            # Runs on the event loop for every message; the file is only read in a thread.
+            self._refresh_fingerprints()
+            if match_fingerprints(attachments, self.fingerprint_store.cached()):
+                logger.info("Message %s matched known bad attachment fingerprints", message.id)
+                if settings.fingerprint_mode == "act":
+                    self._spawn(self._act_on_fingerprint_match(message, settings))
+                    return
+                priority = True
+        if settings.wave_window_s <= 0:
+            self._submit_message(message, attachments, settings, priority=priority)
+            return
+        wave, is_leader = self.waves.join(
+            message,
+            attachment_signature(attachments),
+            settings.wave_window_s,
+        )
+        if is_leader:
+            if not self._submit_message(message, attachments, settings, wave, priority):
+                self.waves.resolve(wave, flagged=False)
+            return
+        if wave.flagged is None:
+            if settings.debug_logs:
+                logger.info(
+                    "Message %s held: repeats message %s from the same author",
+                    message.id,
+                    wave.leader.id,
+                )
+        elif wave.flagged:
+            self._spawn(self._delete_wave_follower(wave, message))
+        else:
+            self._submit_message(message, attachments, settings)
+
+    def _submit_message(
+        self,
+        message: discord.Message,
+        attachments: list[discord.Attachment],
+        settings: ResolvedSettings,
+        wave: SpamWave | None = None,
+        priority: bool = False,
+    ) -> bool:
+        guild = message.guild
+        if guild is None:
+            return False
+        if wave is None:
+            job = functools.partial(self._process_message, message, attachments, settings)
+        else:
+            job = functools.partial(self._process_wave_leader, wave, attachments, settings)
+        traced = functools.partial(self._run_traced, message, job)
+        if not self.work_queue.submit(guild.id, traced, priority):
+            logger.warning(
+                "Message %s dropped: work queue full (depth=%s, guild depth=%s)",
+                message.id,
+                self.work_queue.depth,
+                self.work_queue.guild_depth(guild.id),
+            )
+            return False
+        return True
+
+    async def _run_traced(
+        self,
+        message: discord.Message,
+        job: Callable[[bool], Awaitable[object]],
+        degraded: bool,
+    ) -> object:
+        with self.tracer.trace(
+            "message",
+            message_id=message.id,
+            guild_id=message.guild.id if message.guild else None,
+            degraded=degraded,
+        ) as root:
+            result = await job(degraded)
+            if isinstance(result, bool):
+                root.set(flagged=result)
+            return result
+
+    async def _process_wave_leader(
+        self,
+        wave: SpamWave,
+        attachments: list[discord.Attachment],
+        settings: ResolvedSettings,
+        degraded: bool,
+    ) -> None:
+        flagged = False
+        try:
+            flagged = await self._process_message(
+                wave.leader, attachments, settings, degraded, wave=wave
+            )
+        finally:
+            followers = self.waves.resolve(wave, flagged)
+            if followers:
+                logger.info(
+                    "Message %s wave %s: %s held messages",
+                    wave.leader.id,
+                    "flagged" if flagged else "clean",
+                    len(followers),
+                )
+            for follower in followers:
+                if flagged:
+                    self._spawn(self._delete_wave_follower(wave, follower))
+                else:
+                    self._submit_message(
+                        follower,
+                        [a for a in follower.attachments if is_image_attachment(a)],
+                        settings,
+                    )
+
+    async def _delete_wave_follower(self, wave: SpamWave, message: discord.Message) -> None:
+        if await self._delete_message(message):
+            wave.deleted_ids.add(message.id)
+            logger.info("Message %s deleted with wave of message %s", message.id, wave.leader.id)
+
+    async def _delete_message(self, message: discord.Message) -> bool:
+        return await self.actions.run(
+            "delete",
+            message.channel.id,
+            functools.partial(safe_delete, message),
+        )
+
+    def _refresh_fingerprints(self) -> None:
+        now = time.monotonic()
+        if now - self._fingerprints_checked_at < FINGERPRINT_REFRESH_S:
+            return
+        self._fingerprints_checked_at = now
+        self._spawn(self._load_fingerprints())
+
+    async def _load_fingerprints(self) -> None:
+        try:
+            await asyncio.to_thread(self.fingerprint_store.load)
+        except OSError:
+            logger.exception("Could not read known bad fingerprints")
+
+    async def _act_on_fingerprint_match(
+        self,
+        message: discord.Message,
+        settings: ResolvedSettings,
+    ) -> None:
+        HASH_HITS.inc(guild=message.guild.id if message.guild else 0, source="fingerprint")
+        with self.tracer.trace(
+            "message",
+            message_id=message.id,
+            guild_id=message.guild.id if message.guild else None,
+            source="fingerprint",
+        ):
+            await self._act_on_verdict(
+                message,
+                settings,
+                Verdict(
+                    label="fingerprint match",
+                    confidence=1.0,
+                    high_action_reason="Known bad crypto scam attachments",
+                    reason_override="Known bad attachment metadata (not downloaded)",
+                    allow_hash_add=False,
+                    action_suggestion="No action necessary",
+                ),
+            )
+
+    async def _act_on_verdict(
+        self,
+        message: discord.Message,
+        settings: ResolvedSettings,
+        verdict: Verdict,
+        wave: SpamWave | None = None,
+    ) -> None:
+        guild = message.guild
+        if guild is None:
+            return
+        author = message.author
+        # Deletion goes out first and never waits on the member lookup, action or report.
+        delete_task = asyncio.create_task(self._delete_message(message))
+        await asyncio.sleep(0)
+        send_report = verdict.report and self._report_allowed(guild.id, author.id, settings)
+        member = None
+        if send_report or verdict.high_action_reason is not None:
+            # Looked up once; shared by the mod check, cleanup and the report's role list.
+            member = await self._get_member(guild, author.id)
+        action_task = None
+        if verdict.high_action_reason is not None:
+            action_task = asyncio.create_task(
+                self._apply_high_action_with_mod_check(
+                    guild,
+                    author,
+                    member,
+                    confidence=verdict.confidence,
+                    reason=verdict.high_action_reason,
+                    settings=settings,
+                )
+            )
+            # Report-only guilds want mods to decide; the author's history is left alone.
+            if (
+                settings.cleanup_window_s > 0
+                and settings.action_high != "report_only"
+                and not self._is_mod(member, settings)
+            ):
+                self._spawn(self._cleanup_recent_messages(message, settings, wave))
+
+        async def resolve_outcome() -> tuple[bool, str | None]:
+            deleted = await delete_task
+            if deleted and wave is not None:
+                wave.deleted_ids.add(message.id)
+            return deleted, await action_task if action_task is not None else None
+
+        outcome = asyncio.create_task(resolve_outcome())
+
+        if send_report:
+            logger.info("Report sent (%s) for message %s", verdict.label, message.id)
+            # Report building and upload never hold the queue worker; wave reports also
+            # wait for the wave to go quiet.
+            self._spawn(
+                self._send_report(
+                    message,
+                    author,
+                    verdict,
+                    outcome,
+                    self._format_member_roles(member),
+                    wave=wave,
+                )
+            )
+        await outcome
+        if settings.debug_logs:
+            logger.info(
+                "Message %s actions done (pending=%s; %s)",
+                message.id,
+                self.actions.pending,
+                self.actions.summary(),
+            )
+
+    async def _learn_fingerprints(
+        self,
+        attachments: list[discord.Attachment],
+        prepared: PreparedBatch,
+        known_bad: set[str],
+    ) -> None:
+        # Only attachments whose own hash is known bad; a benign image posted alongside
+        # a scam must not become a match on its own.
+        bad_urls = {image.source.url for image in prepared.images if image.phash in known_bad}
+        fingerprints = [
+            fingerprint
+            for attachment in attachments
+            if attachment.url in bad_urls
+            and (fingerprint := attachment_fingerprint(attachment)) is not None
+        ]
+        if not fingerprints:
+            return
+        try:
+            await asyncio.to_thread(self.fingerprint_store.add_many, fingerprints)
+        except Exception:
+            logger.exception("Could not record fingerprints of known bad attachments")
+
+    async def _cleanup_recent_messages(
+        self,
+        message: discord.Message,
+        settings: ResolvedSettings,
+        wave: SpamWave | None,
+    ) -> None:
+        guild = message.guild
+        if guild is None:
+            return
+        # Wave members are deleted with the wave already.
+        exclude = {entry.id for entry in wave.messages} if wave else {message.id}
+        entries = self.recent_messages.recent(
+            guild.id,
+            message.author.id,
+            settings.cleanup_window_s,
+            exclude,
+        )
+        if not entries:
+            return
+        deleted = await self.actions.run(
+            "delete",
+            ("bulk", guild.id),
+            functools.partial(bulk_delete_recent, guild, entries, "Crypto scam cleanup"),
+        )
+        for entry in entries:
+            self.recent_messages.discard(entry.message_id)
+        logger.info(
+            "Message %s cleanup removed %s/%s recent messages by %s across %s channels",
+            message.id,
+            deleted,
+            len(entries),
+            message.author.id,
+            len({entry.channel_id for entry in entries}),
+        )
+
+    async def _process_message(
+        self,
+        message: discord.Message,
+        attachments: list[discord.Attachment],
+        settings: ResolvedSettings,
+        degraded: bool,
+        wave: SpamWave | None = None,
+    ) -> bool:
+        """Run the detection pipeline for one message; returns True when it was flagged."""
+        handler_start = time.monotonic()
+        guild = message.guild
+        if guild is None:
+            logger.info("Message %s missing guild before processing", message.id)
+            return False
+        if degraded:
+            logger.info(
+                "Message %s running hash-only: work queue backlog is %s",
+                message.id,
+                self.work_queue.depth,
+            )
+        hash_only = settings.hash_only_mode or degraded
         if settings.debug_logs:
+            stats = self.work_queue.stats
+            logger.info(
+                "Message %s dequeued (depth=%s, avg wait=%.2fs, max wait=%.2fs, dropped=%s)",
+                message.id,
+                self.work_queue.depth,
+                stats.wait_avg_s,
+                stats.wait_max_s,
+                stats.dropped,
+            )
             logger.info(
                 "Message %s in #%s: %s attachments (%s images)",
                 message.id,
@@ -103,17 +745,28 @@ class CryptoSpamBot(discord.Client):
                 len(message.attachments),
                 len(attachments),
             )
-        downloaded: list[DownloadedImage] = []
         download_start = time.monotonic()
         download_target = min(len(attachments), settings.max_images_to_analyze)
-        for attachment in attachments[: settings.max_images_to_analyze]:
-            downloaded_image = await read_attachment(
-                attachment,
-                settings.max_image_bytes,
-                settings.download_timeout_s,
-            )
-            if downloaded_image:
-                downloaded.append(downloaded_image)
+        to_download = attachments[: settings.max_images_to_analyze]
+        proxy_sizes = None
+        if settings.download_via_media_proxy:
+            proxy_sizes = [
+                rendition_size(
+                    attachment.width,
+                    attachment.height,
+                    settings.openai_max_image_dim,
+                    settings.openai_tile_aspect_ratio,
+                )
+                for attachment in to_download
+            ]
+        downloaded = await self.downloader.download_many(
+            to_download,
+            settings.max_image_bytes,
+            settings.download_timeout_s,
+            proxy_sizes,
+        )
+        guild_id = guild.id
+        DOWNLOAD_SECONDS.observe(time.monotonic() - download_start, guild=guild_id)
         if settings.debug_logs:
             logger.info(
                 "Message %s image download took %.2fs (%s/%s kept)",
@@ -132,65 +785,70 @@ class CryptoSpamBot(discord.Client):
         if not downloaded:
             if settings.debug_logs:
                 logger.info("Message %s skipped: could not download images", message.id)
-            return
+            return False
+
+        selection = select_images(
+            [a.url for a in attachments],
+            settings.min_image_count,
+            settings.max_images_to_analyze,
+        )
+        backend = self._get_vision_backend(settings)
+        needs_vision = selection.qualifies and not hash_only and backend is not None
 
-        images = [image.data for image in downloaded]
-        hash_start = time.monotonic()
+        prepare_start = time.monotonic()
         try:
-            phashes = await asyncio.wait_for(
-                asyncio.to_thread(compute_phashes, images),
-                timeout=2.0,
-            )
+            with span("prepare", images=len(downloaded), encode=needs_vision) as prepare_span:
+                # Decoded once; the pixels are kept for the encode step when vision runs.
+                prepared = await asyncio.wait_for(
+                    asyncio.to_thread(decode_batch, downloaded, needs_vision),
+                    timeout=HASH_TIMEOUT_S,
+                )
+                prepare_span.set(hashes=len(prepared.phashes))
         except asyncio.TimeoutError:
-            logger.info("Message %s skipped: hash computation timed out", message.id)
-            return
+            logger.info("Message %s skipped: image hashing timed out", message.id)
+            return False
+        PREPARE_SECONDS.observe(time.monotonic() - prepare_start, guild=guild_id, stage="hash")
+        phashes = prepared.phashes
+        if settings.media_proxy_validate and any(image.from_proxy for image in downloaded):
+            self._spawn(self._validate_proxy_hashes(message.id, to_download, downloaded, settings))
         if settings.debug_logs:
             logger.info(
-                "Message %s hash computation took %.2fs",
+                "Message %s image hashing took %.2fs (hashes=%s)",
                 message.id,
-                time.monotonic() - hash_start,
+                time.monotonic() - prepare_start,
+                len(phashes),
             )
-        known_bad = self.hash_store.load()
-        match = match_hashes(phashes, known_bad)
+        with span("hash_lookup") as lookup_span:
+            known_bad = self.hash_store.load()
+            match = match_hashes(phashes, known_bad)
+            lookup_span.set(matched=match.matched)
         if match.matched:
             logger.info("Message %s matched known bad hashes", message.id)
-            delete_result = await safe_delete(message)
-            author_roles = await self._format_author_roles(guild, message.author)
-            action_result = await self._apply_high_action_with_mod_check(
-                guild,
-                message.author,
-                confidence=1.0,
-                reason="Known bad crypto scam hash",
-                settings=settings,
-            )
-
-            if self._report_allowed(guild.id, message.author.id, settings):
-                logger.info("Report sent (hash match) for message %s", message.id)
-                await self._send_report(
-                    message,
-                    message.author,
-                    vision_result=None,
+            HASH_HITS.inc(guild=guild_id, source="hash")
+            await self._act_on_verdict(
+                message,
+                settings,
+                Verdict(
+                    label="hash match",
+                    confidence=1.0,
+                    high_action_reason="Known bad crypto scam hash",
                     downloaded=downloaded,
                     all_hashes=phashes,
                     reason_override="Known bad hash match",
-                    action_taken=self._format_action_taken(delete_result, action_result),
                     allow_hash_add=False,
-                    kick_disabled=self._should_disable_kick(action_result),
-                    action_suggestion_override="No action necessary",
-                    author_roles_override=author_roles,
-                )
-            return
+                    action_suggestion="No action necessary",
+                ),
+                wave,
+            )
+            # The file rewrite takes a cross-process lock; keep it off the moderation path.
+            self._spawn(self._learn_fingerprints(to_download, prepared, known_bad))
+            return True
 
         if not phashes:
             if settings.debug_logs:
                 logger.info("Message %s skipped: no valid hashes", message.id)
-            return
+            return False
 
-        selection = select_images(
-            [a.url for a in attachments],
-            settings.min_image_count,
-            settings.max_images_to_analyze,
-        )
         if not selection.qualifies:
             if settings.debug_logs:
                 logger.info(
@@ -199,24 +857,78 @@ class CryptoSpamBot(discord.Client):
                     settings.min_image_count,
                     selection.total_images,
                 )
-            return
+            return False
 
-        if settings.hash_only_mode:
+        if hash_only:
             if settings.debug_logs:
-                logger.info("Message %s skipped: hash-only mode", message.id)
-            return
+                logger.info(
+                    "Message %s skipped: %s",
+                    message.id,
+                    "queue backlog" if degraded else "hash-only mode",
+                )
+            return False
 
-        if not settings.openai_api_key:
+        if backend is None:
             if settings.debug_logs:
-                logger.info("Message %s skipped: OPENAI_API_KEY not set", message.id)
-            return
+                logger.info(
+                    "Message %s skipped: vision backend %s not configured",
+                    message.id,
+                    settings.vision_backend,
+                )
+            return False
+
+        breaker = self._get_vision_breaker(settings, backend)
+        if not breaker.allow():
+            # Loud on purpose: the message goes unclassified beyond the hash check.
+            logger.warning(
+                "Message %s not classified: %s circuit breaker is open", message.id, breaker.name
+            )
+            return False
+
+        encode_start = time.monotonic()
+        try:
+            with span("encode", images=len(prepared.images)) as encode_span:
+                prepared = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        encode_batch,
+                        prepared,
+                        settings.openai_max_image_dim,
+                        self._get_encoder_options(settings),
+                        settings.composite_image_classification,
+                    ),
+                    timeout=ENCODE_TIMEOUT_S,
+                )
+                encode_span.set(montage=prepared.montage is not None)
+        except asyncio.TimeoutError:
+            logger.info("Message %s skipped: image encoding timed out", message.id)
+            return False
+        PREPARE_SECONDS.observe(time.monotonic() - encode_start, guild=guild_id, stage="encode")
+        if settings.debug_logs:
+            logger.info(
+                "Message %s image encoding took %.2fs", message.id, time.monotonic() - encode_start
+            )
 
         vision_start = time.monotonic()
         try:
-            vision_result = await self._classify_images(message.id, settings, downloaded)
-        except Exception:
-            logger.exception("OpenAI vision classification failed")
-            return
+            vision_result = await self._classify_images(
+                guild_id, message.id, settings, backend, prepared
+            )
+        except Exception as exc:
+            API_ERRORS.inc(api="vision", kind=type(exc).__name__)
+            logger.exception("Vision classification failed (%s backend)", backend.name)
+            was_closed = breaker.state == "closed"
+            breaker.record_failure()
+            if breaker.state == "open":
+                logger.warning(
+                    "%s %s; skipping vision calls for %.0fs",
+                    breaker.name,
+                    f"failed {breaker.failures} times in a row" if was_closed else "is still failing",
+                    breaker.reset_after_s,
+                )
+            return False
+        if breaker.state != "closed":
+            logger.warning("%s recovered; resuming vision calls", breaker.name)
+        breaker.record_success()
         if settings.debug_logs:
             logger.info(
                 "Message %s vision classification took %.2fs",
@@ -241,111 +953,73 @@ class CryptoSpamBot(discord.Client):
             settings.confidence_high,
             settings.confidence_medium,
         )
+        VERDICTS.inc(guild=guild_id, band=decision.confidence_band.value)
         if not decision.is_scam:
             if settings.debug_logs:
                 logger.info("Message %s not flagged: %s", message.id, decision.reason)
-            return
+            return False
 
-        delete_result = await safe_delete(message)
-        author_roles = await self._format_author_roles(guild, message.author)
         if decision.confidence_band.value == "high":
             logger.info("Message %s high confidence scam", message.id)
-            action_result = await self._apply_high_action_with_mod_check(
-                guild,
-                message.author,
+            verdict = Verdict(
+                label="high confidence",
                 confidence=vision_result.confidence,
-                reason="High confidence crypto scam",
-                settings=settings,
+                high_action_reason="High confidence crypto scam",
+                report=settings.report_high,
+                action_suggestion="Add hashes",
             )
-            if settings.report_high and self._report_allowed(guild.id, message.author.id, settings):
-                logger.info("Report sent (high confidence) for message %s", message.id)
-                await self._send_report(
-                    message,
-                    message.author,
-                    vision_result,
-                    downloaded,
-                    phashes,
-                    action_taken=self._format_action_taken(delete_result, action_result),
-                    allow_hash_add=True,
-                    kick_disabled=self._should_disable_kick(action_result),
-                    action_suggestion_override="Add hashes",
-                    author_roles_override=author_roles,
-                )
-            return
-
-        if settings.action_medium == "delete_only":
-            if settings.debug_logs:
+        else:
+            if settings.action_medium == "delete_only" and settings.debug_logs:
                 logger.info("Message %s deleted without report", message.id)
-            return
-
-        if self._report_allowed(guild.id, message.author.id, settings):
-            logger.info("Report sent (medium confidence) for message %s", message.id)
-            await self._send_report(
-                message,
-                message.author,
-                vision_result,
-                downloaded,
-                phashes,
-                action_taken=self._format_action_taken(delete_result, None),
-                allow_hash_add=True,
-                kick_disabled=False,
-                action_suggestion_override="Review and decide",
-                author_roles_override=author_roles,
+            verdict = Verdict(
+                label="medium confidence",
+                confidence=vision_result.confidence,
+                high_action_reason=None,
+                report=settings.action_medium != "delete_only",
+                action_suggestion="Review and decide",
             )
-
+        verdict.vision_result = vision_result
+        verdict.downloaded = downloaded
+        verdict.all_hashes = phashes
+        await self._act_on_verdict(message, settings, verdict, wave)
+        return True
 
     async def _classify_images(
         self,
+        guild_id: int,
         message_id: int,
         settings: ResolvedSettings,
-        downloaded: list[DownloadedImage],
+        backend: VisionBackend,
+        prepared: PreparedBatch,
     ) -> VisionResult:
-        best_scam: VisionResult | None = None
-        best_non_scam: VisionResult | None = None
-        total = len(downloaded)
-        api_key = settings.openai_api_key
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY not set")
-        if settings.parallel_image_classification:
-            prepared: list[tuple[str, dict[str, object]]] = []
-            for index, image in enumerate(downloaded, start=1):
-                data_url, byte_size, content_type, width, height, quality = to_data_url(
-                    image,
-                    settings.openai_max_image_dim,
-                )
-                image_meta: dict[str, object] = {
-                    "w": width,
-                    "h": height,
-                    "bytes": byte_size,
-                    "format": content_type,
-                }
-                if quality is not None:
-                    image_meta["quality"] = quality
-                prepared.append((data_url, image_meta))
-                if settings.debug_logs:
+        requests = prepared.classification_requests()
+        total = len(requests)
+        if prepared.montage is not None and settings.debug_logs:
+            logger.info(
+                "Message %s classifying %s images as one montage",
+                message_id,
+                len(prepared.images),
+            )
+        if settings.debug_logs:
+            for index, payloads in enumerate(requests, start=1):
+                for tile_index, payload in enumerate(payloads, start=1):
                     logger.info(
-                        "Message %s image %s/%s prepared for OpenAI: %s bytes (%s, detail=%s, size=%sx%s, quality=%s)",
+                        "Message %s image %s/%s%s prepared for OpenAI: %s bytes (%s, detail=%s, size=%sx%s, quality=%s)",
                         message_id,
                         index,
                         total,
-                        byte_size,
-                        content_type,
+                        f" tile {tile_index}/{len(payloads)}" if len(payloads) > 1 else "",
+                        payload.byte_size,
+                        payload.content_type,
                         settings.openai_image_detail,
-                        width,
-                        height,
-                        quality,
+                        payload.width,
+                        payload.height,
+                        payload.quality,
                     )
+        if settings.parallel_image_classification:
             tasks = [
-                asyncio.to_thread(
-                    classify_images,
-                    api_key,
-                    settings.openai_model,
-                    [data_url],
-                    settings.openai_image_detail,
-                    [image_meta],
-                    settings.debug_logs,
-                )
-                for data_url, image_meta in prepared
+                self._classify_payloads(guild_id, settings, backend, payloads)
+                for payloads in requests
             ]
             results = await asyncio.gather(*tasks)
             if settings.debug_logs:
@@ -354,27 +1028,9 @@ class CryptoSpamBot(discord.Client):
                     total,
                     message_id,
                 )
-            for result in results:
-                if result.is_crypto_scam:
-                    if best_scam is None or result.confidence > best_scam.confidence:
-                        best_scam = result
-                else:
-                    if best_non_scam is None or result.confidence > best_non_scam.confidence:
-                        best_non_scam = result
         else:
-            for index, image in enumerate(downloaded, start=1):
-                data_url, byte_size, content_type, width, height, quality = to_data_url(
-                    image,
-                    settings.openai_max_image_dim,
-                )
-                image_meta: dict[str, object] = {
-                    "w": width,
-                    "h": height,
-                    "bytes": byte_size,
-                    "format": content_type,
-                }
-                if quality is not None:
-                    image_meta["quality"] = quality
+            results = []
+            for index, payloads in enumerate(requests, start=1):
                 if settings.debug_logs:
                     logger.info(
                         "Classifying image %s/%s for message %s",
@@ -382,78 +1038,138 @@ class CryptoSpamBot(discord.Client):
                         total,
                         message_id,
                     )
-                    logger.info(
-                        "Message %s image %s/%s prepared for OpenAI: %s bytes (%s, detail=%s, size=%sx%s, quality=%s)",
-                        message_id,
-                        index,
-                        total,
-                        byte_size,
-                        content_type,
-                        settings.openai_image_detail,
-                        width,
-                        height,
-                        quality,
-                    )
                 image_start = time.monotonic()
-                result = await asyncio.to_thread(
-                    classify_images,
-                    api_key,
-                    settings.openai_model,
-                    [data_url],
-                    settings.openai_image_detail,
-                    [image_meta],
-                    settings.debug_logs,
-                )
+                result = await self._classify_payloads(guild_id, settings, backend, payloads)
                 if settings.debug_logs:
                     logger.info(
-                        "Message %s image %s/%s OpenAI took %.2fs",
+                        "Message %s image %s/%s %s took %.2fs",
                         message_id,
                         index,
                         total,
+                        backend.name,
                         time.monotonic() - image_start,
                     )
-                if result.is_crypto_scam:
-                    if best_scam is None or result.confidence > best_scam.confidence:
-                        best_scam = result
-                    if result.confidence >= settings.confidence_high:
-                        if settings.debug_logs:
-                            logger.info(
-                                "Message %s early exit: high confidence scam on image %s/%s",
-                                message_id,
-                                index,
-                                total,
-                            )
-                        return result
-                else:
-                    if best_non_scam is None or result.confidence > best_non_scam.confidence:
-                        best_non_scam = result
-        if best_scam:
-            return best_scam
-        if best_non_scam:
-            return best_non_scam
-        raise RuntimeError("No images available for classification")
+                results.append(result)
+                if result.is_crypto_scam and result.confidence >= settings.confidence_high:
+                    if settings.debug_logs:
+                        logger.info(
+                            "Message %s early exit: high confidence scam on image %s/%s",
+                            message_id,
+                            index,
+                            total,
+                        )
+                    return result
+        merged = merge_vision_results(results)
+        if merged is None:
+            raise RuntimeError("No images available for classification")
+        return merged
+
+    async def _classify_payloads(
+        self,
+        guild_id: int,
+        settings: ResolvedSettings,
+        backend: VisionBackend,
+        payloads: list[EncodedImage],
+    ) -> VisionResult:
+        with (
+            VISION_SECONDS.time(guild=guild_id, backend=backend.name),
+            span("vision", backend=backend.name, images=len(payloads)) as vision_span,
+        ):
+            result = await asyncio.to_thread(
+                backend.classify,
+                [payload.data_url for payload in payloads],
+                settings.openai_image_detail,
+                [payload.meta() for payload in payloads],
+                settings.debug_logs,
+            )
+            vision_span.set(
+                scam=result.is_crypto_scam,
+                confidence=result.confidence,
+                prompt_tokens=result.prompt_tokens,
+                completion_tokens=result.completion_tokens,
+            )
+        if result.prompt_tokens is not None:
+            VISION_TOKENS.inc(result.prompt_tokens, guild=guild_id, type="prompt")
+        if result.completion_tokens is not None:
+            VISION_TOKENS.inc(result.completion_tokens, guild=guild_id, type="completion")
+        return result
+
+    async def _validate_proxy_hashes(
+        self,
+        message_id: int,
+        attachments: list[discord.Attachment],
+        downloaded: list[DownloadedImage],
+        settings: ResolvedSettings,
+    ) -> None:
+        by_url = {attachment.url: attachment for attachment in attachments}
+        pairs = [
+            (by_url[image.url], image)
+            for image in downloaded
+            if image.from_proxy and image.url in by_url
+        ]
+        originals = await self.downloader.download_many(
+            [attachment for attachment, _ in pairs],
+            settings.max_image_bytes,
+            settings.download_timeout_s,
+        )
+        original_by_url = {image.url: image for image in originals}
+        known_bad = self.hash_store.load()
+        equal = 0
+        compared = 0
+        for attachment, rendition in pairs:
+            original = original_by_url.get(attachment.url)
+            if original is None:
+                continue
+            rendition_hashes = await asyncio.to_thread(compute_phashes, [rendition.data])
+            original_hashes = await asyncio.to_thread(compute_phashes, [original.data])
+            if not rendition_hashes or not original_hashes:
+                continue
+            compared += 1
+            rendition_hash = rendition_hashes[0]
+            original_hash = original_hashes[0]
+            if rendition_hash == original_hash:
+                equal += 1
+            elif original_hash in known_bad or rendition_hash in known_bad:
+                logger.warning(
+                    "Media proxy validation: message %s %s hash %s (known_bad=%s) differs from original %s (known_bad=%s)",
+                    message_id,
+                    attachment.filename,
+                    rendition_hash,
+                    rendition_hash in known_bad,
+                    original_hash,
+                    original_hash in known_bad,
+                )
+        logger.info(
+            "Media proxy validation: message %s %s/%s rendition hashes match originals",
+            message_id,
+            equal,
+            compared,
+        )
 
     async def _send_report(
         self,
         message: discord.Message,
         author: discord.abc.User,
-        vision_result: VisionResult | None,
-        downloaded: list[DownloadedImage],
-        all_hashes: list[str],
-        reason_override: str | None = None,
-        action_taken: str = "none",
-        allow_hash_add: bool = True,
-        kick_disabled: bool = False,
-        action_suggestion_override: str | None = None,
-        author_roles_override: str | None = None,
+        verdict: Verdict,
+        outcome: Awaitable[tuple[bool, str | None]],
+        author_roles: str,
+        wave: SpamWave | None = None,
     ) -> None:
+        """Send the mod report; `outcome` resolves to (deleted, action result)."""
         if message.guild is None:
             return
+        wave_text = None
+        if wave is not None:
+            await wave.wait_closed()
+            if wave.followers:
+                wave_text = build_wave_text(wave.messages, wave.deleted_ids)
+        report_start = time.monotonic()
         settings = self._get_resolved_settings(message.guild.id)
         channel = await self._resolve_mod_channel(message.guild, settings)
         if channel is None:
             await self._warn_missing_mod_channel(message.guild, settings)
             return
+        vision_result = verdict.vision_result
         if vision_result:
             indicators = build_indicator_text(
                 vision_result.indicators.domains,
@@ -465,11 +1181,21 @@ class CryptoSpamBot(discord.Client):
         else:
             indicators = "none"
             confidence = 1.0
-            reasons = [reason_override or "Known bad hash"]
-        action_suggestion = action_suggestion_override or (
+            reasons = [verdict.reason_override or "Known bad hash"]
+        action_suggestion = verdict.action_suggestion or (
             f"/kick {author.id}" if settings.action_high == "kick" else f"/ban {author.id}"
         )
-        author_roles = author_roles_override or await self._format_author_roles(message.guild, author)
+        # Decoding and re-encoding thumbnails is CPU work; keep it off the event loop.
+        files = await asyncio.to_thread(
+            build_mod_files,
+            verdict.downloaded,
+            settings.report_media_mode,
+            self.settings.report_thumbnail_dim,
+        )
+        deleted, action_result = await outcome
+        kick_disabled = self._should_disable_kick(action_result)
+        allow_hash_add = verdict.allow_hash_add
+        all_hashes = verdict.all_hashes
         embed = build_report_embed(
             message,
             author,
@@ -477,26 +1203,18 @@ class CryptoSpamBot(discord.Client):
             reasons,
             indicators,
             action_suggestion,
-            action_taken,
+            self._format_action_taken(deleted, action_result),
             author_roles,
+            wave_text,
         )
-        context = ReportContext(
-            guild=message.guild,
-            channel=channel,
-            message=message,
-            author=author,
-            images=downloaded,
-            hash_store=self.hash_store,
-            all_hashes=list(all_hashes),
-            mod_role_id=settings.mod_role_id,
-            allow_hash_add=allow_hash_add,
-            kick_disabled=kick_disabled,
-            report_store=self.report_store,
-            report_record=None,
+        # The buttons only carry the flagged message id; the record is looked up on press.
+        view = build_report_view(message.id, kick_disabled, allow_hash_add)
+        sent_message = await self.actions.run(
+            "report",
+            channel.id,
+            functools.partial(channel.send, embed=embed, files=files, view=view),
         )
-        view = ReportView(context, timeout=None)
-        files = build_mod_files(downloaded)
-        sent_message = await channel.send(embed=embed, files=files, view=view)
+        REPORT_SECONDS.observe(time.monotonic() - report_start, guild=message.guild.id)
         report_record = ReportRecord(
             message_id=sent_message.id,
             channel_id=channel.id,
@@ -507,9 +1225,9 @@ class CryptoSpamBot(discord.Client):
             kick_disabled=kick_disabled,
             all_hashes=list(all_hashes),
             created_at=time.time(),
+            report_key=message.id,
         )
-        self.report_store.save_report(report_record)
-        context.report_record = report_record
+        await asyncio.to_thread(self.report_store.save_report, report_record)
 
     async def _register_commands(self) -> None:
         command = app_commands.Command(
@@ -518,7 +1236,35 @@ class CryptoSpamBot(discord.Client):
             callback=self._add_hash_command,
         )
         self.tree.add_command(command)
+        self.tree.add_command(
+            app_commands.Command(
+                name="reload_config",
+                description="Reload the multi-server config file without restarting.",
+                callback=self._reload_config_command,
+            )
+        )
+        if self.settings.shard_ids is not None and 0 not in self.settings.shard_ids:
+            # Commands are global; with SHARD_IDS only the process running shard 0 syncs them.
+            return
+        signature_path = Path("data") / "command_signature.txt"
+        signature = f"{self.application_id}:{self._command_tree_signature()}"
+        try:
+            stored = signature_path.read_text(encoding="utf-8").strip()
+        except OSError:
+            stored = ""
+        if stored == signature:
+            logger.info("Application commands unchanged; skipping sync")
+            return
         await self.tree.sync()
+        try:
+            atomic_write_text(signature_path, signature)
+        except OSError:
+            logger.warning("Could not store command signature at %s", signature_path)
+
+    def _command_tree_signature(self) -> str:
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
     async def _add_hash_command(
         self,
@@ -529,23 +1275,22 @@ class CryptoSpamBot(discord.Client):
             await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
             return
         settings = self._get_resolved_settings(interaction.guild.id)
-        if settings.mod_role_id:
-            if not interaction.user or not isinstance(interaction.user, discord.Member):
-                await interaction.response.send_message("Permission check failed.", ephemeral=True)
-                return
-            if not any(role.id == settings.mod_role_id for role in interaction.user.roles):
-                await interaction.response.send_message("Missing Mod role.", ephemeral=True)
-                return
+        if not await self._ensure_mod_role(interaction, settings):
+            return
         mod_channel = await self._resolve_mod_channel(interaction.guild, settings)
         if not mod_channel:
             await self._warn_missing_mod_channel(interaction.guild, settings)
             await interaction.response.send_message("Mod channel not found.", ephemeral=True)
             return
-        downloaded = await read_attachment(image, settings.max_image_bytes, settings.download_timeout_s)
+        downloaded = await self.downloader.download(
+            image,
+            settings.max_image_bytes,
+            settings.download_timeout_s,
+        )
         if not downloaded:
             await interaction.response.send_message("Failed to read image.", ephemeral=True)
             return
-        phashes = compute_phashes([downloaded.data])
+        phashes = await asyncio.to_thread(compute_phashes, [downloaded.data])
         if not phashes:
             await interaction.response.send_message("No hash generated from image.", ephemeral=True)
             return
@@ -559,8 +1304,7 @@ class CryptoSpamBot(discord.Client):
         existing = self.hash_store.load()
         new_hashes = [phash for phash in unique_hashes if phash not in existing]
         already_known = [phash for phash in unique_hashes if phash in existing]
-        for phash in new_hashes:
-            self.hash_store.add(phash)
+        await asyncio.to_thread(self.hash_store.add_many, new_hashes)
         added = len(new_hashes)
         already_count = len(already_known)
         added_label = "hash" if added == 1 else "hashes"
@@ -589,22 +1333,112 @@ class CryptoSpamBot(discord.Client):
             f"{result_detail} Logged to {mod_channel.mention}.",
         )
 
+    async def _ensure_mod_role(
+        self,
+        interaction: discord.Interaction,
+        settings: ResolvedSettings,
+    ) -> bool:
+        if settings.mod_role_id:
+            if not interaction.user or not isinstance(interaction.user, discord.Member):
+                await interaction.response.send_message("Permission check failed.", ephemeral=True)
+                return False
+            if interaction.user.get_role(settings.mod_role_id) is None:
+                await interaction.response.send_message("Missing Mod role.", ephemeral=True)
+                return False
+        return True
+
+    async def _reload_config_command(self, interaction: discord.Interaction) -> None:
+        if not interaction.guild:
+            await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+            return
+        settings = self._get_resolved_settings(interaction.guild.id)
+        if not await self._ensure_mod_role(interaction, settings):
+            return
+        if not self.settings.multi_server_config_path:
+            await interaction.response.send_message("No multi-server config file is set.", ephemeral=True)
+            return
+        logger.info("Config reload requested by %s", interaction.user)
+        try:
+            result = await self.reload_config()
+        except (OSError, ValueError) as exc:
+            await interaction.response.send_message(
+                f"Reload failed, keeping the current config: {exc}",
+                ephemeral=True,
+            )
+            return
+        await interaction.response.send_message(result, ephemeral=True)
+
+    async def reload_config(self) -> str:
+        """Re-read the multi-server config and swap it in; raises OSError/ValueError if invalid.
+
+        The new per-guild table is fully built and checked before anything is replaced, so
+        messages in flight see either the old settings or the new ones.
+        """
+        async with self._reload_lock:
+            stamp = self._multi_server_config_stamp()
+            settings = await asyncio.to_thread(reload_multi_server_config, self.settings)
+            table = {guild.id: resolve_settings(settings, guild.id) for guild in self.guilds}
+            missing = self._missing_guild_settings(table)
+            if missing:
+                raise ValueError("Missing required settings for guild(s): " + ", ".join(missing))
+            self.settings = settings
+            self._settings_cache = table
+            self._config_stamp = stamp
+            self._prune_vision_backends(table.values())
+            # Mod channels and the missing-channel warnings depend on per-guild settings.
+            self.guild_cache.invalidate()
+            self._missing_mod_channel_warned.clear()
+        # The hash and fingerprint files are re-read on their next load once they change.
+        logger.info("Reloaded multi-server config for %s guild(s)", len(settings.multi_server_config))
+        return f"Reloaded config ({len(settings.multi_server_config)} guild override(s))."
+
+    def _prune_vision_backends(self, resolved: Iterable[ResolvedSettings]) -> None:
+        """Drop cached backends and breakers that no guild's settings use any more."""
+        in_use = {vision_backend_key(settings) for settings in resolved}
+        stale = [key for key in self._vision_backends if key not in in_use]
+        for key in [key for key in self._vision_breakers if key not in in_use]:
+            del self._vision_breakers[key]
+        if stale:
+            backends = [self._vision_backends.pop(key) for key in stale]
+            self._spawn(self._close_vision_backends(backends))
+
+    async def _close_vision_backends(self, backends: list[VisionBackend]) -> None:
+        await asyncio.sleep(VISION_BACKEND_CLOSE_DELAY_S)
+        for backend in backends:
+            await asyncio.to_thread(backend.close)
+
+    async def _reload_config_logged(self, trigger: str) -> None:
+        logger.info("Config reload triggered by %s", trigger)
+        try:
+            await self.reload_config()
+        except (OSError, ValueError) as exc:
+            logger.error("Config reload failed; keeping the current config: %s", exc)
+
+    def _multi_server_config_stamp(self) -> tuple[int, int] | None:
+        path = self.settings.multi_server_config_path
+        if not path:
+            return None
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def _watch_multi_server_config(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.config_reload_interval_s)
+            stamp = self._multi_server_config_stamp()
+            if stamp is not None and stamp != self._config_stamp:
+                await self._reload_config_logged("file change")
+                # A rejected file is not retried until it changes again.
+                self._config_stamp = stamp
+
     async def _resolve_mod_channel(
         self,
         guild: discord.Guild,
         settings: ResolvedSettings,
     ) -> discord.TextChannel | None:
-        if not settings.mod_channel:
-            return None
-        if settings.mod_channel.isdigit():
-            channel = guild.get_channel(int(settings.mod_channel))
-            if isinstance(channel, discord.TextChannel):
-                return channel
-            return None
-        for channel in guild.text_channels:
-            if channel.name == settings.mod_channel:
-                return channel
-        return None
+        return self.guild_cache.mod_channel(guild, settings.mod_channel)
 
     async def _warn_missing_mod_channel(
         self,
@@ -628,36 +1462,32 @@ class CryptoSpamBot(discord.Client):
         self,
         guild: discord.Guild,
     ) -> discord.TextChannel | None:
-        me = guild.me
-        if me is None:
-            return None
-        if guild.system_channel and guild.system_channel.permissions_for(me).send_messages:
-            return guild.system_channel
-        for channel in guild.text_channels:
-            if channel.permissions_for(me).send_messages:
-                return channel
-        return None
+        return self.guild_cache.fallback_channel(guild)
 
     async def _apply_high_action_with_mod_check(
         self,
         guild: discord.Guild,
         author: discord.abc.User,
+        member: discord.Member | None,
         confidence: float,
         reason: str,
         settings: ResolvedSettings,
     ) -> str:
         if settings.action_high == "report_only":
             return "report only"
-        if settings.mod_role_id:
-            member = await self._get_member(guild, author.id)
-            if member and any(role.id == settings.mod_role_id for role in member.roles):
-                return "no kick (author is Mod)"
-        success = await apply_high_action(
-            guild,
-            author.id,
-            settings.action_high,
-            reason,
-            softban_delete_days=settings.softban_delete_days,
+        if self._is_mod(member, settings):
+            return "no kick (author is Mod)"
+        success = await self.actions.run(
+            "moderate",
+            guild.id,
+            functools.partial(
+                apply_high_action,
+                guild,
+                author.id,
+                settings.action_high,
+                reason,
+                softban_delete_days=settings.softban_delete_days,
+            ),
         )
         if not success:
             return "kick failed"
@@ -691,11 +1521,20 @@ class CryptoSpamBot(discord.Client):
     async def _get_member(self, guild: discord.Guild, user_id: int) -> discord.Member | None:
         member = guild.get_member(user_id)
         if member:
+            CACHE_LOOKUPS.inc(cache="member", result="hit")
+            return member
+        hit, member = self.member_cache.get(guild.id, user_id)
+        CACHE_LOOKUPS.inc(cache="member", result="hit" if hit else "miss")
+        if hit:
             return member
         try:
-            return await guild.fetch_member(user_id)
-        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+            member = await guild.fetch_member(user_id)
+        except (discord.NotFound, discord.Forbidden):
+            member = None
+        except discord.HTTPException:
             return None
+        self.member_cache.put(guild.id, user_id, member)
+        return member
 
     async def _fetch_channel(self, channel_id: int) -> discord.TextChannel | None:
         channel = self.get_channel(channel_id)
@@ -709,46 +1548,99 @@ class CryptoSpamBot(discord.Client):
 
     async def _restore_persistent_views(self) -> None:
         ttl_s = self.settings.report_store_ttl_hours * 3600
-        self.report_store.prune(ttl_s)
-        records = self.report_store.load_reports()
+        await asyncio.to_thread(self.report_store.prune, ttl_s)
+        # With several shard processes sharing the store, each restores its own guilds.
+        records = [
+            record
+            for record in await asyncio.to_thread(self.report_store.load_legacy_reports)
+            if self.get_guild(record.guild_id) is not None
+        ]
+        if not records:
+            return
+        semaphore = asyncio.Semaphore(RESTORE_CONCURRENCY)
+        views = await asyncio.gather(
+            *(self._restore_report_view(record, semaphore) for record in records)
+        )
+        stale: list[int] = []
         restored = 0
-        for record in records:
+        for record, view in zip(records, views):
+            if view is None:
+                stale.append(record.message_id)
+                continue
+            self.add_view(view, message_id=record.message_id)
+            restored += 1
+        if stale:
+            await asyncio.to_thread(self.report_store.delete_reports, stale)
+        if restored:
+            logger.info("Restored %s report views", restored)
+
+    async def _restore_report_view(
+        self,
+        record: ReportRecord,
+        semaphore: asyncio.Semaphore,
+    ) -> ReportView | None:
+        async with semaphore:
             channel = await self._fetch_channel(record.channel_id)
             if not channel:
-                self.report_store.delete_report(record.message_id)
-                continue
+                return None
             try:
                 report_message = await channel.fetch_message(record.message_id)
             except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                self.report_store.delete_report(record.message_id)
-                continue
-            author: discord.abc.User | None = None
-            try:
-                author = await self.fetch_user(record.author_id)
-            except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                author = channel.guild.get_member(record.author_id)
+                return None
+            author: discord.abc.User | None = channel.guild.get_member(record.author_id)
             if author is None:
-                self.report_store.delete_report(record.message_id)
-                continue
-            context = ReportContext(
-                guild=channel.guild,
-                channel=channel,
-                message=report_message,
-                author=author,
-                images=[],
-                hash_store=self.hash_store,
-                all_hashes=list(record.all_hashes),
-                mod_role_id=record.mod_role_id,
-                allow_hash_add=record.allow_hash_add,
-                kick_disabled=record.kick_disabled,
-                report_store=self.report_store,
-                report_record=record,
+                try:
+                    author = await self.fetch_user(record.author_id)
+                except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+                    return None
+        context = ReportContext(
+            guild=channel.guild,
+            channel=channel,
+            message=report_message,
+            author=author,
+            images=[],
+            hash_store=self.hash_store,
+            all_hashes=list(record.all_hashes),
+            mod_role_id=record.mod_role_id,
+            allow_hash_add=record.allow_hash_add,
+            kick_disabled=record.kick_disabled,
+            report_store=self.report_store,
+            report_record=record,
+        )
+        return ReportView(context, timeout=None)
+
+    def _get_encoder_options(self, settings: ResolvedSettings) -> ImageEncoderOptions:
+        return ImageEncoderOptions(
+            format=settings.openai_image_format,
+            quality=settings.openai_image_quality,
+            resample=settings.openai_image_resample,
+            reducing_gap=settings.openai_image_reducing_gap,
+            tile_aspect_ratio=settings.openai_tile_aspect_ratio,
+            max_tiles=settings.openai_max_tiles,
+        )
+
+    def _get_vision_backend(self, settings: ResolvedSettings) -> VisionBackend | None:
+        key = vision_backend_key(settings)
+        cached = self._vision_backends.get(key)
+        if cached:
+            return cached
+        backend = build_vision_backend(settings)
+        if backend is not None:
+            self._vision_backends[key] = backend
+        return backend
+
+    def _get_vision_breaker(
+        self, settings: ResolvedSettings, backend: VisionBackend
+    ) -> CircuitBreaker:
+        key = vision_backend_key(settings)
+        breaker = self._vision_breakers.get(key)
+        if breaker is None:
+            breaker = self._vision_breakers[key] = CircuitBreaker(
+                f"vision:{backend.name}:{settings.openai_model}",
+                self.settings.vision_breaker_failures,
+                self.settings.vision_breaker_reset_s,
             )
-            view = ReportView(context, timeout=None)
-            self.add_view(view, message_id=record.message_id)
-            restored += 1
-        if restored:
-            logger.info("Restored %s report views", restored)
+        return breaker
 
     def _get_resolved_settings(self, guild_id: int) -> ResolvedSettings:
         cached = self._settings_cache.get(guild_id)
@@ -758,25 +1650,34 @@ class CryptoSpamBot(discord.Client):
         self._settings_cache[guild_id] = resolved
         return resolved
 
-    async def _validate_guild_settings(self) -> None:
+    def _missing_guild_settings(self, table: dict[int, ResolvedSettings]) -> list[str]:
         missing: list[str] = []
-        for guild in self.guilds:
-            resolved = self._get_resolved_settings(guild.id)
+        for guild_id, resolved in table.items():
             missing_fields: list[str] = []
             if not resolved.mod_channel:
                 missing_fields.append("MOD_CHANNEL")
             if not resolved.mod_role_id:
                 missing_fields.append("MOD_ROLE_ID")
             if missing_fields:
-                missing.append(f"{guild.id} ({', '.join(missing_fields)})")
+                missing.append(f"{guild_id} ({', '.join(missing_fields)})")
+        return missing
+
+    async def _validate_guild_settings(self) -> None:
+        missing = self._missing_guild_settings(
+            {guild.id: self._get_resolved_settings(guild.id) for guild in self.guilds}
+        )
         if missing:
             missing_ids = ", ".join(missing)
             logger.error("Missing required settings for guild(s): %s", missing_ids)
             await self.close()
             raise RuntimeError("Missing required settings for guild(s): " + missing_ids)
 
-    async def _format_author_roles(self, guild: discord.Guild, author: discord.abc.User) -> str:
-        member = await self._get_member(guild, author.id)
+    def _is_mod(self, member: discord.Member | None, settings: ResolvedSettings) -> bool:
+        if not settings.mod_role_id or member is None:
+            return False
+        return member.get_role(settings.mod_role_id) is not None
+
+    def _format_member_roles(self, member: discord.Member | None) -> str:
         if not member:
             return "(roles unknown)"
         roles = [role.name for role in member.roles if role.name != "@everyone"]
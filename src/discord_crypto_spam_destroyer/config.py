@@ -2,24 +2,38 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
 from typing import Any, Literal, cast
 
 ActionHigh = Literal["kick", "ban", "softban", "report_only"]
 ActionMedium = Literal["delete_and_report", "delete_only"]
 OpenAIImageDetail = Literal["low", "high"]
+VisionBackendName = Literal["openai", "openai_compatible", "fake"]
+OpenAIImageFormat = Literal["jpeg", "webp"]
+OpenAIImageResample = Literal["lanczos", "bicubic", "bilinear", "box"]
+FingerprintMode = Literal["off", "prioritize", "act"]
+ReportMediaMode = Literal["original", "thumbnails", "contact_sheet"]
 
 UNSET = object()
 
 MULTI_SERVER_ALLOWED_KEYS = {
+    "vision_backend",
     "openai_api_key",
+    "openai_base_url",
     "openai_model",
     "openai_image_detail",
     "openai_max_image_dim",
+    "openai_image_format",
+    "openai_image_quality",
+    "openai_image_resample",
+    "openai_image_reducing_gap",
+    "openai_tile_aspect_ratio",
+    "openai_max_tiles",
     "min_image_count",
     "max_images_to_analyze",
     "parallel_image_classification",
+    "composite_image_classification",
     "action_high",
     "action_medium",
     "confidence_high",
@@ -28,26 +42,42 @@ MULTI_SERVER_ALLOWED_KEYS = {
     "mod_role_id",
     "report_high",
     "report_cooldown_s",
+    "report_media_mode",
     "message_processing_delay_s",
+    "wave_window_s",
+    "cleanup_window_s",
+    "fingerprint_mode",
     "softban_delete_days",
     "hash_only_mode",
     "debug_logs",
     "download_timeout_s",
     "max_image_bytes",
+    "download_via_media_proxy",
+    "media_proxy_validate",
 }
 
 
 @dataclass(frozen=True)
 class Settings:
     discord_token: str
+    vision_backend: VisionBackendName
     openai_api_key: str | None
+    openai_base_url: str | None
     openai_model: str
     openai_image_detail: OpenAIImageDetail
     openai_max_image_dim: int
+    openai_image_format: OpenAIImageFormat
+    openai_image_quality: int
+    openai_image_resample: OpenAIImageResample
+    openai_image_reducing_gap: float
+    openai_tile_aspect_ratio: float
+    openai_max_tiles: int
     min_image_count: int
     max_images_to_analyze: int
     parallel_image_classification: bool
+    composite_image_classification: bool
     known_bad_hash_path: str
+    known_bad_fingerprint_path: str
     action_high: ActionHigh
     action_medium: ActionMedium
     confidence_high: float
@@ -56,13 +86,41 @@ class Settings:
     mod_role_id: int | None
     report_high: bool
     report_cooldown_s: float
+    report_media_mode: ReportMediaMode
     report_store_ttl_hours: int
+    report_thumbnail_dim: int
     message_processing_delay_s: float
+    wave_window_s: float
+    cleanup_window_s: float
+    fingerprint_mode: FingerprintMode
     softban_delete_days: int
     hash_only_mode: bool
     debug_logs: bool
     download_timeout_s: float
     max_image_bytes: int
+    download_via_media_proxy: bool
+    media_proxy_validate: bool
+    download_concurrency: int
+    download_budget_bytes: int
+    queue_workers: int
+    queue_max_depth: int
+    queue_max_per_guild: int
+    queue_hash_only_depth: int
+    action_concurrency: int
+    report_concurrency: int
+    member_cache_ttl_s: float
+    shard_count: int | None
+    shard_ids: tuple[int, ...] | None
+    shard_processes: int
+    config_reload_interval_s: float
+    metrics_host: str
+    metrics_port: int
+    trace_sample_rate: float
+    trace_slow_threshold_s: float
+    loop_stall_threshold_s: float
+    health_stall_timeout_s: float
+    vision_breaker_failures: int
+    vision_breaker_reset_s: float
     multi_server_config_path: str | None
     multi_server_config: dict[int, "SettingsOverrides"]
 
@@ -70,13 +128,22 @@ class Settings:
 @dataclass(frozen=True)
 class ResolvedSettings:
     discord_token: str
+    vision_backend: VisionBackendName
     openai_api_key: str | None
+    openai_base_url: str | None
     openai_model: str
     openai_image_detail: OpenAIImageDetail
     openai_max_image_dim: int
+    openai_image_format: OpenAIImageFormat
+    openai_image_quality: int
+    openai_image_resample: OpenAIImageResample
+    openai_image_reducing_gap: float
+    openai_tile_aspect_ratio: float
+    openai_max_tiles: int
     min_image_count: int
     max_images_to_analyze: int
     parallel_image_classification: bool
+    composite_image_classification: bool
     action_high: ActionHigh
     action_medium: ActionMedium
     confidence_high: float
@@ -85,23 +152,38 @@ class ResolvedSettings:
     mod_role_id: int | None
     report_high: bool
     report_cooldown_s: float
+    report_media_mode: ReportMediaMode
     message_processing_delay_s: float
+    wave_window_s: float
+    cleanup_window_s: float
+    fingerprint_mode: FingerprintMode
     softban_delete_days: int
     hash_only_mode: bool
     debug_logs: bool
     download_timeout_s: float
     max_image_bytes: int
+    download_via_media_proxy: bool
+    media_proxy_validate: bool
 
 
 @dataclass(frozen=True)
 class SettingsOverrides:
+    vision_backend: str | None | object = UNSET
     openai_api_key: str | None | object = UNSET
+    openai_base_url: str | None | object = UNSET
     openai_model: str | None | object = UNSET
     openai_image_detail: str | None | object = UNSET
     openai_max_image_dim: int | None | object = UNSET
+    openai_image_format: str | None | object = UNSET
+    openai_image_quality: int | None | object = UNSET
+    openai_image_resample: str | None | object = UNSET
+    openai_image_reducing_gap: float | None | object = UNSET
+    openai_tile_aspect_ratio: float | None | object = UNSET
+    openai_max_tiles: int | None | object = UNSET
     min_image_count: int | None | object = UNSET
     max_images_to_analyze: int | None | object = UNSET
     parallel_image_classification: bool | None | object = UNSET
+    composite_image_classification: bool | None | object = UNSET
     action_high: ActionHigh | None | object = UNSET
     action_medium: ActionMedium | None | object = UNSET
     confidence_high: float | None | object = UNSET
@@ -110,12 +192,18 @@ class SettingsOverrides:
     mod_role_id: int | None | object = UNSET
     report_high: bool | None | object = UNSET
     report_cooldown_s: float | None | object = UNSET
+    report_media_mode: str | None | object = UNSET
     message_processing_delay_s: float | None | object = UNSET
+    wave_window_s: float | None | object = UNSET
+    cleanup_window_s: float | None | object = UNSET
+    fingerprint_mode: str | None | object = UNSET
     softban_delete_days: int | None | object = UNSET
     hash_only_mode: bool | None | object = UNSET
     debug_logs: bool | None | object = UNSET
     download_timeout_s: float | None | object = UNSET
     max_image_bytes: int | None | object = UNSET
+    download_via_media_proxy: bool | None | object = UNSET
+    media_proxy_validate: bool | None | object = UNSET
 
 
 def _env(name: str, default: str) -> str:
@@ -169,21 +257,96 @@ def _parse_openai_image_detail(value: str) -> OpenAIImageDetail:
     return cast(OpenAIImageDetail, normalized)
 
 
+def _parse_openai_image_format(value: str) -> OpenAIImageFormat:
+    normalized = value.lower()
+    if normalized == "jpg":
+        normalized = "jpeg"
+    if normalized not in {"jpeg", "webp"}:
+        raise ValueError("OPENAI_IMAGE_FORMAT must be 'jpeg' or 'webp'")
+    return cast(OpenAIImageFormat, normalized)
+
+
+def _parse_openai_image_resample(value: str) -> OpenAIImageResample:
+    normalized = value.lower()
+    if normalized not in {"lanczos", "bicubic", "bilinear", "box"}:
+        raise ValueError("OPENAI_IMAGE_RESAMPLE must be 'lanczos', 'bicubic', 'bilinear', or 'box'")
+    return cast(OpenAIImageResample, normalized)
+
+
+def _parse_openai_image_quality(value: int) -> int:
+    if not 1 <= value <= 100:
+        raise ValueError("OPENAI_IMAGE_QUALITY must be between 1 and 100")
+    return value
+
+
+def _parse_vision_backend(value: str) -> VisionBackendName:
+    normalized = value.lower()
+    if normalized not in {"openai", "openai_compatible", "fake"}:
+        raise ValueError("VISION_BACKEND must be 'openai', 'openai_compatible', or 'fake'")
+    return cast(VisionBackendName, normalized)
+
+
+def _parse_fingerprint_mode(value: str) -> FingerprintMode:
+    normalized = value.lower()
+    if normalized not in {"off", "prioritize", "act"}:
+        raise ValueError("FINGERPRINT_MODE must be 'off', 'prioritize', or 'act'")
+    return cast(FingerprintMode, normalized)
+
+
+def _parse_report_media_mode(value: str) -> ReportMediaMode:
+    normalized = value.lower()
+    if normalized not in {"original", "thumbnails", "contact_sheet"}:
+        raise ValueError("REPORT_MEDIA_MODE must be 'original', 'thumbnails', or 'contact_sheet'")
+    return cast(ReportMediaMode, normalized)
+
+
+def _parse_shard_ids(value: str, shard_count: int | None) -> tuple[int, ...] | None:
+    """Parse SHARD_IDS such as "0,1,4-7"; empty means every shard."""
+    if not value.strip():
+        return None
+    if not shard_count:
+        raise ValueError("SHARD_IDS requires SHARD_COUNT")
+    shard_ids: set[int] = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            shard_ids.update(range(int(first), int(last) + 1))
+        else:
+            shard_ids.add(int(part))
+    if any(shard_id < 0 or shard_id >= shard_count for shard_id in shard_ids):
+        raise ValueError("SHARD_IDS must be between 0 and SHARD_COUNT - 1")
+    return tuple(sorted(shard_ids))
+
+
 def _parse_multi_server_overrides(payload: dict[str, Any]) -> SettingsOverrides:
     if "action_high" in payload and not isinstance(payload["action_high"], str):
         raise ValueError("action_high must be a string")
     if "action_medium" in payload and not isinstance(payload["action_medium"], str):
         raise ValueError("action_medium must be a string")
     return SettingsOverrides(
+        vision_backend=_as_optional_str(payload.get("vision_backend", UNSET)),
         openai_api_key=_as_optional_str(payload.get("openai_api_key", UNSET)),
+        openai_base_url=_as_optional_str(payload.get("openai_base_url", UNSET)),
         openai_model=_as_optional_str(payload.get("openai_model", UNSET)),
         openai_image_detail=_as_optional_str(payload.get("openai_image_detail", UNSET)),
         openai_max_image_dim=_as_optional_int(payload.get("openai_max_image_dim", UNSET)),
+        openai_image_format=_as_optional_str(payload.get("openai_image_format", UNSET)),
+        openai_image_quality=_as_optional_int(payload.get("openai_image_quality", UNSET)),
+        openai_image_resample=_as_optional_str(payload.get("openai_image_resample", UNSET)),
+        openai_image_reducing_gap=_as_optional_float(payload.get("openai_image_reducing_gap", UNSET)),
+        openai_tile_aspect_ratio=_as_optional_float(payload.get("openai_tile_aspect_ratio", UNSET)),
+        openai_max_tiles=_as_optional_int(payload.get("openai_max_tiles", UNSET)),
         min_image_count=_as_optional_int(payload.get("min_image_count", UNSET)),
         max_images_to_analyze=_as_optional_int(payload.get("max_images_to_analyze", UNSET)),
         parallel_image_classification=_as_optional_bool(
             payload.get("parallel_image_classification", UNSET)
         ),
+        composite_image_classification=_as_optional_bool(
+            payload.get("composite_image_classification", UNSET)
+        ),
         action_high=_as_optional_action_high(payload.get("action_high", UNSET)),
         action_medium=_as_optional_action_medium(payload.get("action_medium", UNSET)),
         confidence_high=_as_optional_float(payload.get("confidence_high", UNSET)),
@@ -192,12 +355,18 @@ def _parse_multi_server_overrides(payload: dict[str, Any]) -> SettingsOverrides:
         mod_role_id=_as_optional_int(payload.get("mod_role_id", UNSET)),
         report_high=_as_optional_bool(payload.get("report_high", UNSET)),
         report_cooldown_s=_as_optional_float(payload.get("report_cooldown_s", UNSET)),
+        report_media_mode=_as_optional_str(payload.get("report_media_mode", UNSET)),
         message_processing_delay_s=_as_optional_float(payload.get("message_processing_delay_s", UNSET)),
+        wave_window_s=_as_optional_float(payload.get("wave_window_s", UNSET)),
+        cleanup_window_s=_as_optional_float(payload.get("cleanup_window_s", UNSET)),
+        fingerprint_mode=_as_optional_str(payload.get("fingerprint_mode", UNSET)),
         softban_delete_days=_as_optional_int(payload.get("softban_delete_days", UNSET)),
         hash_only_mode=_as_optional_bool(payload.get("hash_only_mode", UNSET)),
         debug_logs=_as_optional_bool(payload.get("debug_logs", UNSET)),
         download_timeout_s=_as_optional_float(payload.get("download_timeout_s", UNSET)),
         max_image_bytes=_as_optional_int(payload.get("max_image_bytes", UNSET)),
+        download_via_media_proxy=_as_optional_bool(payload.get("download_via_media_proxy", UNSET)),
+        media_proxy_validate=_as_optional_bool(payload.get("media_proxy_validate", UNSET)),
     )
 
 
@@ -276,6 +445,19 @@ def _load_multi_server_config(path: str | None) -> dict[int, SettingsOverrides]:
     return config
 
 
+def reload_multi_server_config(settings: Settings) -> Settings:
+    """Settings with the multi-server config re-read; raises ValueError if it is invalid.
+
+    Environment variables are not re-read. Every guild in the new file is resolved once so
+    a bad override is rejected here rather than when that guild's next message arrives.
+    """
+    multi_server_config = _load_multi_server_config(settings.multi_server_config_path)
+    reloaded = replace(settings, multi_server_config=multi_server_config)
+    for guild_id in multi_server_config:
+        resolve_settings(reloaded, guild_id)
+    return reloaded
+
+
 def _resolve_value(override: Any | object, fallback: Any) -> Any:
     return fallback if override is UNSET else override
 
@@ -293,13 +475,22 @@ def resolve_settings(base: Settings, guild_id: int) -> ResolvedSettings:
     if not overrides:
         return ResolvedSettings(
             discord_token=base.discord_token,
+            vision_backend=base.vision_backend,
             openai_api_key=base.openai_api_key,
+            openai_base_url=base.openai_base_url,
             openai_model=base.openai_model,
             openai_image_detail=base.openai_image_detail,
             openai_max_image_dim=base.openai_max_image_dim,
+            openai_image_format=base.openai_image_format,
+            openai_image_quality=base.openai_image_quality,
+            openai_image_resample=base.openai_image_resample,
+            openai_image_reducing_gap=base.openai_image_reducing_gap,
+            openai_tile_aspect_ratio=base.openai_tile_aspect_ratio,
+            openai_max_tiles=base.openai_max_tiles,
             min_image_count=base.min_image_count,
             max_images_to_analyze=base.max_images_to_analyze,
             parallel_image_classification=base.parallel_image_classification,
+            composite_image_classification=base.composite_image_classification,
             action_high=base.action_high,
             action_medium=base.action_medium,
             confidence_high=base.confidence_high,
@@ -308,12 +499,18 @@ def resolve_settings(base: Settings, guild_id: int) -> ResolvedSettings:
             mod_role_id=base.mod_role_id,
             report_high=base.report_high,
             report_cooldown_s=base.report_cooldown_s,
+            report_media_mode=base.report_media_mode,
             message_processing_delay_s=base.message_processing_delay_s,
+            wave_window_s=base.wave_window_s,
+            cleanup_window_s=base.cleanup_window_s,
+            fingerprint_mode=base.fingerprint_mode,
             softban_delete_days=base.softban_delete_days,
             hash_only_mode=base.hash_only_mode,
             debug_logs=base.debug_logs,
             download_timeout_s=base.download_timeout_s,
             max_image_bytes=base.max_image_bytes,
+            download_via_media_proxy=base.download_via_media_proxy,
+            media_proxy_validate=base.media_proxy_validate,
         )
 
     action_high = base.action_high
@@ -326,7 +523,11 @@ def resolve_settings(base: Settings, guild_id: int) -> ResolvedSettings:
 
     return ResolvedSettings(
         discord_token=base.discord_token,
+        vision_backend=_parse_vision_backend(
+            _resolve_required("vision_backend", overrides.vision_backend, base.vision_backend)
+        ),
         openai_api_key=_resolve_value(overrides.openai_api_key, base.openai_api_key),
+        openai_base_url=_resolve_value(overrides.openai_base_url, base.openai_base_url),
         openai_model=_resolve_required("openai_model", overrides.openai_model, base.openai_model),
         openai_image_detail=_parse_openai_image_detail(
             _resolve_required(
@@ -340,6 +541,42 @@ def resolve_settings(base: Settings, guild_id: int) -> ResolvedSettings:
             overrides.openai_max_image_dim,
             base.openai_max_image_dim,
         ),
+        openai_image_format=_parse_openai_image_format(
+            _resolve_required(
+                "openai_image_format",
+                overrides.openai_image_format,
+                base.openai_image_format,
+            )
+        ),
+        openai_image_quality=_parse_openai_image_quality(
+            _resolve_required(
+                "openai_image_quality",
+                overrides.openai_image_quality,
+                base.openai_image_quality,
+            )
+        ),
+        openai_image_resample=_parse_openai_image_resample(
+            _resolve_required(
+                "openai_image_resample",
+                overrides.openai_image_resample,
+                base.openai_image_resample,
+            )
+        ),
+        openai_image_reducing_gap=_resolve_required(
+            "openai_image_reducing_gap",
+            overrides.openai_image_reducing_gap,
+            base.openai_image_reducing_gap,
+        ),
+        openai_tile_aspect_ratio=_resolve_required(
+            "openai_tile_aspect_ratio",
+            overrides.openai_tile_aspect_ratio,
+            base.openai_tile_aspect_ratio,
+        ),
+        openai_max_tiles=_resolve_required(
+            "openai_max_tiles",
+            overrides.openai_max_tiles,
+            base.openai_max_tiles,
+        ),
         min_image_count=_resolve_required("min_image_count", overrides.min_image_count, base.min_image_count),
         max_images_to_analyze=_resolve_required(
             "max_images_to_analyze",
@@ -351,6 +588,11 @@ def resolve_settings(base: Settings, guild_id: int) -> ResolvedSettings:
             overrides.parallel_image_classification,
             base.parallel_image_classification,
         ),
+        composite_image_classification=_resolve_required(
+            "composite_image_classification",
+            overrides.composite_image_classification,
+            base.composite_image_classification,
+        ),
         action_high=action_high,
         action_medium=action_medium,
         confidence_high=_resolve_required(
@@ -371,11 +613,35 @@ def resolve_settings(base: Settings, guild_id: int) -> ResolvedSettings:
             overrides.report_cooldown_s,
             base.report_cooldown_s,
         ),
+        report_media_mode=_parse_report_media_mode(
+            _resolve_required(
+                "report_media_mode",
+                overrides.report_media_mode,
+                base.report_media_mode,
+            )
+        ),
         message_processing_delay_s=_resolve_required(
             "message_processing_delay_s",
             overrides.message_processing_delay_s,
             base.message_processing_delay_s,
         ),
+        wave_window_s=_resolve_required(
+            "wave_window_s",
+            overrides.wave_window_s,
+            base.wave_window_s,
+        ),
+        cleanup_window_s=_resolve_required(
+            "cleanup_window_s",
+            overrides.cleanup_window_s,
+            base.cleanup_window_s,
+        ),
+        fingerprint_mode=_parse_fingerprint_mode(
+            _resolve_required(
+                "fingerprint_mode",
+                overrides.fingerprint_mode,
+                base.fingerprint_mode,
+            )
+        ),
         softban_delete_days=_resolve_required(
             "softban_delete_days",
             overrides.softban_delete_days,
@@ -393,6 +659,16 @@ def resolve_settings(base: Settings, guild_id: int) -> ResolvedSettings:
             overrides.max_image_bytes,
             base.max_image_bytes,
         ),
+        download_via_media_proxy=_resolve_required(
+            "download_via_media_proxy",
+            overrides.download_via_media_proxy,
+            base.download_via_media_proxy,
+        ),
+        media_proxy_validate=_resolve_required(
+            "media_proxy_validate",
+            overrides.media_proxy_validate,
+            base.media_proxy_validate,
+        ),
     )
 
 
@@ -416,16 +692,30 @@ def load_settings() -> Settings:
 
     multi_server_config = _load_multi_server_config(multi_server_config_path)
 
+    shard_count_value = _env_optional("SHARD_COUNT")
+    shard_count = int(shard_count_value) if shard_count_value else None
+    shard_ids = _parse_shard_ids(_env("SHARD_IDS", ""), shard_count)
+
     return Settings(
         discord_token=discord_token,
+        vision_backend=_parse_vision_backend(_env("VISION_BACKEND", "openai")),
         openai_api_key=openai_api_key,
+        openai_base_url=_env_optional("OPENAI_BASE_URL"),
         openai_model=_env("OPENAI_MODEL", "gpt-4.1-mini"),
         openai_image_detail=_parse_openai_image_detail(_env("OPENAI_IMAGE_DETAIL", "low")),
         openai_max_image_dim=_env_int("OPENAI_MAX_IMAGE_DIM", 512),
+        openai_image_format=_parse_openai_image_format(_env("OPENAI_IMAGE_FORMAT", "jpeg")),
+        openai_image_quality=_parse_openai_image_quality(_env_int("OPENAI_IMAGE_QUALITY", 82)),
+        openai_image_resample=_parse_openai_image_resample(_env("OPENAI_IMAGE_RESAMPLE", "bicubic")),
+        openai_image_reducing_gap=_env_float("OPENAI_IMAGE_REDUCING_GAP", 2.0),
+        openai_tile_aspect_ratio=_env_float("OPENAI_TILE_ASPECT_RATIO", 0.0),
+        openai_max_tiles=_env_int("OPENAI_MAX_TILES", 6),
         min_image_count=_env_int("MIN_IMAGE_COUNT", 3),
         max_images_to_analyze=_env_int("MAX_IMAGES_TO_ANALYZE", 4),
         parallel_image_classification=_env_bool("PARALLEL_IMAGE_CLASSIFICATION", False),
+        composite_image_classification=_env_bool("COMPOSITE_IMAGE_CLASSIFICATION", False),
         known_bad_hash_path=_env("KNOWN_BAD_HASH_PATH", "data/bad_hashes.txt"),
+        known_bad_fingerprint_path=_env("KNOWN_BAD_FINGERPRINT_PATH", "data/bad_fingerprints.txt"),
         action_high=action_high,
         action_medium=action_medium,
         confidence_high=_env_float("CONFIDENCE_HIGH", 0.85),
@@ -434,13 +724,41 @@ def load_settings() -> Settings:
         mod_role_id=int(mod_role_value) if mod_role_value else None,
         report_high=_env_bool("REPORT_HIGH", True),
         report_cooldown_s=_env_float("REPORT_COOLDOWN_S", 20.0),
+        report_media_mode=_parse_report_media_mode(_env("REPORT_MEDIA_MODE", "original")),
         report_store_ttl_hours=_env_int("REPORT_STORE_TTL_HOURS", 24),
+        report_thumbnail_dim=_env_int("REPORT_THUMBNAIL_DIM", 512),
         message_processing_delay_s=_env_float("MESSAGE_PROCESSING_DELAY_S", 0.0),
+        wave_window_s=_env_float("WAVE_WINDOW_S", 0.0),
+        cleanup_window_s=_env_float("CLEANUP_WINDOW_S", 0.0),
+        fingerprint_mode=_parse_fingerprint_mode(_env("FINGERPRINT_MODE", "off")),
         softban_delete_days=_env_int("SOFTBAN_DELETE_DAYS", 1),
         hash_only_mode=_env_bool("HASH_ONLY_MODE", False),
         debug_logs=_env_bool("DEBUG_LOGS", False),
         download_timeout_s=_env_float("DOWNLOAD_TIMEOUT_S", 8.0),
         max_image_bytes=_env_int("MAX_IMAGE_BYTES", 5_000_000),
+        download_via_media_proxy=_env_bool("DOWNLOAD_VIA_MEDIA_PROXY", False),
+        media_proxy_validate=_env_bool("MEDIA_PROXY_VALIDATE", False),
+        download_concurrency=_env_int("DOWNLOAD_CONCURRENCY", 8),
+        download_budget_bytes=_env_int("DOWNLOAD_BUDGET_BYTES", 50_000_000),
+        queue_workers=_env_int("QUEUE_WORKERS", 4),
+        queue_max_depth=_env_int("QUEUE_MAX_DEPTH", 1000),
+        queue_max_per_guild=_env_int("QUEUE_MAX_PER_GUILD", 200),
+        queue_hash_only_depth=_env_int("QUEUE_HASH_ONLY_DEPTH", 200),
+        action_concurrency=_env_int("ACTION_CONCURRENCY", 4),
+        report_concurrency=_env_int("REPORT_CONCURRENCY", 1),
+        member_cache_ttl_s=_env_float("MEMBER_CACHE_TTL_S", 60.0),
+        shard_count=shard_count,
+        shard_ids=shard_ids,
+        shard_processes=_env_int("SHARD_PROCESSES", 1),
+        config_reload_interval_s=_env_float("CONFIG_RELOAD_INTERVAL_S", 10.0),
+        metrics_host=_env("METRICS_HOST", "127.0.0.1"),
+        metrics_port=_env_int("METRICS_PORT", 0),
+        trace_sample_rate=_env_float("TRACE_SAMPLE_RATE", 0.0),
+        trace_slow_threshold_s=_env_float("TRACE_SLOW_THRESHOLD_S", 0.0),
+        loop_stall_threshold_s=_env_float("LOOP_STALL_THRESHOLD_S", 2.0),
+        health_stall_timeout_s=_env_float("HEALTH_STALL_TIMEOUT_S", 300.0),
+        vision_breaker_failures=_env_int("VISION_BREAKER_FAILURES", 0),
+        vision_breaker_reset_s=_env_float("VISION_BREAKER_RESET_S", 60.0),
         multi_server_config_path=multi_server_config_path,
         multi_server_config=multi_server_config,
     )
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import re
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Collection, Iterable, Literal, Sequence
 
 import logging
 import discord
 
 from discord_crypto_spam_destroyer.hashes.store import FileHashStore
 from discord_crypto_spam_destroyer.moderation.actions import apply_high_action
-from discord_crypto_spam_destroyer.utils.image import DownloadedImage, build_discord_files
+from discord_crypto_spam_destroyer.config import ReportMediaMode
+from discord_crypto_spam_destroyer.discord_ui.report_media import build_report_files
+from discord_crypto_spam_destroyer.utils.image import DownloadedImage
 from discord_crypto_spam_destroyer.discord_ui.report_store import ReportRecord, ReportStore
 
 logger = logging.getLogger("discord_crypto_spam_destroyer")
 
+EMBED_FIELD_LIMIT = 1024
+
 
 @dataclass
 class ReportContext:
@@ -30,7 +36,217 @@ class ReportContext:
     report_record: ReportRecord | None
 
 
+ReportAction = Literal["kick", "ban", "ignore", "add_hashes"]
+
+REPORT_BUTTONS: dict[str, tuple[str, discord.ButtonStyle]] = {
+    "kick": ("Kick", discord.ButtonStyle.danger),
+    "ban": ("Ban", discord.ButtonStyle.danger),
+    "ignore": ("No action necessary", discord.ButtonStyle.secondary),
+    "add_hashes": ("Add Hashes", discord.ButtonStyle.primary),
+}
+
+
+async def ensure_report_permissions(
+    interaction: discord.Interaction,
+    mod_role_id: int | None,
+    permission: str,
+) -> bool:
+    if not interaction.user or not isinstance(interaction.user, discord.Member):
+        await interaction.response.send_message(
+            "Permissions check failed.", ephemeral=True
+        )
+        return False
+    if mod_role_id:
+        if interaction.user.get_role(mod_role_id) is None:
+            await interaction.response.send_message("Missing Mod role.", ephemeral=True)
+            return False
+    if permission == "kick" and not interaction.user.guild_permissions.kick_members:
+        await interaction.response.send_message("Missing kick permission.", ephemeral=True)
+        return False
+    if permission == "ban" and not interaction.user.guild_permissions.ban_members:
+        await interaction.response.send_message("Missing ban permission.", ephemeral=True)
+        return False
+    return True
+
+
+async def run_report_action(
+    interaction: discord.Interaction,
+    action: ReportAction,
+    guild: discord.Guild,
+    author_id: int,
+    mod_role_id: int | None,
+    kick_disabled: bool,
+    allow_hash_add: bool,
+    all_hashes: Sequence[str],
+    hash_store: FileHashStore,
+) -> str | None:
+    """Carry out a report button press; None when the presser lacks permission."""
+    if action == "ignore":
+        logger.info("Mod action: no action necessary pressed by %s", interaction.user)
+        return "No action necessary"
+    if action == "ban":
+        if not await ensure_report_permissions(interaction, mod_role_id, "ban"):
+            return None
+        logger.info("Mod action: ban pressed by %s", interaction.user)
+        success = await apply_high_action(guild, author_id, "ban", "Manual mod action from report")
+        return "Banned" if success else "Ban failed or user gone"
+    if not await ensure_report_permissions(interaction, mod_role_id, "kick"):
+        return None
+    if action == "kick":
+        if kick_disabled:
+            return "Kick disabled for auto-actions"
+        logger.info("Mod action: kick pressed by %s", interaction.user)
+        success = await apply_high_action(guild, author_id, "kick", "Manual mod action from report")
+        return "Kicked" if success else "Kick failed or user gone"
+    existing = hash_store.load()
+    new_hashes = [phash for phash in all_hashes if phash not in existing]
+    already_known = len(all_hashes) - len(new_hashes)
+    if not allow_hash_add:
+        logger.info("Mod action: add hashes pressed by %s (disabled)", interaction.user)
+        return "Hash add disabled" if new_hashes else "Hashes already known"
+    if not new_hashes:
+        logger.info("Mod action: add hashes pressed by %s (no-op)", interaction.user)
+        return "Hashes already known"
+    await asyncio.to_thread(hash_store.add_many, new_hashes)
+    added = len(new_hashes)
+    logger.info(
+        "Mod action: add hashes pressed by %s (%s added, %s known)",
+        interaction.user,
+        added,
+        already_known,
+    )
+    added_label = "hash" if added == 1 else "hashes"
+    if already_known:
+        known_label = "hash" if already_known == 1 else "hashes"
+        return f"Added {added} {added_label} ({already_known} already known {known_label})"
+    return f"Added {added} {added_label}"
+
+
+async def finalize_report(
+    interaction: discord.Interaction,
+    view: discord.ui.View | None,
+    result: str,
+    report_store: ReportStore,
+    report_message_id: int | None,
+) -> None:
+    if view is not None:
+        for child in view.children:
+            if isinstance(child, discord.ui.DynamicItem):
+                child = child.item
+            if isinstance(child, discord.ui.Button):
+                child.disabled = True
+    actor = interaction.user.mention if interaction.user else "Unknown"
+    action_text = f"Action by {actor}: {result}"
+    if report_message_id is not None:
+        await asyncio.to_thread(report_store.delete_report, report_message_id)
+    if interaction.message and interaction.message.embeds:
+        embed = interaction.message.embeds[0]
+        updated = False
+        for index, field in enumerate(embed.fields):
+            field_name = field.name or ""
+            if field_name.lower() == "action taken":
+                prior = field.value or "none"
+                combined = f"{prior}, {action_text}" if prior and prior.lower() != "none" else action_text
+                embed.set_field_at(index, name=field_name, value=combined, inline=field.inline)
+                updated = True
+                break
+        if not updated:
+            embed.add_field(name="Action taken", value=action_text, inline=False)
+        if interaction.response.is_done():
+            await interaction.edit_original_response(embed=embed, view=view)
+        else:
+            await interaction.response.edit_message(embed=embed, view=view)
+        return
+    content = interaction.message.content if interaction.message else ""
+    updated_content = (
+        f"{content}\n\n{action_text}" if content else action_text
+    )
+    if interaction.response.is_done():
+        await interaction.edit_original_response(content=updated_content, view=view)
+    else:
+        await interaction.response.edit_message(content=updated_content, view=view)
+
+
+class ReportButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"report:(?P<action>kick|ban|ignore|add_hashes):(?P<key>[0-9]+)",
+):
+    """Report button that carries only its action and report key.
+
+    Registered once with `Client.add_dynamic_items`; the report record is loaded from the
+    client's `report_store` when the button is pressed.
+    """
+
+    def __init__(
+        self,
+        action: ReportAction,
+        report_key: int,
+        label: str | None = None,
+        disabled: bool = False,
+    ) -> None:
+        default_label, style = REPORT_BUTTONS[action]
+        super().__init__(
+            discord.ui.Button(
+                label=label or default_label,
+                style=style,
+                custom_id=f"report:{action}:{report_key}",
+                disabled=disabled,
+            )
+        )
+        self.action: ReportAction = action
+        self.report_key = report_key
+
+    @classmethod
+    async def from_custom_id(
+        cls,
+        interaction: discord.Interaction,
+        item: discord.ui.Item,
+        match: re.Match[str],
+    ) -> ReportButton:
+        label = item.label if isinstance(item, discord.ui.Button) else None
+        return cls(match["action"], int(match["key"]), label=label)  # type: ignore[arg-type]
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        report_store: ReportStore = interaction.client.report_store  # type: ignore[attr-defined]
+        hash_store: FileHashStore = interaction.client.hash_store  # type: ignore[attr-defined]
+        record = await asyncio.to_thread(report_store.get_report_by_key, self.report_key)
+        if record is None or interaction.guild is None:
+            await interaction.response.send_message("This report is no longer active.", ephemeral=True)
+            return
+        result = await run_report_action(
+            interaction,
+            self.action,
+            interaction.guild,
+            record.author_id,
+            record.mod_role_id,
+            record.kick_disabled,
+            record.allow_hash_add,
+            record.all_hashes,
+            hash_store,
+        )
+        if result is None:
+            return
+        await finalize_report(interaction, self.view, result, report_store, record.message_id)
+
+
+def build_report_view(report_key: int, kick_disabled: bool, allow_hash_add: bool) -> discord.ui.View:
+    view = discord.ui.View(timeout=None)
+    view.add_item(ReportButton("kick", report_key, disabled=kick_disabled))
+    view.add_item(ReportButton("ban", report_key))
+    view.add_item(ReportButton("ignore", report_key))
+    if allow_hash_add:
+        view.add_item(ReportButton("add_hashes", report_key))
+    else:
+        view.add_item(ReportButton("add_hashes", report_key, label="Hashes already known", disabled=True))
+    # A stopped view is not kept in the client's view store after sending; presses are
+    # routed to ReportButton through its custom_id template instead.
+    view.stop()
+    return view
+
+
 class ReportView(discord.ui.View):
+    """Buttons of reports sent before ReportButton; restored per message on startup."""
+
     def __init__(
         self,
         context: ReportContext,
@@ -46,58 +262,23 @@ class ReportView(discord.ui.View):
                 if not context.allow_hash_add:
                     child.label = "Hashes already known"
 
-    async def _ensure_permissions(self, interaction: discord.Interaction, permission: str) -> bool:
-        if not interaction.user or not isinstance(interaction.user, discord.Member):
-            await interaction.response.send_message(
-                "Permissions check failed.", ephemeral=True
-            )
-            return False
-        if self.context.mod_role_id:
-            if not any(role.id == self.context.mod_role_id for role in interaction.user.roles):
-                await interaction.response.send_message("Missing Mod role.", ephemeral=True)
-                return False
-        if permission == "kick" and not interaction.user.guild_permissions.kick_members:
-            await interaction.response.send_message("Missing kick permission.", ephemeral=True)
-            return False
-        if permission == "ban" and not interaction.user.guild_permissions.ban_members:
-            await interaction.response.send_message("Missing ban permission.", ephemeral=True)
-            return False
-        return True
-
-    async def _finalize_action(self, interaction: discord.Interaction, result: str) -> None:
-        for child in self.children:
-            if isinstance(child, discord.ui.Button):
-                child.disabled = True
-        actor = interaction.user.mention if interaction.user else "Unknown"
-        action_text = f"Action by {actor}: {result}"
-        if self.context.report_record:
-            self.context.report_store.delete_report(self.context.report_record.message_id)
-        if interaction.message and interaction.message.embeds:
-            embed = interaction.message.embeds[0]
-            updated = False
-            for index, field in enumerate(embed.fields):
-                field_name = field.name or ""
-                if field_name.lower() == "action taken":
-                    prior = field.value or "none"
-                    combined = f"{prior}, {action_text}" if prior and prior.lower() != "none" else action_text
-                    embed.set_field_at(index, name=field_name, value=combined, inline=field.inline)
-                    updated = True
-                    break
-            if not updated:
-                embed.add_field(name="Action taken", value=action_text, inline=False)
-            if interaction.response.is_done():
-                await interaction.edit_original_response(embed=embed, view=self)
-            else:
-                await interaction.response.edit_message(embed=embed, view=self)
-            return
-        content = interaction.message.content if interaction.message else ""
-        updated_content = (
-            f"{content}\n\n{action_text}" if content else action_text
+    async def _handle(self, interaction: discord.Interaction, action: ReportAction) -> None:
+        context = self.context
+        result = await run_report_action(
+            interaction,
+            action,
+            context.guild,
+            context.author.id,
+            context.mod_role_id,
+            context.kick_disabled,
+            context.allow_hash_add,
+            context.all_hashes,
+            context.hash_store,
         )
-        if interaction.response.is_done():
-            await interaction.edit_original_response(content=updated_content, view=self)
-        else:
-            await interaction.response.edit_message(content=updated_content, view=self)
+        if result is None:
+            return
+        report_message_id = context.report_record.message_id if context.report_record else None
+        await finalize_report(interaction, self, result, context.report_store, report_message_id)
 
     @discord.ui.button(label="Kick", style=discord.ButtonStyle.danger, custom_id="report_kick")
     async def kick_button(
@@ -105,20 +286,7 @@ class ReportView(discord.ui.View):
         interaction: discord.Interaction,
         button: discord.ui.Button,
     ) -> None:
-        if not await self._ensure_permissions(interaction, "kick"):
-            return
-        if self.context.kick_disabled:
-            await self._finalize_action(interaction, "Kick disabled for auto-actions")
-            return
-        logger.info("Mod action: kick pressed by %s", interaction.user)
-        success = await apply_high_action(
-            self.context.guild,
-            self.context.author.id,
-            "kick",
-            "Manual mod action from report",
-        )
-        result = "Kicked" if success else "Kick failed or user gone"
-        await self._finalize_action(interaction, result)
+        await self._handle(interaction, "kick")
 
     @discord.ui.button(label="Ban", style=discord.ButtonStyle.danger, custom_id="report_ban")
     async def ban_button(
@@ -126,17 +294,7 @@ class ReportView(discord.ui.View):
         interaction: discord.Interaction,
         button: discord.ui.Button,
     ) -> None:
-        if not await self._ensure_permissions(interaction, "ban"):
-            return
-        logger.info("Mod action: ban pressed by %s", interaction.user)
-        success = await apply_high_action(
-            self.context.guild,
-            self.context.author.id,
-            "ban",
-            "Manual mod action from report",
-        )
-        result = "Banned" if success else "Ban failed or user gone"
-        await self._finalize_action(interaction, result)
+        await self._handle(interaction, "ban")
 
     @discord.ui.button(
         label="No action necessary",
@@ -148,8 +306,7 @@ class ReportView(discord.ui.View):
         interaction: discord.Interaction,
         button: discord.ui.Button,
     ) -> None:
-        logger.info("Mod action: no action necessary pressed by %s", interaction.user)
-        await self._finalize_action(interaction, "No action necessary")
+        await self._handle(interaction, "ignore")
 
     @discord.ui.button(label="Add Hashes", style=discord.ButtonStyle.primary, custom_id="report_add_hashes")
     async def add_hash_button(
@@ -157,39 +314,7 @@ class ReportView(discord.ui.View):
         interaction: discord.Interaction,
         button: discord.ui.Button,
     ) -> None:
-        if not await self._ensure_permissions(interaction, "kick"):
-            return
-        existing = self.context.hash_store.load()
-        new_hashes = [phash for phash in self.context.all_hashes if phash not in existing]
-        already_known = len(self.context.all_hashes) - len(new_hashes)
-        if not self.context.allow_hash_add:
-            logger.info("Mod action: add hashes pressed by %s (disabled)", interaction.user)
-            if not new_hashes:
-                await self._finalize_action(interaction, "Hashes already known")
-            else:
-                await self._finalize_action(interaction, "Hash add disabled")
-            return
-        if not new_hashes:
-            logger.info("Mod action: add hashes pressed by %s (no-op)", interaction.user)
-            await self._finalize_action(interaction, "Hashes already known")
-            return
-        added = 0
-        for phash in new_hashes:
-            self.context.hash_store.add(phash)
-            added += 1
-        logger.info(
-            "Mod action: add hashes pressed by %s (%s added, %s known)",
-            interaction.user,
-            added,
-            already_known,
-        )
-        added_label = "hash" if added == 1 else "hashes"
-        if already_known:
-            known_label = "hash" if already_known == 1 else "hashes"
-            result = f"Added {added} {added_label} ({already_known} already known {known_label})"
-        else:
-            result = f"Added {added} {added_label}"
-        await self._finalize_action(interaction, result)
+        await self._handle(interaction, "add_hashes")
 
 
 def build_report_embed(
@@ -201,6 +326,7 @@ def build_report_embed(
     action_suggestion: str,
     action_taken: str,
     author_roles: str,
+    wave_text: str | None = None,
 ) -> discord.Embed:
     reason_text = ", ".join(reasons) if reasons else "none"
     suggested = f"`{action_suggestion}`" if action_suggestion.startswith("/") else action_suggestion
@@ -220,9 +346,31 @@ def build_report_embed(
     embed.add_field(name="Indicators", value=indicators, inline=False)
     embed.add_field(name="Suggested", value=suggested, inline=False)
     embed.add_field(name="Action taken", value=action_taken, inline=False)
+    if wave_text:
+        embed.add_field(name="Spam wave", value=wave_text, inline=False)
     return embed
 
 
+def build_wave_text(messages: Sequence[discord.Message], deleted_ids: Collection[int]) -> str:
+    channels = {message.channel.id for message in messages}
+    header = (
+        f"{len(messages)} messages in {len(channels)} channels, "
+        f"{sum(1 for message in messages if message.id in deleted_ids)} deleted"
+    )
+    lines = [header]
+    length = len(header)
+    for index, message in enumerate(messages):
+        status = "deleted" if message.id in deleted_ids else "not deleted"
+        line = f"<#{message.channel.id}> {message.jump_url} ({status})"
+        # Embed field values are capped at 1024 characters.
+        if length + len(line) + 40 > EMBED_FIELD_LIMIT:
+            lines.append(f"... and {len(messages) - index} more")
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
 def build_indicator_text(domains: Iterable[str], amounts: Iterable[str], wallets: Iterable[str]) -> str:
     parts = []
     if domains:
@@ -234,5 +382,9 @@ def build_indicator_text(domains: Iterable[str], amounts: Iterable[str], wallets
     return " | ".join(parts) if parts else "none"
 
 
-def build_mod_files(images: Iterable[DownloadedImage]) -> list[discord.File]:
-    return build_discord_files(images)
+def build_mod_files(
+    images: Iterable[DownloadedImage],
+    mode: ReportMediaMode = "original",
+    thumbnail_dim: int = 512,
+) -> list[discord.File]:
+    return build_report_files(images, mode, thumbnail_dim)
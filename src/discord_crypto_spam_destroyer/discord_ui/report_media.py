@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import logging
+import math
+from io import BytesIO
+from typing import Iterable
+
+import discord
+from PIL import Image
+
+from discord_crypto_spam_destroyer.config import ReportMediaMode
+from discord_crypto_spam_destroyer.utils.image import (
+    DownloadedImage,
+    ImageEncoderOptions,
+    build_discord_files,
+    render_montage,
+)
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+REPORT_MEDIA_OPTIONS = ImageEncoderOptions(format="jpeg", quality=80)
+CONTACT_SHEET_MAX_DIM = 2048
+
+
+def _thumbnail(image: DownloadedImage, max_dim: int) -> Image.Image | None:
+    try:
+        with Image.open(BytesIO(image.data)) as original:
+            original.draft("RGB", (max_dim, max_dim))
+            decoded = original.convert("RGB")
+    except Exception:
+        return None
+    decoded.thumbnail((max_dim, max_dim), Image.Resampling.BICUBIC, reducing_gap=2.0)
+    return decoded
+
+
+def _jpeg_file(image: Image.Image, filename: str) -> discord.File:
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=REPORT_MEDIA_OPTIONS.quality)
+    buffer.seek(0)
+    return discord.File(fp=buffer, filename=filename)
+
+
+def build_report_files(
+    images: Iterable[DownloadedImage],
+    mode: ReportMediaMode,
+    thumbnail_dim: int,
+) -> list[discord.File]:
+    """Attachments for a mod report. Blocking (decodes and re-encodes); run in a thread.
+
+    Images that cannot be decoded are attached as originals.
+    """
+    images = list(images)
+    if mode == "original" or not images:
+        return build_discord_files(images)
+    thumbnails = [_thumbnail(image, thumbnail_dim) for image in images]
+    undecodable = [image for image, thumb in zip(images, thumbnails) if thumb is None]
+    decoded = [thumb for thumb in thumbnails if thumb is not None]
+    files: list[discord.File] = []
+    if mode == "contact_sheet" and len(decoded) > 1:
+        columns = math.ceil(math.sqrt(len(decoded)))
+        canvas_dim = min(thumbnail_dim * columns, CONTACT_SHEET_MAX_DIM)
+        sheet = render_montage(decoded, canvas_dim, REPORT_MEDIA_OPTIONS)
+        if sheet is not None:
+            files.append(_jpeg_file(sheet, "contact_sheet.jpg"))
+    else:
+        files.extend(
+            _jpeg_file(thumb, f"thumb_{index}.jpg") for index, thumb in enumerate(decoded, start=1)
+        )
+    files.extend(build_discord_files(undecodable))
+    return files
+
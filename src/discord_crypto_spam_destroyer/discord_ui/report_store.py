@@ -1,10 +1,45 @@
 from __future__ import annotations
 
 import json
+import sqlite3
+import threading
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    message_id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    guild_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    mod_role_id INTEGER,
+    allow_hash_add INTEGER NOT NULL,
+    kick_disabled INTEGER NOT NULL,
+    all_hashes TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_guild_id ON reports (guild_id);
+CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at);
+"""
+
+# Applied in order on top of SCHEMA; PRAGMA user_version records how many have run.
+MIGRATIONS: tuple[tuple[str, ...], ...] = (
+    (
+        "ALTER TABLE reports ADD COLUMN report_key INTEGER",
+        "CREATE INDEX IF NOT EXISTS reports_report_key ON reports (report_key)",
+    ),
+)
+# Other shard processes may hold the write lock briefly; wait rather than fail.
+BUSY_TIMEOUT_MS = 5000
+
+COLUMNS = (
+    "message_id, channel_id, guild_id, author_id, mod_role_id, "
+    "allow_hash_add, kick_disabled, all_hashes, created_at, report_key"
+)
+PLACEHOLDERS = ", ".join("?" for _ in COLUMNS.split(","))
 
 
 @dataclass(frozen=True)
@@ -18,64 +53,167 @@ class ReportRecord:
     kick_disabled: bool
     all_hashes: list[str]
     created_at: float
+    # Encoded in the report buttons' custom_ids; None for reports sent with a ReportView.
+    report_key: int | None = None
+
+
+def _to_row(record: ReportRecord) -> tuple[object, ...]:
+    return (
+        record.message_id,
+        record.channel_id,
+        record.guild_id,
+        record.author_id,
+        record.mod_role_id,
+        int(record.allow_hash_add),
+        int(record.kick_disabled),
+        json.dumps(record.all_hashes),
+        record.created_at,
+        record.report_key,
+    )
+
+
+def _from_row(row: tuple) -> ReportRecord:
+    return ReportRecord(
+        message_id=row[0],
+        channel_id=row[1],
+        guild_id=row[2],
+        author_id=row[3],
+        mod_role_id=row[4],
+        allow_hash_add=bool(row[5]),
+        kick_disabled=bool(row[6]),
+        all_hashes=list(json.loads(row[7])),
+        created_at=row[8],
+        report_key=row[9],
+    )
 
 
 class ReportStore:
-    def __init__(self, path: Path) -> None:
+    """Open mod reports in SQLite (WAL), one row per report message.
+
+    If `legacy_path` points at the old JSON store, its reports are imported once and the
+    file is renamed to `*.migrated`.
+    """
+
+    def __init__(self, path: Path, legacy_path: Path | None = None) -> None:
         self._path = path
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # Calls come from the event loop and from worker threads; the lock serializes them.
+        # Other processes sharing the file are serialized by SQLite itself.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate_schema()
+        if legacy_path is not None and legacy_path.exists():
+            self._migrate_json(legacy_path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self, immediate: bool = False) -> Iterator[None]:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so concurrent starters run one at a time.
+            self._conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _migrate_schema(self) -> None:
+        with self._transaction(immediate=True):
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            for migration in MIGRATIONS[version:]:
+                for statement in migration:
+                    self._conn.execute(statement)
+            self._conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
 
     def load_reports(self) -> list[ReportRecord]:
-        if not self._path.exists():
-            return []
-        payload = json.loads(self._path.read_text(encoding="utf-8"))
-        records = []
-        for item in payload.get("reports", []):
-            records.append(
-                ReportRecord(
-                    message_id=int(item["message_id"]),
-                    channel_id=int(item["channel_id"]),
-                    guild_id=int(item["guild_id"]),
-                    author_id=int(item["author_id"]),
-                    mod_role_id=int(item["mod_role_id"]) if item.get("mod_role_id") else None,
-                    allow_hash_add=bool(item.get("allow_hash_add", True)),
-                    kick_disabled=bool(item.get("kick_disabled", False)),
-                    all_hashes=list(item.get("all_hashes", [])),
-                    created_at=float(item.get("created_at", time.time())),
-                )
-            )
-        return records
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM reports ORDER BY created_at"
+            ).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def load_legacy_reports(self) -> list[ReportRecord]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM reports WHERE report_key IS NULL ORDER BY created_at"
+            ).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def get_report_by_key(self, report_key: int) -> ReportRecord | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {COLUMNS} FROM reports WHERE report_key = ? ORDER BY created_at DESC LIMIT 1",
+                (report_key,),
+            ).fetchone()
+        return _from_row(row) if row else None
+
+    def get_report(self, message_id: int) -> ReportRecord | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {COLUMNS} FROM reports WHERE message_id = ?",
+                (message_id,),
+            ).fetchone()
+        return _from_row(row) if row else None
 
     def save_report(self, record: ReportRecord) -> None:
-        reports = self.load_reports()
-        reports = [r for r in reports if r.message_id != record.message_id]
-        reports.append(record)
-        self._write(reports)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO reports ({COLUMNS}) VALUES ({PLACEHOLDERS})",
+                _to_row(record),
+            )
 
     def delete_report(self, message_id: int) -> None:
-        reports = [r for r in self.load_reports() if r.message_id != message_id]
-        self._write(reports)
-
-    def prune(self, max_age_s: float) -> None:
-        now = time.time()
-        reports = [r for r in self.load_reports() if now - r.created_at <= max_age_s]
-        self._write(reports)
-
-    def _write(self, records: Iterable[ReportRecord]) -> None:
-        payload = {
-            "reports": [
-                {
-                    "message_id": record.message_id,
-                    "channel_id": record.channel_id,
-                    "guild_id": record.guild_id,
-                    "author_id": record.author_id,
-                    "mod_role_id": record.mod_role_id,
-                    "allow_hash_add": record.allow_hash_add,
-                    "kick_disabled": record.kick_disabled,
-                    "all_hashes": record.all_hashes,
-                    "created_at": record.created_at,
-                }
-                for record in records
-            ]
-        }
-        self._path.parent.mkdir(parents=True, exist_ok=True)
-        self._path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        self.delete_reports([message_id])
+
+    def delete_reports(self, message_ids: Iterable[int]) -> None:
+        with self._transaction():
+            self._conn.executemany(
+                "DELETE FROM reports WHERE message_id = ?",
+                [(message_id,) for message_id in message_ids],
+            )
+
+    def prune(self, max_age_s: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM reports WHERE created_at < ?",
+                (time.time() - max_age_s,),
+            )
+        return cursor.rowcount
+
+    def _migrate_json(self, legacy_path: Path) -> None:
+        try:
+            payload = json.loads(legacy_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            # Another process migrated it first.
+            return
+        records = [
+            ReportRecord(
+                message_id=int(item["message_id"]),
+                channel_id=int(item["channel_id"]),
+                guild_id=int(item["guild_id"]),
+                author_id=int(item["author_id"]),
+                mod_role_id=int(item["mod_role_id"]) if item.get("mod_role_id") else None,
+                allow_hash_add=bool(item.get("allow_hash_add", True)),
+                kick_disabled=bool(item.get("kick_disabled", False)),
+                all_hashes=list(item.get("all_hashes", [])),
+                created_at=float(item.get("created_at", time.time())),
+            )
+            for item in payload.get("reports", [])
+        ]
+        with self._transaction():
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO reports ({COLUMNS}) VALUES ({PLACEHOLDERS})",
+                [_to_row(record) for record in records],
+            )
+        try:
+            legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+        except FileNotFoundError:
+            pass
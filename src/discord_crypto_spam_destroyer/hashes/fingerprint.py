@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AbstractSet, Iterable, Sequence
+
+import discord
+
+from discord_crypto_spam_destroyer.utils.files import LineSetFile
+
+
+def attachment_fingerprint(attachment: discord.Attachment) -> str | None:
+    """`size:width:height:content_type` from upload metadata, or None when any is unknown."""
+    content_type = (attachment.content_type or "").split(";", 1)[0].strip()
+    if not attachment.size or not attachment.width or not attachment.height or not content_type:
+        return None
+    return f"{attachment.size}:{attachment.width}:{attachment.height}:{content_type}"
+
+
+def match_fingerprints(
+    attachments: Sequence[discord.Attachment],
+    known_bad: AbstractSet[str],
+) -> bool:
+    """True only when every image attachment is a known repost."""
+    if not attachments or not known_bad:
+        return False
+    return all(attachment_fingerprint(attachment) in known_bad for attachment in attachments)
+
+
+class FingerprintStore(ABC):
+    @abstractmethod
+    def load(self) -> set[str]:
+        ...
+
+    @abstractmethod
+    def cached(self) -> AbstractSet[str]:
+        """The fingerprints as of the last `load` or `add_many`, without any I/O."""
+        ...
+
+    @abstractmethod
+    def add_many(self, fingerprints: Iterable[str]) -> None:
+        ...
+
+
+@dataclass
+class FileFingerprintStore(FingerprintStore):
+    path: Path
+    _file: LineSetFile = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._file = LineSetFile(self.path)
+
+    def load(self) -> set[str]:
+        return self._file.load()
+
+    def cached(self) -> AbstractSet[str]:
+        return self._file.cached()
+
+    def add_many(self, fingerprints: Iterable[str]) -> None:
+        self._file.add_many(fingerprints)
@@ -8,9 +8,13 @@ import imagehash
 
 Image.MAX_IMAGE_PIXELS = 100_000_000
 
+def phash_image(image: Image.Image) -> str:
+    return str(imagehash.phash(image))
+
+
 def compute_phash(image_bytes: bytes) -> str:
     with Image.open(BytesIO(image_bytes)) as image:
-        return str(imagehash.phash(image))
+        return phash_image(image)
 
 
 def compute_phashes(images: Iterable[bytes]) -> list[str]:
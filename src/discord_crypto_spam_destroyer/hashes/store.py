@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Iterable
 
 from discord_crypto_spam_destroyer.models import HashMatch
+from discord_crypto_spam_destroyer.utils.files import LineSetFile
 
 
 class HashStore:
@@ -14,25 +15,26 @@ class HashStore:
     def add(self, phash: str) -> None:
         raise NotImplementedError
 
+    def add_many(self, phashes: Iterable[str]) -> int:
+        raise NotImplementedError
+
 
 @dataclass
 class FileHashStore(HashStore):
     path: Path
+    _file: LineSetFile = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._file = LineSetFile(self.path)
 
     def load(self) -> set[str]:
-        if not self.path.exists():
-            return set()
-        content = self.path.read_text(encoding="utf-8")
-        return {line.strip() for line in content.splitlines() if line.strip()}
+        return self._file.load()
 
     def add(self, phash: str) -> None:
-        existing = self.load()
-        if phash in existing:
-            return
-        existing.add(phash)
-        sorted_hashes = sorted(existing)
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.path.write_text("\n".join(sorted_hashes) + "\n", encoding="utf-8")
+        self._file.add_many([phash])
+
+    def add_many(self, phashes: Iterable[str]) -> int:
+        return self._file.add_many(phashes)
 
 
 def match_hashes(candidates: Iterable[str], known_bad: set[str]) -> HashMatch:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from discord_crypto_spam_destroyer.config import load_settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+# Gateway identifies are rate limited per bot; spacing out process starts avoids collisions.
+LAUNCH_STAGGER_S = 5.0
+POLL_INTERVAL_S = 1.0
+
+
+def shard_ranges(shard_count: int, processes: int) -> list[range]:
+    """Split shards 0..shard_count-1 into contiguous ranges, one per process."""
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    ranges: list[range] = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+
+def _spawn(shards: range, index: int, metrics_port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["SHARD_IDS"] = f"{shards.start}-{shards.stop - 1}"
+    if metrics_port:
+        # Each process serves its own metrics on consecutive ports.
+        env["METRICS_PORT"] = str(metrics_port + index)
+    logger.info("Starting bot process for shards %s", env["SHARD_IDS"])
+    return subprocess.Popen([sys.executable, "-m", "discord_crypto_spam_destroyer.bot"], env=env)
+
+
+def _terminate(processes: list[subprocess.Popen]) -> None:
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    """Run SHARD_COUNT shards across SHARD_PROCESSES bot processes on this host.
+
+    The processes share the hash, fingerprint and report stores under data/. If one exits,
+    the others are stopped and the launcher exits with its code so a supervisor restarts all.
+    """
+    settings = load_settings()
+    if not settings.shard_count:
+        raise SystemExit("SHARD_COUNT is required for the launcher")
+    processes: list[subprocess.Popen] = []
+    stopping = False
+
+    def _stop(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    for index, shards in enumerate(shard_ranges(settings.shard_count, settings.shard_processes)):
+        if index:
+            time.sleep(LAUNCH_STAGGER_S)
+        if stopping:
+            break
+        processes.append(_spawn(shards, index, settings.metrics_port))
+    exit_code = 0
+    while not stopping:
+        exited = [process for process in processes if process.poll() is not None]
+        if exited:
+            exit_code = exited[0].returncode
+            logger.error("Bot process %s exited with %s; stopping the others", exited[0].pid, exit_code)
+            break
+        time.sleep(POLL_INTERVAL_S)
+    _terminate(processes)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,9 @@ class VisionResult:
     confidence: float
     reasons: Sequence[str]
     indicators: VisionIndicators
+    # Reported by OpenAI-style backends; None when the backend does not say.
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
 
 
 @dataclass(frozen=True)
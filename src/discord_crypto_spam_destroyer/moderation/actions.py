@@ -1,17 +1,98 @@
 from __future__ import annotations
 
-from typing import Literal
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, Literal, TypeVar
 
 import discord
 
 ActionHigh = Literal["kick", "ban", "report_only", "softban"]
 
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+T = TypeVar("T")
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY_S = 1.0
+RETRY_MAX_DELAY_S = 30.0
+
+# Set by ActionScheduler to the attempt number of the job it is running. with_retries then
+# raises RetryLater instead of sleeping, so the worker is free for other calls meanwhile.
+scheduled_attempt: ContextVar[int | None] = ContextVar(
+    "discord_crypto_spam_destroyer_scheduled_attempt", default=None
+)
+
+
+class RetryLater(Exception):
+    """A scheduled call hit a retryable error; run the whole job again after `delay_s`.
+
+    Only raised for jobs that make a single REST call; see `retry_in_place`.
+    """
+
+    def __init__(self, delay_s: float, status: int) -> None:
+        super().__init__(f"Discord returned {status}, retry in {delay_s:.1f}s")
+        self.delay_s = delay_s
+        self.status = status
+
+
+@contextmanager
+def retry_in_place() -> Iterator[None]:
+    """Back off inside the current job instead of re-running it from the scheduler.
+
+    For jobs making several REST calls, where re-running the whole job would repeat
+    the calls that already went through.
+    """
+    token = scheduled_attempt.set(None)
+    try:
+        yield
+    finally:
+        scheduled_attempt.reset(token)
+
+
+def _retry_delay(exc: discord.HTTPException, attempt: int) -> float:
+    headers = getattr(exc.response, "headers", None) or {}
+    retry_after = headers.get("Retry-After")
+    try:
+        if retry_after is not None:
+            return min(float(retry_after), RETRY_MAX_DELAY_S)
+    except ValueError:
+        pass
+    return min(RETRY_BASE_DELAY_S * 2**attempt, RETRY_MAX_DELAY_S)
+
+
+async def with_retries(call: Callable[[], Awaitable[T]], attempts: int = RETRY_ATTEMPTS) -> T:
+    """Retry rate-limited (429) and server-error (5xx) responses with backoff.
+
+    discord.py already waits out ordinary rate limits; this covers the 429s it gives up
+    on during sustained throttling, plus transient gateway errors. Inside a scheduled job
+    the backoff is left to the scheduler (see `scheduled_attempt`).
+    """
+    scheduled = scheduled_attempt.get()
+    for attempt in range(min(scheduled or 0, attempts - 1), attempts):
+        try:
+            return await call()
+        except discord.HTTPException as exc:
+            retryable = exc.status == 429 or exc.status >= 500
+            if not retryable or attempt == attempts - 1:
+                raise
+            delay = _retry_delay(exc, attempt)
+            if scheduled is not None:
+                raise RetryLater(delay, exc.status) from exc
+            logger.info("Discord returned %s, retrying in %.1fs", exc.status, delay)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
 
 async def safe_delete(message: discord.Message) -> bool:
     try:
-        await message.delete()
+        await with_retries(message.delete)
         return True
-    except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+    except discord.NotFound:
+        return False
+    except (discord.Forbidden, discord.HTTPException) as exc:
+        logger.info("Delete of message %s failed: %s", message.id, exc)
         return False
 
 
@@ -27,17 +108,19 @@ async def safe_kick(guild: discord.Guild, user_id: int, reason: str) -> bool:
     if member is None:
         return False
     try:
-        await guild.kick(member, reason=reason)
+        await with_retries(lambda: guild.kick(member, reason=reason))
         return True
-    except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+    except (discord.NotFound, discord.Forbidden, discord.HTTPException) as exc:
+        logger.info("Kick of %s failed: %s", user_id, exc)
         return False
 
 
 async def safe_unban(guild: discord.Guild, user_id: int, reason: str) -> bool:
     try:
-        await guild.unban(discord.Object(id=user_id), reason=reason)
+        await with_retries(lambda: guild.unban(discord.Object(id=user_id), reason=reason))
         return True
-    except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+    except (discord.NotFound, discord.Forbidden, discord.HTTPException) as exc:
+        logger.info("Unban of %s failed: %s", user_id, exc)
         return False
 
 
@@ -45,11 +128,14 @@ async def safe_ban(guild: discord.Guild, user_id: int, reason: str, delete_days:
     target = guild.get_member(user_id) or discord.Object(id=user_id)
     try:
         if delete_days is not None:
-            await guild.ban(target, reason=reason, delete_message_days=delete_days)
+            await with_retries(
+                lambda: guild.ban(target, reason=reason, delete_message_days=delete_days)
+            )
         else:
-            await guild.ban(target, reason=reason)
+            await with_retries(lambda: guild.ban(target, reason=reason))
         return True
-    except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+    except (discord.NotFound, discord.Forbidden, discord.HTTPException) as exc:
+        logger.info("Ban of %s failed: %s", user_id, exc)
         return False
 
 
@@ -63,9 +149,10 @@ async def apply_high_action(
     if action == "report_only":
         return True
     if action == "softban":
-        if not await safe_ban(guild, user_id, reason, delete_days=softban_delete_days):
-            return False
-        return await safe_unban(guild, user_id, reason)
+        with retry_in_place():
+            if not await safe_ban(guild, user_id, reason, delete_days=softban_delete_days):
+                return False
+            return await safe_unban(guild, user_id, reason)
     if action == "ban":
         return await safe_ban(guild, user_id, reason)
     return await safe_kick(guild, user_id, reason)
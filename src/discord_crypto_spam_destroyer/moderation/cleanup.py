@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+import discord
+
+from discord_crypto_spam_destroyer.moderation.actions import retry_in_place, with_retries
+from discord_crypto_spam_destroyer.pipeline.recent import RecentMessage
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+# Discord's bulk delete endpoint accepts at most 100 messages per call.
+BULK_DELETE_LIMIT = 100
+
+
+def group_by_channel(entries: Iterable[RecentMessage]) -> dict[int, list[int]]:
+    channels: dict[int, list[int]] = defaultdict(list)
+    for entry in entries:
+        channels[entry.channel_id].append(entry.message_id)
+    return dict(channels)
+
+
+async def bulk_delete_recent(
+    guild: discord.Guild,
+    entries: Iterable[RecentMessage],
+    reason: str,
+) -> int:
+    """Delete messages with one bulk call per channel (per 100); returns how many went."""
+    deleted = 0
+    # Re-running the job after a 429 would re-send chunks that already went.
+    with retry_in_place():
+        for channel_id, message_ids in group_by_channel(entries).items():
+            channel = guild.get_channel_or_thread(channel_id)
+            if not isinstance(channel, (discord.TextChannel, discord.Thread, discord.VoiceChannel)):
+                continue
+            for start in range(0, len(message_ids), BULK_DELETE_LIMIT):
+                chunk = [
+                    discord.Object(id=message_id)
+                    for message_id in message_ids[start : start + BULK_DELETE_LIMIT]
+                ]
+                try:
+                    # One request at a time so discord.py's per-route rate limiting applies.
+                    await with_retries(lambda: channel.delete_messages(chunk, reason=reason))
+                except discord.NotFound:
+                    # A lone message that is already gone; bulk deletes ignore unknown ids.
+                    continue
+                except (discord.Forbidden, discord.HTTPException) as exc:
+                    logger.info("Bulk delete in channel %s failed: %s", channel_id, exc)
+                    break
+                deleted += len(chunk)
+    return deleted
@@ -1,6 +1,29 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+from typing import Iterable
+
 from discord_crypto_spam_destroyer.models import ConfidenceBand, Decision, VisionResult
+from discord_crypto_spam_destroyer.utils.image import DownloadedImage
+
+
+@dataclass
+class Verdict:
+    """A flagged message: what to do about it and what its mod report shows.
+
+    `high_action_reason` is None for verdicts that only delete and report.
+    """
+
+    label: str
+    confidence: float
+    high_action_reason: str | None
+    report: bool = True
+    vision_result: VisionResult | None = None
+    downloaded: list[DownloadedImage] = field(default_factory=list)
+    all_hashes: list[str] = field(default_factory=list)
+    reason_override: str | None = None
+    allow_hash_add: bool = True
+    action_suggestion: str | None = None
 
 
 def confidence_band(confidence: float, high: float, medium: float) -> ConfidenceBand:
@@ -25,3 +48,16 @@ def decision_from_result(
 
     reason = "model_high_confidence" if band == ConfidenceBand.HIGH else "model_medium_confidence"
     return Decision(is_scam=True, confidence_band=band, reason=reason)
+
+
+def merge_vision_results(results: Iterable[VisionResult]) -> VisionResult | None:
+    best_scam: VisionResult | None = None
+    best_non_scam: VisionResult | None = None
+    for result in results:
+        if result.is_crypto_scam:
+            if best_scam is None or result.confidence > best_scam.confidence:
+                best_scam = result
+        else:
+            if best_non_scam is None or result.confidence > best_non_scam.confidence:
+                best_non_scam = result
+    return best_scam or best_non_scam
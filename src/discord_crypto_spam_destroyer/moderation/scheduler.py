@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import itertools
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable, Literal
+
+from discord_crypto_spam_destroyer.moderation.actions import RetryLater, scheduled_attempt
+from discord_crypto_spam_destroyer.telemetry.metrics import ACTION_SECONDS, ACTIONS
+from discord_crypto_spam_destroyer.telemetry.tracing import span
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+ActionKind = Literal["delete", "moderate", "report"]
+
+# Lower runs first: clearing scam content matters more than removing the account,
+# which matters more than telling the mods about it.
+ACTION_PRIORITIES: dict[str, int] = {"delete": 0, "moderate": 1, "report": 2}
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    sequence: int
+    kind: str = field(compare=False)
+    bucket: Hashable = field(compare=False)
+    call: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future[Any] = field(compare=False)
+    attempt: int = field(default=0, compare=False)
+    # Loop time before which a job backing off must not run again.
+    not_before: float = field(default=0.0, compare=False)
+
+
+class ActionScheduler:
+    """Runs Discord moderation calls by priority, one at a time per rate-limit bucket.
+
+    Buckets approximate Discord's per-route limits (e.g. deletes per channel, kicks/bans
+    per guild), so a burst against one route queues up instead of tripping 429s, while
+    other routes keep moving. At most `report_concurrency` workers send reports (large
+    uploads) at once, and a job backing off after a 429/5xx is re-queued rather than
+    sleeping in its worker; it keeps its bucket until it runs again.
+    """
+
+    def __init__(self, concurrency: int = 4, report_concurrency: int = 1) -> None:
+        self.concurrency = max(1, concurrency)
+        self.limits: dict[str, int] = {"report": max(1, min(report_concurrency, self.concurrency))}
+        self.outcomes: Counter[tuple[str, str]] = Counter()
+        self._pending: list[_Job] = []
+        self._busy: set[Hashable] = set()
+        self._running: Counter[str] = Counter()
+        self._sequence = itertools.count()
+        self._changed = asyncio.Condition()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def run(
+        self,
+        kind: ActionKind,
+        bucket: Hashable,
+        call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Queue `call` and wait for its result; exceptions propagate to the caller.
+
+        If the caller is cancelled before the call starts, it is dropped from the queue.
+        """
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        job = _Job(ACTION_PRIORITIES[kind], next(self._sequence), kind, (kind, bucket), call, future)
+        async with self._changed:
+            bisect.insort(self._pending, job)
+            self._changed.notify()
+        with ACTION_SECONDS.time(kind=kind), span("action", kind=kind) as action_span:
+            try:
+                result = await future
+            except asyncio.CancelledError:
+                self._drop(job)
+                raise
+            action_span.set(outcome="failed" if result is False else "ok")
+            return result
+
+    def _drop(self, job: _Job) -> None:
+        if job in self._pending:
+            self._pending.remove(job)
+            self._record(job.kind, "cancelled")
+            if job.attempt:
+                # A backing-off job still holds its bucket.
+                self._busy.discard(job.bucket)
+
+    def _record(self, kind: str, outcome: str) -> None:
+        self.outcomes[(kind, outcome)] += 1
+        ACTIONS.inc(kind=kind, outcome=outcome)
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{kind} {outcome}={count}" for (kind, outcome), count in sorted(self.outcomes.items())
+        )
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._pending:
+            job.future.cancel()
+        self._pending.clear()
+
+    def _take(self) -> tuple[_Job | None, float | None]:
+        """Next runnable job, else how long until a backing-off job becomes runnable."""
+        now = asyncio.get_running_loop().time()
+        wait_s: float | None = None
+        for index, job in enumerate(self._pending):
+            if job.not_before > now:
+                delay = job.not_before - now
+                wait_s = delay if wait_s is None else min(wait_s, delay)
+                continue
+            if self._running[job.kind] >= self.limits.get(job.kind, self.concurrency):
+                continue
+            # Retried jobs kept their bucket while waiting.
+            if job.attempt == 0 and job.bucket in self._busy:
+                continue
+            del self._pending[index]
+            self._busy.add(job.bucket)
+            self._running[job.kind] += 1
+            return job, None
+        return None, wait_s
+
+    async def _next_job(self) -> _Job:
+        async with self._changed:
+            while True:
+                job, wait_s = self._take()
+                if job is not None:
+                    return job
+                try:
+                    await asyncio.wait_for(self._changed.wait(), wait_s)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._next_job()
+            if job.future.done():
+                # The caller gave up while the job was backing off.
+                await self._finish(job, release_bucket=True)
+                continue
+            token = scheduled_attempt.set(job.attempt)
+            release_bucket = True
+            try:
+                result = await job.call()
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except RetryLater as exc:
+                self._record(job.kind, "retry")
+                logger.info(
+                    "%s call got %s, retrying in %.1fs", job.kind, exc.status, exc.delay_s
+                )
+                job.attempt += 1
+                job.not_before = asyncio.get_running_loop().time() + exc.delay_s
+                release_bucket = False
+                async with self._changed:
+                    bisect.insort(self._pending, job)
+            except Exception as exc:
+                self._record(job.kind, "error")
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                self._record(job.kind, "failed" if result is False else "ok")
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                scheduled_attempt.reset(token)
+                await self._finish(job, release_bucket)
+
+    async def _finish(self, job: _Job, release_bucket: bool) -> None:
+        async with self._changed:
+            self._running[job.kind] -= 1
+            if release_bucket:
+                self._busy.discard(job.bucket)
+            self._changed.notify_all()
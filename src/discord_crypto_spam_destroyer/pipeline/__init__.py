@@ -0,0 +1 @@
+"""Message processing pipeline."""
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+# Called with `stale=True` when the message changed while it was out of discord.py's cache,
+# so the locally held copy can no longer be trusted.
+DelayedCallback = Callable[[bool], Awaitable[None]]
+
+
+@dataclass
+class _Pending:
+    due: float
+    callback: DelayedCallback
+    stale: bool = False
+
+
+class DelayScheduler:
+    """Runs per-message callbacks after a delay from a single timer task.
+
+    Messages deleted while waiting are discarded, so nothing has to be re-fetched to find
+    out they are gone. Discarded entries stay in the heap and are skipped when they expire.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, _Pending] = {}
+        self._heap: list[tuple[float, int, int]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._timer: asyncio.Task[None] | None = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, message_id: int, delay_s: float, callback: DelayedCallback) -> None:
+        due = time.monotonic() + delay_s
+        self._entries[message_id] = _Pending(due, callback)
+        heapq.heappush(self._heap, (due, next(self._sequence), message_id))
+        self._wakeup.set()
+
+    def discard(self, message_id: int) -> bool:
+        return self._entries.pop(message_id, None) is not None
+
+    def mark_stale(self, message_id: int) -> None:
+        entry = self._entries.get(message_id)
+        if entry is not None:
+            entry.stale = True
+
+    def start(self) -> None:
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = list(self._running)
+        if self._timer is not None:
+            tasks.append(self._timer)
+            self._timer = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._entries.clear()
+        self._heap.clear()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            due, _, message_id = self._heap[0]
+            remaining = due - time.monotonic()
+            if remaining > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            entry = self._entries.get(message_id)
+            if entry is None or entry.due != due:
+                # Discarded, or rescheduled with a later due time.
+                continue
+            del self._entries[message_id]
+            task = asyncio.create_task(self._fire(message_id, entry))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, message_id: int, entry: _Pending) -> None:
+        try:
+            await entry.callback(entry.stale)
+        except Exception:
+            logger.exception("Delayed processing of message %s failed", message_id)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from discord_crypto_spam_destroyer.telemetry.metrics import QUEUE_WAIT_SECONDS
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+# A job receives `degraded=True` when the backlog is deep enough that it should skip vision.
+Job = Callable[[bool], Awaitable[object]]
+
+
+@dataclass
+class QueueStats:
+    submitted: int = 0
+    processed: int = 0
+    degraded: int = 0
+    dropped: int = 0
+    failed: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+    def record_wait(self, wait_s: float) -> None:
+        self.wait_total_s += wait_s
+        self.wait_max_s = max(self.wait_max_s, wait_s)
+
+    @property
+    def wait_avg_s(self) -> float:
+        return self.wait_total_s / self.processed if self.processed else 0.0
+
+
+@dataclass
+class _Item:
+    job: Job
+    enqueued_at: float
+
+
+class FairWorkQueue:
+    """Per-guild FIFO queues served round-robin by a fixed pool of workers.
+
+    Each guild with pending work holds exactly one slot in the rotation, so a raid in one
+    guild only ever occupies its own turn. Past `max_depth` (total) or `max_per_guild`
+    new jobs are dropped; once the backlog reaches `hash_only_depth` jobs run degraded.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_depth: int,
+        hash_only_depth: int = 0,
+        max_per_guild: int = 0,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.hash_only_depth = hash_only_depth
+        self.max_per_guild = max_per_guild
+        self.stats = QueueStats()
+        self._queues: dict[int, deque[_Item]] = {}
+        self._turns: asyncio.Queue[int] = asyncio.Queue()
+        self._depth = 0
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def oldest_wait_s(self) -> float:
+        """How long the longest-waiting queued job has been waiting (0 when empty)."""
+        enqueued = [item.enqueued_at for queue in self._queues.values() for item in queue]
+        return time.monotonic() - min(enqueued) if enqueued else 0.0
+
+    def guild_depth(self, guild_id: int) -> int:
+        queue = self._queues.get(guild_id)
+        return len(queue) if queue else 0
+
+    def submit(self, guild_id: int, job: Job, priority: bool = False) -> bool:
+        """Queue a job for `guild_id`; returns False when it was shed.
+
+        Priority jobs jump ahead of the guild's backlog and ignore the per-guild cap.
+        """
+        self.stats.submitted += 1
+        if self.max_depth > 0 and self._depth >= self.max_depth:
+            self.stats.dropped += 1
+            return False
+        if (
+            not priority
+            and self.max_per_guild > 0
+            and self.guild_depth(guild_id) >= self.max_per_guild
+        ):
+            self.stats.dropped += 1
+            return False
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = self._queues[guild_id] = deque()
+            self._turns.put_nowait(guild_id)
+        item = _Item(job, time.monotonic())
+        if priority:
+            queue.appendleft(item)
+        else:
+            queue.append(item)
+        self._depth += 1
+        return True
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            guild_id = await self._turns.get()
+            queue = self._queues[guild_id]
+            item = queue.popleft()
+            if queue:
+                self._turns.put_nowait(guild_id)
+            else:
+                del self._queues[guild_id]
+            degraded = 0 < self.hash_only_depth <= self._depth
+            self._depth -= 1
+            self.stats.processed += 1
+            wait_s = time.monotonic() - item.enqueued_at
+            self.stats.record_wait(wait_s)
+            QUEUE_WAIT_SECONDS.observe(wait_s, guild=guild_id)
+            if degraded:
+                self.stats.degraded += 1
+            try:
+                await item.job(degraded)
+            except Exception:
+                self.stats.failed += 1
+                logger.exception("Queued job for guild %s failed", guild_id)
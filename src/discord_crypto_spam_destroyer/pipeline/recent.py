@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass
+
+RECENT_RETENTION_S = 900.0
+RECENT_MAX_PER_AUTHOR = 200
+
+AuthorKey = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class RecentMessage:
+    message_id: int
+    channel_id: int
+    seen_at: float
+
+
+class RecentMessageIndex:
+    """Recent messages per (guild, author), fed from gateway events.
+
+    Entries are kept for `retention_s`; deleted messages are dropped lazily when the
+    author's messages are next looked up.
+    """
+
+    def __init__(
+        self,
+        retention_s: float = RECENT_RETENTION_S,
+        max_per_author: int = RECENT_MAX_PER_AUTHOR,
+    ) -> None:
+        self.retention_s = retention_s
+        self.max_per_author = max_per_author
+        self._authors: dict[AuthorKey, deque[RecentMessage]] = {}
+        self._deleted: set[int] = set()
+        self._last_sweep = time.monotonic()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._authors.values())
+
+    def add(self, guild_id: int, author_id: int, message_id: int, channel_id: int) -> None:
+        now = time.monotonic()
+        key = (guild_id, author_id)
+        entries = self._authors.get(key)
+        if entries is None:
+            entries = self._authors[key] = deque(maxlen=self.max_per_author)
+        entries.append(RecentMessage(message_id, channel_id, now))
+        if now - self._last_sweep > self.retention_s:
+            self._sweep(now)
+
+    def discard(self, message_id: int) -> None:
+        self._deleted.add(message_id)
+
+    def recent(
+        self,
+        guild_id: int,
+        author_id: int,
+        within_s: float,
+        exclude: set[int] | None = None,
+    ) -> list[RecentMessage]:
+        entries = self._authors.get((guild_id, author_id))
+        if not entries:
+            return []
+        cutoff = time.monotonic() - min(within_s, self.retention_s)
+        exclude = exclude or set()
+        return [
+            entry
+            for entry in entries
+            if entry.seen_at >= cutoff
+            and entry.message_id not in self._deleted
+            and entry.message_id not in exclude
+        ]
+
+    def _sweep(self, now: float) -> None:
+        cutoff = now - self.retention_s
+        for key in list(self._authors):
+            entries = self._authors[key]
+            while entries and entries[0].seen_at < cutoff:
+                entries.popleft()
+            if not entries:
+                del self._authors[key]
+        live = {entry.message_id for entries in self._authors.values() for entry in entries}
+        self._deleted &= live
+        self._last_sweep = now
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+import discord
+
+Signature = tuple[tuple[int, int, int, str], ...]
+WaveKey = tuple[int, int, Signature]
+
+
+def attachment_signature(attachments: Iterable[discord.Attachment]) -> Signature:
+    """Cheap identity of a set of uploads; reposts of the same files share it."""
+    return tuple(
+        sorted(
+            (
+                attachment.size or 0,
+                attachment.width or 0,
+                attachment.height or 0,
+                attachment.content_type or "",
+            )
+            for attachment in attachments
+        )
+    )
+
+
+@dataclass
+class SpamWave:
+    """Messages from one author carrying the same attachments within the wave window.
+
+    The first message (the leader) goes through the normal pipeline; followers are held
+    until it has a verdict. `flagged` stays None while the leader is being processed.
+    """
+
+    key: WaveKey
+    leader: discord.Message
+    window_s: float
+    last_seen: float
+    followers: list[discord.Message] = field(default_factory=list)
+    deleted_ids: set[int] = field(default_factory=set)
+    flagged: bool | None = None
+
+    @property
+    def messages(self) -> list[discord.Message]:
+        return [self.leader, *self.followers]
+
+    def expired(self, now: float) -> bool:
+        return now - self.last_seen > self.window_s
+
+    async def wait_closed(self) -> None:
+        """Wait until no matching message has arrived for a full window."""
+        while True:
+            remaining = self.last_seen + self.window_s - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+
+class WaveAggregator:
+    def __init__(self) -> None:
+        self._waves: dict[WaveKey, SpamWave] = {}
+
+    def __len__(self) -> int:
+        return len(self._waves)
+
+    def join(
+        self,
+        message: discord.Message,
+        signature: Signature,
+        window_s: float,
+    ) -> tuple[SpamWave, bool]:
+        """Attach `message` to its author's open wave; returns (wave, is_leader)."""
+        now = time.monotonic()
+        self._prune(now)
+        assert message.guild is not None
+        key = (message.guild.id, message.author.id, signature)
+        wave = self._waves.get(key)
+        if wave is None:
+            wave = SpamWave(key=key, leader=message, window_s=window_s, last_seen=now)
+            self._waves[key] = wave
+            return wave, True
+        wave.last_seen = now
+        wave.followers.append(message)
+        return wave, False
+
+    def resolve(self, wave: SpamWave, flagged: bool) -> list[discord.Message]:
+        """Record the leader's verdict and hand back the followers held until now."""
+        wave.flagged = flagged
+        if not flagged:
+            # Later messages with the same attachments are processed on their own.
+            self._waves.pop(wave.key, None)
+        return list(wave.followers)
+
+    def _prune(self, now: float) -> None:
+        for key in [key for key, wave in self._waves.items() if wave.expired(now)]:
+            del self._waves[key]
@@ -0,0 +1 @@
+"""Runtime metrics and tracing."""
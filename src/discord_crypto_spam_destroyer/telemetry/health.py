@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from discord_crypto_spam_destroyer.telemetry.metrics import LOOP_LAG_SECONDS, LOOP_STALLS
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+LOOP_SAMPLE_INTERVAL_S = 0.5
+
+
+class LoopMonitor:
+    """Measures event loop scheduling delay and logs what is blocking it.
+
+    A task sleeps `interval_s` at a time and records how late it wakes up. A watchdog
+    thread checks that the task keeps ticking; once it has been late by `stall_threshold_s`,
+    the loop thread's current stack is logged, once per stall (0 disables the watchdog).
+    """
+
+    def __init__(
+        self,
+        stall_threshold_s: float,
+        interval_s: float = LOOP_SAMPLE_INTERVAL_S,
+    ) -> None:
+        self.stall_threshold_s = stall_threshold_s
+        self.interval_s = interval_s
+        self.lag_s = 0.0
+        self.max_lag_s = 0.0
+        self.stalls = 0
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    @property
+    def stalled_for_s(self) -> float:
+        """How far past its wake-up time the sampling task currently is."""
+        return max(0.0, time.monotonic() - self._last_tick - self.interval_s)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._task = asyncio.create_task(self._sample())
+        if self.stall_threshold_s > 0:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    async def _sample(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            now = time.monotonic()
+            self._last_tick = now
+            self.lag_s = max(0.0, now - expected)
+            self.max_lag_s = max(self.max_lag_s, self.lag_s)
+            LOOP_LAG_SECONDS.observe(self.lag_s)
+
+    def _watch(self) -> None:
+        reported = False
+        while not self._stopping.wait(min(self.interval_s, self.stall_threshold_s / 2)):
+            stalled_s = self.stalled_for_s
+            if stalled_s < self.stall_threshold_s:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+            self.stalls += 1
+            LOOP_STALLS.inc()
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            stack = "".join(traceback.format_stack(frame)) if frame else "  (unavailable)\n"
+            logger.warning(
+                "Event loop blocked for %.1fs; loop thread is at:\n%s", stalled_s, stack.rstrip()
+            )
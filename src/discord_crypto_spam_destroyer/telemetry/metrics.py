@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, Sequence
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+REQUEST_TIMEOUT_S = 5.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+
+    def _key(self, labels: dict[str, object]) -> LabelValues:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        ...
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket (non-cumulative) counts with a final +Inf slot, sum.
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def count(self, **labels: object) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> list[str]:
+        lines: list[str] = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics rendered together in the Prometheus text exposition format.
+
+    Collectors run right before rendering, for gauges read from other objects' state.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))  # type: ignore[return-value]
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception("Metrics collector failed")
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+DOWNLOAD_SECONDS = REGISTRY.histogram(
+    "spam_download_seconds", "Attachment download time per message.", ("guild",)
+)
+PREPARE_SECONDS = REGISTRY.histogram(
+    "spam_prepare_seconds",
+    "Image preparation time per message, by stage (hash, encode).",
+    ("guild", "stage"),
+)
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "spam_queue_wait_seconds", "Time a message waited in the work queue.", ("guild",)
+)
+VISION_SECONDS = REGISTRY.histogram(
+    "spam_vision_seconds", "Latency of one vision backend call.", ("guild", "backend")
+)
+ACTION_SECONDS = REGISTRY.histogram(
+    "spam_action_seconds",
+    "Discord moderation call time, including scheduler queueing.",
+    ("kind",),
+)
+REPORT_SECONDS = REGISTRY.histogram(
+    "spam_report_seconds", "Time from verdict to the mod report being sent.", ("guild",)
+)
+HASH_HITS = REGISTRY.counter(
+    "spam_hash_hits_total", "Messages matching a known bad hash or fingerprint.", ("guild", "source")
+)
+VERDICTS = REGISTRY.counter(
+    "spam_verdicts_total", "Vision verdicts by confidence band.", ("guild", "band")
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "spam_cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result")
+)
+API_ERRORS = REGISTRY.counter(
+    "spam_api_errors_total", "Failed calls to external APIs.", ("api", "kind")
+)
+VISION_TOKENS = REGISTRY.counter(
+    "spam_vision_tokens_total", "Tokens reported by the vision backend.", ("guild", "type")
+)
+ACTIONS = REGISTRY.counter(
+    "spam_actions_total", "Scheduled Discord calls by kind and outcome.", ("kind", "outcome")
+)
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "spam_loop_lag_seconds", "How late the event loop ran a sampling task."
+)
+LOOP_STALLS = REGISTRY.counter(
+    "spam_loop_stalls_total", "Times the event loop was blocked past the stall threshold."
+)
+BREAKER_OPEN = REGISTRY.gauge(
+    "spam_breaker_open", "1 while a circuit breaker is refusing calls.", ("breaker",)
+)
+QUEUE = REGISTRY.gauge("spam_queue", "Work queue depth and lifetime totals.", ("stat",))
+
+Route = Callable[[], Awaitable[tuple[int, str]]]
+
+
+class MetricsServer:
+    """Minimal HTTP/1.0 server for scrapes; answers GET requests from `routes` and closes."""
+
+    def __init__(self, host: str, port: int, registry: MetricsRegistry = REGISTRY) -> None:
+        self.host = host
+        self.port = port
+        self.routes: dict[str, Route] = {"/metrics": self._metrics}
+        # Routes not listed here are served as CONTENT_TYPE.
+        self.content_types: dict[str, str] = {}
+        self._registry = registry
+        self._server: asyncio.AbstractServer | None = None
+
+    async def _metrics(self) -> tuple[int, str]:
+        return 200, self._registry.render()
+
+    @property
+    def bound_port(self) -> int:
+        """The listening port, which differs from `port` when that was 0."""
+        if self._server is None or not self._server.sockets:
+            return self.port
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info("Serving metrics on http://%s:%s/metrics", self.host, self.bound_port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT_S)
+            # Drain the headers; none of them matter here.
+            while (await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT_S)).strip():
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) >= 2 else ""
+            route = self.routes.get(path)
+            if len(parts) < 2 or parts[0] != "GET":
+                status, body = 405, "method not allowed\n"
+            elif route is None:
+                status, body = 404, "not found\n"
+            else:
+                status, body = await route()
+            payload = body.encode("utf-8")
+            reason = {
+                200: "OK",
+                404: "Not Found",
+                405: "Method Not Allowed",
+                503: "Service Unavailable",
+            }.get(status, "Error")
+            content_type = self.content_types.get(path, CONTENT_TYPE) if route else CONTENT_TYPE
+            writer.write(
+                (
+                    f"HTTP/1.0 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n"
+                ).encode("latin-1")
+                + payload
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
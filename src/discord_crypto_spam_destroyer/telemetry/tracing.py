@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+trace_logger = logging.getLogger("discord_crypto_spam_destroyer.trace")
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    attrs: dict[str, Any] = field(default_factory=dict)
+    children: list[Span] = field(default_factory=list)
+    end: float | None = None
+    status: str = "ok"
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def to_dict(self, origin: float) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            # Spans still running when the trace is emitted (e.g. a spawned report) have no end.
+            "duration_ms": round((self.end - self.start) * 1000, 2) if self.end is not None else None,
+            "status": self.status if self.end is not None else "pending",
+        }
+        if self.attrs:
+            payload["attrs"] = self.attrs
+        if self.children:
+            payload["children"] = [child.to_dict(origin) for child in self.children]
+        return payload
+
+
+# Tasks and to_thread calls copy the context, so spans opened there nest under the caller's.
+_current: ContextVar[Span | None] = ContextVar("discord_crypto_spam_destroyer_span", default=None)
+
+
+class _NullSpan(Span):
+    """Yielded outside a trace so callers can always call `.set()`; records nothing."""
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_DISCARDED = _NullSpan("discarded", 0.0)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """Record a child of the current span; a no-op when no trace is active."""
+    parent = _current.get()
+    if parent is None:
+        yield _DISCARDED
+        return
+    child = Span(name, time.monotonic(), dict(attrs))
+    parent.children.append(child)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.status = "error"
+        child.attrs.setdefault("error", type(exc).__name__)
+        raise
+    finally:
+        child.end = time.monotonic()
+        _current.reset(token)
+
+
+class Tracer:
+    """Builds one span tree per message and logs it as a JSON line.
+
+    A trace is emitted for a `sample_rate` fraction of messages, and always when it took at
+    least `slow_threshold_s` (0 disables the slow rule). With both off nothing is recorded.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, slow_threshold_s: float = 0.0) -> None:
+        self.sample_rate = sample_rate
+        self.slow_threshold_s = slow_threshold_s
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_threshold_s > 0
+
+    @contextmanager
+    def trace(self, name: str, **attrs: Any) -> Iterator[Span]:
+        if not self.enabled or _current.get() is not None:
+            with span(name, **attrs) as nested:
+                yield nested
+            return
+        root = Span(name, time.monotonic(), dict(attrs))
+        sampled = random.random() < self.sample_rate
+        token = _current.set(root)
+        try:
+            yield root
+        except BaseException as exc:
+            root.status = "error"
+            root.attrs.setdefault("error", type(exc).__name__)
+            raise
+        finally:
+            root.end = time.monotonic()
+            _current.reset(token)
+            slow = 0 < self.slow_threshold_s <= root.end - root.start
+            if sampled or slow:
+                self.emit(root, slow)
+
+    def emit(self, root: Span, slow: bool) -> None:
+        payload = root.to_dict(root.start)
+        payload["slow"] = slow
+        trace_logger.info(json.dumps(payload, default=str, separators=(",", ":")))
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Iterable, Sequence
+
+import discord
+import httpx
+
+from discord_crypto_spam_destroyer.telemetry.tracing import span
+from discord_crypto_spam_destroyer.utils.image import DownloadedImage
+from discord_crypto_spam_destroyer.vision.tiling import should_tile
+
+MEDIA_PROXY_FORMAT = "webp"
+MEDIA_PROXY_SKIP_TYPES = {"image/gif"}
+
+
+def rendition_size(
+    width: int | None,
+    height: int | None,
+    max_dim: int,
+    tile_aspect_ratio: float = 0.0,
+) -> tuple[int, int] | None:
+    """Smallest size that still serves hashing and the OpenAI payload, or None for the original."""
+    if not width or not height or max_dim <= 0:
+        return None
+    if should_tile(width, height, max_dim, tile_aspect_ratio):
+        scale = max_dim / min(width, height)
+    else:
+        scale = max_dim / max(width, height)
+    if scale >= 1.0:
+        return None
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def media_proxy_url(attachment: discord.Attachment, size: tuple[int, int]) -> str | None:
+    content_type = (attachment.content_type or "").split(";", 1)[0].strip()
+    if not attachment.proxy_url or content_type in MEDIA_PROXY_SKIP_TYPES:
+        return None
+    width, height = size
+    url = httpx.URL(attachment.proxy_url).copy_merge_params(
+        {"width": width, "height": height, "format": MEDIA_PROXY_FORMAT}
+    )
+    return str(url)
+
+
+class ByteBudget:
+    """Caps the bytes buffered by in-flight downloads across all messages."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, amount: int) -> int:
+        # A single download larger than the whole budget still gets to run, alone.
+        amount = min(amount, self.limit)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight + amount <= self.limit)
+            self.in_flight += amount
+        return amount
+
+    def try_acquire(self, amount: int) -> bool:
+        """Take `amount` only if it fits right now; never waits."""
+        if self.in_flight + amount > self.limit:
+            return False
+        self.in_flight += amount
+        return True
+
+    async def release(self, amount: int) -> None:
+        async with self._condition:
+            self.in_flight -= amount
+            self._condition.notify_all()
+
+
+class _Reservation:
+    """One download's share of a ByteBudget, grown when the body outruns the estimate.
+
+    Only the initial reservation waits for budget. Growing never waits, since downloads
+    waiting on each other while holding bytes could stall until they all time out; a
+    download that cannot grow fails instead.
+    """
+
+    def __init__(self, budget: ByteBudget) -> None:
+        self.budget = budget
+        self.amount = 0
+
+    async def reserve(self, amount: int) -> None:
+        self.amount = await self.budget.acquire(amount)
+
+    def grow(self, amount: int) -> bool:
+        # Never more than the whole budget, which a lone oversized download may hold.
+        amount = min(amount, self.budget.limit)
+        if amount <= self.amount:
+            return True
+        if not self.budget.try_acquire(amount - self.amount):
+            return False
+        self.amount = amount
+        return True
+
+    async def release(self) -> None:
+        await self.budget.release(self.amount)
+        self.amount = 0
+
+
+class AttachmentDownloader:
+    def __init__(
+        self,
+        concurrency: int,
+        budget_bytes: int,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.budget = ByteBudget(budget_bytes)
+        self._client = client or httpx.AsyncClient(
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max(1, concurrency),
+                max_keepalive_connections=max(1, concurrency),
+            ),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def download_many(
+        self,
+        attachments: Iterable[discord.Attachment],
+        max_bytes: int,
+        timeout_s: float,
+        proxy_sizes: Sequence[tuple[int, int] | None] | None = None,
+    ) -> list[DownloadedImage]:
+        attachments = list(attachments)
+        sizes = list(proxy_sizes) if proxy_sizes is not None else [None] * len(attachments)
+        results = await asyncio.gather(
+            *(
+                self.download(attachment, max_bytes, timeout_s, proxy_size=size)
+                for attachment, size in zip(attachments, sizes)
+            )
+        )
+        return [image for image in results if image is not None]
+
+    async def download(
+        self,
+        attachment: discord.Attachment,
+        max_bytes: int,
+        timeout_s: float,
+        proxy_size: tuple[int, int] | None = None,
+    ) -> DownloadedImage | None:
+        with span("download", size=attachment.size) as download_span:
+            image = await self._download(attachment, max_bytes, timeout_s, proxy_size)
+            if image is None:
+                download_span.set(outcome="failed")
+            else:
+                download_span.set(outcome="ok", bytes=len(image.data), proxy=image.from_proxy)
+            return image
+
+    async def _download(
+        self,
+        attachment: discord.Attachment,
+        max_bytes: int,
+        timeout_s: float,
+        proxy_size: tuple[int, int] | None,
+    ) -> DownloadedImage | None:
+        proxy_url = media_proxy_url(attachment, proxy_size) if proxy_size else None
+        if proxy_url:
+            fetched = await self._download_url(proxy_url, None, max_bytes, timeout_s)
+            if fetched is not None:
+                data, content_type = fetched
+                return DownloadedImage(
+                    data=data,
+                    content_type=content_type
+                    if content_type and content_type.startswith("image/")
+                    else f"image/{MEDIA_PROXY_FORMAT}",
+                    filename=attachment.filename or "image.png",
+                    url=attachment.url,
+                    from_proxy=True,
+                )
+        # Original upload: either no rendition was requested or the proxy could not serve it.
+        if attachment.size and attachment.size > max_bytes:
+            return None
+        fetched = await self._download_url(attachment.url, attachment.size, max_bytes, timeout_s)
+        if fetched is None:
+            return None
+        return DownloadedImage(
+            data=fetched[0],
+            content_type=attachment.content_type or "image/png",
+            filename=attachment.filename or "image.png",
+            url=attachment.url,
+        )
+
+    async def _download_url(
+        self,
+        url: str,
+        expected_size: int | None,
+        max_bytes: int,
+        timeout_s: float,
+    ) -> tuple[bytes, str | None] | None:
+        async with self._semaphore:
+            reservation = _Reservation(self.budget)
+            try:
+                return await asyncio.wait_for(
+                    self._fetch(url, expected_size or max_bytes, max_bytes, reservation),
+                    timeout=timeout_s,
+                )
+            except (asyncio.TimeoutError, httpx.HTTPError):
+                return None
+            finally:
+                await reservation.release()
+
+    async def _fetch(
+        self,
+        url: str,
+        expected_size: int,
+        max_bytes: int,
+        reservation: _Reservation,
+    ) -> tuple[bytes, str | None] | None:
+        await reservation.reserve(expected_size)
+        async with self._client.stream("GET", url) as response:
+            if response.status_code != 200:
+                return None
+            # Not checked: Discord serves valid images as application/octet-stream too.
+            content_type = response.headers.get("content-type")
+            if content_type:
+                content_type = content_type.split(";", 1)[0].strip()
+            content_length = response.headers.get("content-length")
+            if content_length and content_length.isdigit():
+                if int(content_length) > max_bytes or not reservation.grow(int(content_length)):
+                    return None
+            buffer = bytearray()
+            async for chunk in response.aiter_bytes():
+                if len(buffer) + len(chunk) > max_bytes:
+                    # Leaving the stream context closes the connection mid-body.
+                    return None
+                # The reported size can be wrong; keep the budget covering what is buffered.
+                if not reservation.grow(len(buffer) + len(chunk)):
+                    return None
+                buffer.extend(chunk)
+        return bytes(buffer), content_type
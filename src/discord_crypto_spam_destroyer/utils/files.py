@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no fcntl; fall back to no locking.
+    fcntl = None  # type: ignore[assignment]
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Exclusive advisory lock on `<path>.lock`, shared by every process on the host."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write via a temp file and rename, so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+class LineSetFile:
+    """A set of non-empty lines kept sorted in a text file.
+
+    Reads are cached until the file is replaced or its mtime or size changes, so entries
+    added by other processes show up on the next `load`. Additions take `file_lock` and
+    rewrite the file with `atomic_write_text`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # (stamp, lines) replaced as one object, so concurrent readers in worker threads
+        # never pair one version's stamp with another's lines.
+        self._cache: tuple[tuple[int, int, int] | None, frozenset[str]] = (None, frozenset())
+
+    def _read(self) -> frozenset[str]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self._cache = (None, frozenset())
+            return self._cache[1]
+        # The inode changes on every atomic replace, even within one mtime tick.
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached_stamp, lines = self._cache
+        if stamp != cached_stamp:
+            content = self.path.read_text(encoding="utf-8")
+            lines = frozenset(line.strip() for line in content.splitlines() if line.strip())
+            self._cache = (stamp, lines)
+        return lines
+
+    def load(self) -> set[str]:
+        return set(self._read())
+
+    def cached(self) -> frozenset[str]:
+        """Lines as of the last read or write, without touching the file."""
+        return self._cache[1]
+
+    def add_many(self, lines: Iterable[str]) -> int:
+        with file_lock(self.path):
+            existing = self._read()
+            new = set(lines) - existing
+            if not new:
+                return 0
+            atomic_write_text(self.path, "\n".join(sorted(existing | new)) + "\n")
+            self._read()
+        return len(new)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+import discord
+
+MEMBER_CACHE_MAX_ENTRIES = 10_000
+
+
+@dataclass
+class _GuildEntry:
+    mod_channels: dict[str, discord.TextChannel | None] = field(default_factory=dict)
+    fallback_channel: discord.TextChannel | None = None
+    fallback_resolved: bool = False
+
+
+class GuildMetadataCache:
+    """Resolved mod and fallback channels per guild.
+
+    Channel objects are updated in place by discord.py, so entries only need dropping
+    when channels, roles (permissions) or the guild itself change.
+    """
+
+    def __init__(self) -> None:
+        self._guilds: dict[int, _GuildEntry] = {}
+
+    def invalidate(self, guild_id: int | None = None) -> None:
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self._guilds.pop(guild_id, None)
+
+    def mod_channel(self, guild: discord.Guild, mod_channel: str | None) -> discord.TextChannel | None:
+        if not mod_channel:
+            return None
+        entry = self._guilds.setdefault(guild.id, _GuildEntry())
+        if mod_channel not in entry.mod_channels:
+            entry.mod_channels[mod_channel] = _find_text_channel(guild, mod_channel)
+        return entry.mod_channels[mod_channel]
+
+    def fallback_channel(self, guild: discord.Guild) -> discord.TextChannel | None:
+        entry = self._guilds.setdefault(guild.id, _GuildEntry())
+        if not entry.fallback_resolved:
+            entry.fallback_channel = _find_fallback_channel(guild)
+            entry.fallback_resolved = True
+        return entry.fallback_channel
+
+
+def _find_text_channel(guild: discord.Guild, name_or_id: str) -> discord.TextChannel | None:
+    if name_or_id.isdigit():
+        channel = guild.get_channel(int(name_or_id))
+        return channel if isinstance(channel, discord.TextChannel) else None
+    return discord.utils.get(guild.text_channels, name=name_or_id)
+
+
+def _find_fallback_channel(guild: discord.Guild) -> discord.TextChannel | None:
+    me = guild.me
+    if me is None:
+        return None
+    if guild.system_channel and guild.system_channel.permissions_for(me).send_messages:
+        return guild.system_channel
+    for channel in guild.text_channels:
+        if channel.permissions_for(me).send_messages:
+            return channel
+    return None
+
+
+class MemberCache:
+    """Short-lived cache in front of `fetch_member`, including misses (left or banned users).
+
+    The bot does not request the members intent, so member updates and leaves are never
+    seen: entries expire by TTL, or per guild when a role is deleted or the bot leaves.
+    """
+
+    def __init__(self, ttl_s: float) -> None:
+        self.ttl_s = ttl_s
+        self._members: dict[tuple[int, int], tuple[float, discord.Member | None]] = {}
+
+    def get(self, guild_id: int, user_id: int) -> tuple[bool, discord.Member | None]:
+        """Returns (hit, member); a hit with None means the user was recently not found."""
+        cached = self._members.get((guild_id, user_id))
+        if cached is None:
+            return False, None
+        expires_at, member = cached
+        if expires_at < time.monotonic():
+            del self._members[(guild_id, user_id)]
+            return False, None
+        return True, member
+
+    def put(self, guild_id: int, user_id: int, member: discord.Member | None) -> None:
+        if self.ttl_s <= 0:
+            return
+        now = time.monotonic()
+        if len(self._members) >= MEMBER_CACHE_MAX_ENTRIES:
+            self._members = {key: value for key, value in self._members.items() if value[0] >= now}
+        self._members[(guild_id, user_id)] = (now + self.ttl_s, member)
+
+    def invalidate(self, guild_id: int) -> None:
+        for key in [key for key in self._members if key[0] == guild_id]:
+            del self._members[key]
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-import asyncio
 import base64
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, field, replace
 from io import BytesIO
 from typing import Iterable
 
 import discord
 from PIL import Image
 
+from discord_crypto_spam_destroyer.hashes.phash import phash_image
+from discord_crypto_spam_destroyer.vision.tiling import plan_grid, plan_tiles, should_tile
+
+logger = logging.getLogger("discord_crypto_spam_destroyer")
+
 IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp")
 ALLOWED_IMAGE_TYPES = {
     "image/png",
@@ -25,35 +30,326 @@ class DownloadedImage:
     content_type: str
     filename: str
     url: str
+    from_proxy: bool = False
+
+
+@dataclass(frozen=True)
+class EncodedImage:
+    data_url: str
+    byte_size: int
+    content_type: str
+    width: int | None
+    height: int | None
+    quality: int | None
+
+    def meta(self) -> dict[str, object]:
+        image_meta: dict[str, object] = {
+            "w": self.width,
+            "h": self.height,
+            "bytes": self.byte_size,
+            "format": self.content_type,
+        }
+        if self.quality is not None:
+            image_meta["quality"] = self.quality
+        return image_meta
+
+
+@dataclass
+class PreparedImage:
+    source: DownloadedImage
+    width: int | None
+    height: int | None
+    phash: str | None
+    image: Image.Image | None
+    payload: EncodedImage | None
+    tiles: list[EncodedImage] = field(default_factory=list)
+
+
+@dataclass
+class PreparedBatch:
+    images: list[PreparedImage]
+    montage: EncodedImage | None = None
+
+    @property
+    def phashes(self) -> list[str]:
+        return [image.phash for image in self.images if image.phash]
+
+    def classification_requests(self) -> list[list[EncodedImage]]:
+        """One payload list per vision call: the montage, or each image (tiled when needed).
+
+        Images left out of a montage (they could not be decoded) are sent on their own.
+        """
+        if self.montage is not None:
+            return [[self.montage]] + [
+                [image.payload] for image in self.images if image.payload is not None
+            ]
+        requests: list[list[EncodedImage]] = []
+        for image in self.images:
+            if image.tiles:
+                requests.append(image.tiles)
+            elif image.payload is not None:
+                requests.append([image.payload])
+        return requests
+
+
+RESAMPLE_FILTERS = {
+    "lanczos": Image.Resampling.LANCZOS,
+    "bicubic": Image.Resampling.BICUBIC,
+    "bilinear": Image.Resampling.BILINEAR,
+    "box": Image.Resampling.BOX,
+}
+ENCODED_CONTENT_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+@dataclass(frozen=True)
+class ImageEncoderOptions:
+    format: str = "jpeg"
+    quality: int = 82
+    resample: str = "bicubic"
+    reducing_gap: float = 2.0
+    tile_aspect_ratio: float = 0.0
+    max_tiles: int = 6
+
+
+DEFAULT_ENCODER_OPTIONS = ImageEncoderOptions()
+MONTAGE_DEFAULT_DIM = 512
+
+
+def _data_url(content_type: str, data: bytes | memoryview) -> str:
+    return f"data:{content_type};base64," + base64.b64encode(data).decode("ascii")
+
+
+def _encode_raw(image: DownloadedImage, width: int | None, height: int | None) -> EncodedImage:
+    return EncodedImage(
+        data_url=_data_url(image.content_type, image.data),
+        byte_size=len(image.data),
+        content_type=image.content_type,
+        width=width,
+        height=height,
+        quality=None,
+    )
+
+
+def encode_image(image: Image.Image, options: ImageEncoderOptions) -> EncodedImage:
+    buffer = BytesIO()
+    if options.format == "webp":
+        image.save(buffer, format="WEBP", quality=options.quality, method=2)
+    else:
+        image.save(buffer, format="JPEG", quality=options.quality)
+    # Encode straight from the BytesIO buffer instead of copying it out with getvalue().
+    with buffer.getbuffer() as view:
+        byte_size = view.nbytes
+        content_type = ENCODED_CONTENT_TYPES[options.format]
+        data_url = _data_url(content_type, view)
+    return EncodedImage(
+        data_url=data_url,
+        byte_size=byte_size,
+        content_type=content_type,
+        width=image.width,
+        height=image.height,
+        quality=options.quality,
+    )
+
+
+def resize_to_fit(
+    image: Image.Image,
+    width: int,
+    height: int,
+    max_dim: int,
+    options: ImageEncoderOptions,
+) -> Image.Image:
+    scale = max_dim / float(max(width, height))
+    return image.resize(
+        (max(1, int(width * scale)), max(1, int(height * scale))),
+        resample=RESAMPLE_FILTERS[options.resample],
+        reducing_gap=options.reducing_gap if options.reducing_gap > 0 else None,
+    )
+
+
+def encode_tiles(decoded: Image.Image, max_dim: int, options: ImageEncoderOptions) -> list[EncodedImage]:
+    tiles: list[EncodedImage] = []
+    for box in plan_tiles(decoded.width, decoded.height, max_dim, options.max_tiles):
+        tile = decoded.crop(box)
+        if max(tile.width, tile.height) > max_dim:
+            tile = resize_to_fit(tile, tile.width, tile.height, max_dim, options)
+        tiles.append(encode_image(tile, options))
+    return tiles
+
+
+def _encode_for_openai(
+    source: DownloadedImage,
+    decoded: Image.Image,
+    width: int,
+    height: int,
+    max_dim: int,
+    options: ImageEncoderOptions,
+) -> EncodedImage:
+    if max_dim <= 0 or max(width, height) <= max_dim:
+        return _encode_raw(source, width, height)
+    return encode_image(resize_to_fit(decoded, width, height, max_dim, options), options)
 
 
-def resize_image_for_openai(
+def prepare_image(
     image: DownloadedImage,
     max_dim: int,
-) -> tuple[bytes, str, int | None, int | None, int | None]:
-    if max_dim <= 0:
-        try:
-            with Image.open(BytesIO(image.data)) as original:
-                width, height = original.size
-            return image.data, image.content_type, width, height, None
-        except Exception:
-            return image.data, image.content_type, None, None, None
+    hash_image: bool = True,
+    encode: bool = True,
+    options: ImageEncoderOptions = DEFAULT_ENCODER_OPTIONS,
+    keep_image: bool = False,
+    tile: bool = True,
+) -> PreparedImage:
+    """Decode once and derive dimensions, phash and the OpenAI payload from the same pixels.
+
+    Images that get tiled carry only their tiles; the single payload is encoded only when
+    tiling does not apply (or fails), or when `tile` is False.
+    """
     try:
         with Image.open(BytesIO(image.data)) as original:
-            original = original.convert("RGB")
             width, height = original.size
-            if max(width, height) <= max_dim:
-                return image.data, image.content_type, width, height, None
-            scale = max_dim / float(max(width, height))
-            resized = original.resize(
-                (int(width * scale), int(height * scale)),
-                resample=Image.Resampling.LANCZOS,
-            )
-            buffer = BytesIO()
-            resized.save(buffer, format="JPEG", quality=82, optimize=True)
-            return buffer.getvalue(), "image/jpeg", resized.width, resized.height, 82
+            if not hash_image and encode and max_dim > 0:
+                original.draft("RGB", (max_dim, max_dim))
+            phash = phash_image(original) if hash_image else None
+            if not encode and not keep_image:
+                return PreparedImage(image, width, height, phash, None, None)
+            decoded = original.convert("RGB")
+    except Exception:
+        payload = _encode_raw(image, None, None) if encode else None
+        return PreparedImage(image, None, None, None, None, payload)
+    prepared = PreparedImage(image, width, height, phash, decoded, None)
+    if not encode:
+        return prepared
+    return encode_prepared(prepared, max_dim, options, tile)
+
+
+def encode_prepared(
+    prepared: PreparedImage,
+    max_dim: int,
+    options: ImageEncoderOptions = DEFAULT_ENCODER_OPTIONS,
+    tile: bool = True,
+) -> PreparedImage:
+    """Encode the payload (or tiles) of an image from the pixels `prepare_image` kept."""
+    decoded, width, height = prepared.image, prepared.width, prepared.height
+    if decoded is None or width is None or height is None:
+        return replace(prepared, payload=_encode_raw(prepared.source, None, None))
+    tiles: list[EncodedImage] = []
+    if tile and should_tile(width, height, max_dim, options.tile_aspect_ratio):
+        try:
+            tiles = encode_tiles(decoded, max_dim, options)
+        except Exception:
+            tiles = []
+    if tiles:
+        return replace(prepared, payload=None, tiles=tiles)
+    try:
+        payload = _encode_for_openai(prepared.source, decoded, width, height, max_dim, options)
     except Exception:
-        return image.data, image.content_type, None, None, None
+        payload = _encode_raw(prepared.source, width, height)
+    return replace(prepared, payload=payload)
+
+
+def prepare_images(
+    images: Iterable[DownloadedImage],
+    max_dim: int,
+    encode: bool = True,
+    options: ImageEncoderOptions = DEFAULT_ENCODER_OPTIONS,
+) -> list[PreparedImage]:
+    return [prepare_image(image, max_dim, encode=encode, options=options) for image in images]
+
+
+def _fit_into(image: Image.Image, width: int, height: int, options: ImageEncoderOptions) -> Image.Image:
+    scale = min(width / image.width, height / image.height)
+    if scale >= 1.0:
+        return image
+    return image.resize(
+        (max(1, int(image.width * scale)), max(1, int(image.height * scale))),
+        resample=RESAMPLE_FILTERS[options.resample],
+        reducing_gap=options.reducing_gap if options.reducing_gap > 0 else None,
+    )
+
+
+def render_montage(
+    images: Iterable[Image.Image],
+    canvas_dim: int,
+    options: ImageEncoderOptions = DEFAULT_ENCODER_OPTIONS,
+) -> Image.Image | None:
+    sources = list(images)
+    cells = plan_grid(len(sources), canvas_dim)
+    if not cells:
+        return None
+    canvas = Image.new("RGB", (canvas_dim, canvas_dim), (32, 32, 32))
+    for source, (left, top, right, bottom) in zip(sources, cells):
+        # Leave a thin gutter so the model sees separate screenshots rather than one image.
+        fitted = _fit_into(source, right - left - 4, bottom - top - 4, options)
+        canvas.paste(
+            fitted,
+            (
+                left + (right - left - fitted.width) // 2,
+                top + (bottom - top - fitted.height) // 2,
+            ),
+        )
+    return canvas
+
+
+def compose_montage(
+    images: Iterable[Image.Image],
+    canvas_dim: int,
+    options: ImageEncoderOptions = DEFAULT_ENCODER_OPTIONS,
+) -> EncodedImage | None:
+    canvas = render_montage(images, canvas_dim, options)
+    if canvas is None:
+        return None
+    return encode_image(canvas, options)
+
+
+def decode_batch(images: Iterable[DownloadedImage], keep_images: bool = False) -> PreparedBatch:
+    """Decode and hash all images of a message; `keep_images` keeps pixels for `encode_batch`."""
+    return PreparedBatch(
+        images=[prepare_image(image, 0, encode=False, keep_image=keep_images) for image in images]
+    )
+
+
+def encode_batch(
+    batch: PreparedBatch,
+    max_dim: int,
+    options: ImageEncoderOptions = DEFAULT_ENCODER_OPTIONS,
+    composite: bool = False,
+) -> PreparedBatch:
+    """Encode a decoded batch for classification, optionally as a single montage."""
+    images = batch.images
+    if composite and len(images) > 1:
+        decoded = [image.image for image in images if image.image is not None]
+        montage = None
+        if decoded:
+            canvas_dim = max_dim if max_dim > 0 else MONTAGE_DEFAULT_DIM
+            try:
+                montage = compose_montage(decoded, canvas_dim, options)
+            except Exception:
+                montage = None
+        if montage is not None:
+            prepared = list(images)
+            for index, image in enumerate(prepared):
+                if image.image is None:
+                    logger.info(
+                        "Could not decode %s for the montage; sending it separately",
+                        image.source.url,
+                    )
+                    prepared[index] = replace(image, payload=_encode_raw(image.source, None, None))
+            return PreparedBatch(images=prepared, montage=montage)
+        # Fall back to per-image payloads so classification can still run.
+    return PreparedBatch(images=[encode_prepared(image, max_dim, options) for image in images])
+
+
+def prepare_batch(
+    images: Iterable[DownloadedImage],
+    max_dim: int,
+    encode: bool = True,
+    options: ImageEncoderOptions = DEFAULT_ENCODER_OPTIONS,
+    composite: bool = False,
+) -> PreparedBatch:
+    """Prepare all images of a message in one worker job, optionally as a single montage."""
+    batch = decode_batch(images, keep_images=encode)
+    if not encode:
+        return batch
+    return encode_batch(batch, max_dim, options, composite)
 
 
 def is_image_attachment(attachment: discord.Attachment) -> bool:
@@ -64,34 +360,21 @@ def is_image_attachment(attachment: discord.Attachment) -> bool:
     return attachment.filename.lower().endswith(IMAGE_EXTENSIONS)
 
 
-async def read_attachment(
-    attachment: discord.Attachment,
-    max_bytes: int,
-    timeout_s: float,
-) -> DownloadedImage | None:
-    if attachment.size and attachment.size > max_bytes:
-        return None
-    try:
-        data = await asyncio.wait_for(attachment.read(), timeout=timeout_s)
-    except (asyncio.TimeoutError, discord.HTTPException, discord.NotFound):
-        return None
-    if len(data) > max_bytes:
-        return None
-    return DownloadedImage(
-        data=data,
-        content_type=attachment.content_type or "image/png",
-        filename=attachment.filename or "image.png",
-        url=attachment.url,
-    )
-
-
 def to_data_url(
     image: DownloadedImage,
     max_dim: int,
 ) -> tuple[str, int, str, int | None, int | None, int | None]:
-    resized, content_type, width, height, quality = resize_image_for_openai(image, max_dim)
-    encoded = base64.b64encode(resized).decode("ascii")
-    return f"data:{content_type};base64,{encoded}", len(resized), content_type, width, height, quality
+    payload = prepare_image(image, max_dim, hash_image=False, tile=False).payload
+    if payload is None:
+        payload = _encode_raw(image, None, None)
+    return (
+        payload.data_url,
+        payload.byte_size,
+        payload.content_type,
+        payload.width,
+        payload.height,
+        payload.quality,
+    )
 
 
 def build_discord_files(images: Iterable[DownloadedImage]) -> list[discord.File]:
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+from discord_crypto_spam_destroyer.config import ResolvedSettings
+from discord_crypto_spam_destroyer.models import VisionIndicators, VisionResult
+from discord_crypto_spam_destroyer.vision.openai_client import (
+    classify_images_with_client,
+    create_client,
+)
+
+LOCAL_API_KEY_PLACEHOLDER = "not-needed"
+
+
+class VisionBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def classify(
+        self,
+        images_base64: Sequence[str],
+        image_detail: str,
+        image_meta: list[dict[str, object]] | None = None,
+        debug_logs: bool = False,
+    ) -> VisionResult:
+        ...
+
+    def close(self) -> None:
+        """Release connections; called once the backend is no longer configured."""
+
+
+class OpenAIVisionBackend(VisionBackend):
+    name = "openai"
+
+    def __init__(self, api_key: str, model: str, base_url: str | None = None) -> None:
+        self.model = model
+        self.base_url = base_url
+        self._client = create_client(api_key, base_url)
+
+    def close(self) -> None:
+        self._client.close()
+
+    def classify(
+        self,
+        images_base64: Sequence[str],
+        image_detail: str,
+        image_meta: list[dict[str, object]] | None = None,
+        debug_logs: bool = False,
+    ) -> VisionResult:
+        return classify_images_with_client(
+            self._client,
+            self.model,
+            images_base64,
+            image_detail,
+            image_meta,
+            debug_logs,
+        )
+
+
+class OpenAICompatibleVisionBackend(OpenAIVisionBackend):
+    """Any endpoint speaking the OpenAI chat completions API, e.g. a self-hosted VLM."""
+
+    name = "openai_compatible"
+
+    def __init__(self, base_url: str, model: str, api_key: str | None = None) -> None:
+        super().__init__(api_key or LOCAL_API_KEY_PLACEHOLDER, model, base_url=base_url)
+
+
+class FakeVisionBackend(VisionBackend):
+    """In-process deterministic classifier for tests and benchmarks.
+
+    Returns `result` when given, otherwise derives a stable verdict from the image payloads.
+    """
+
+    name = "fake"
+
+    def __init__(self, result: VisionResult | None = None, scam_threshold: float = 0.5) -> None:
+        self.result = result
+        self.scam_threshold = scam_threshold
+        self.calls = 0
+
+    def classify(
+        self,
+        images_base64: Sequence[str],
+        image_detail: str,
+        image_meta: list[dict[str, object]] | None = None,
+        debug_logs: bool = False,
+    ) -> VisionResult:
+        self.calls += 1
+        if self.result is not None:
+            return self.result
+        digest = hashlib.sha256()
+        for image_data in images_base64:
+            digest.update(image_data.encode("ascii"))
+        confidence = int.from_bytes(digest.digest()[:4], "big") / 0xFFFFFFFF
+        is_scam = confidence >= self.scam_threshold
+        return VisionResult(
+            is_crypto_scam=is_scam,
+            confidence=round(confidence, 4),
+            reasons=["fake backend scam" if is_scam else "fake backend not scam"],
+            indicators=VisionIndicators(domains=[], amounts=[], wallet_addresses=[]),
+        )
+
+
+def vision_backend_key(settings: ResolvedSettings) -> tuple[str, str | None, str | None, str]:
+    return (
+        settings.vision_backend,
+        settings.openai_api_key,
+        settings.openai_base_url,
+        settings.openai_model,
+    )
+
+
+def build_vision_backend(settings: ResolvedSettings) -> VisionBackend | None:
+    if settings.vision_backend == "fake":
+        return FakeVisionBackend()
+    if settings.vision_backend == "openai_compatible":
+        if not settings.openai_base_url:
+            return None
+        return OpenAICompatibleVisionBackend(
+            settings.openai_base_url,
+            settings.openai_model,
+            api_key=settings.openai_api_key,
+        )
+    if not settings.openai_api_key:
+        return None
+    return OpenAIVisionBackend(
+        settings.openai_api_key,
+        settings.openai_model,
+        base_url=settings.openai_base_url,
+    )
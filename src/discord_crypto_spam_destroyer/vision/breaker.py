@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import time
+from typing import Literal
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """Stops calling a failing API for a while instead of waiting on every timeout.
+
+    After `failure_threshold` consecutive failures the breaker opens and `allow` refuses
+    calls for `reset_after_s`. Then one trial call is let through and the breaker stays
+    open until it reports: success closes the breaker, failure reopens it. A threshold of
+    0 disables it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_after_s: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after_s = reset_after_s
+        self.failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> BreakerState:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_after_s:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        # Re-arm the timer so only this call goes through; a trial that never reports
+        # back just lets another one through after `reset_after_s`.
+        self._opened_at = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failure_threshold > 0 and (
+            self._opened_at is not None or self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
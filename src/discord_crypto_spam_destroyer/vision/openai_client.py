@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+from dataclasses import replace
 from typing import Sequence
 
 from openai import OpenAI
@@ -55,6 +56,10 @@ def parse_vision_response(raw_content: str) -> VisionResult:
     )
 
 
+def create_client(api_key: str, base_url: str | None = None) -> OpenAI:
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
 def classify_images(
     api_key: str,
     model: str,
@@ -62,8 +67,26 @@ def classify_images(
     image_detail: str,
     image_meta: list[dict[str, object]] | None = None,
     debug_logs: bool = False,
+    base_url: str | None = None,
+) -> VisionResult:
+    return classify_images_with_client(
+        create_client(api_key, base_url),
+        model,
+        images_base64,
+        image_detail,
+        image_meta,
+        debug_logs,
+    )
+
+
+def classify_images_with_client(
+    client: OpenAI,
+    model: str,
+    images_base64: Sequence[str],
+    image_detail: str,
+    image_meta: list[dict[str, object]] | None = None,
+    debug_logs: bool = False,
 ) -> VisionResult:
-    client = OpenAI(api_key=api_key)
     messages = build_vision_request(images_base64, image_detail)
     response = client.chat.completions.create(
         model=model,
@@ -74,8 +97,9 @@ def classify_images(
     if debug_logs:
         usage = response.usage
         logger.info(
-            "OpenAI usage model=%s request_id=%s detail=%s n_images=%s img_meta=%s prompt_tokens=%s completion_tokens=%s total_tokens=%s",
+            "OpenAI usage model=%s base_url=%s request_id=%s detail=%s n_images=%s img_meta=%s prompt_tokens=%s completion_tokens=%s total_tokens=%s",
             model,
+            client.base_url,
             response.id,
             image_detail,
             len(images_base64),
@@ -85,4 +109,12 @@ def classify_images(
             getattr(usage, "total_tokens", None),
         )
     content = response.choices[0].message.content or "{}"
-    return parse_vision_response(content)
+    result = parse_vision_response(content)
+    usage = response.usage
+    if usage is None:
+        return result
+    return replace(
+        result,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+    )
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import math
+
+TILE_OVERLAP = 0.15
+
+Box = tuple[int, int, int, int]
+
+
+def should_tile(width: int, height: int, max_dim: int, aspect_ratio: float) -> bool:
+    if max_dim <= 0 or aspect_ratio <= 0:
+        return False
+    short_side = min(width, height)
+    long_side = max(width, height)
+    if short_side <= 0 or long_side <= max_dim:
+        return False
+    return long_side / short_side >= aspect_ratio
+
+
+def plan_tiles(
+    width: int,
+    height: int,
+    tile_dim: int,
+    max_tiles: int,
+    overlap: float = TILE_OVERLAP,
+) -> list[Box]:
+    """Split the long axis into overlapping tiles that keep the short side at `tile_dim`.
+
+    Boxes are (left, top, right, bottom) in source pixels. When the image would need more
+    than `max_tiles`, tiles grow along the long axis (and get downscaled more) instead.
+    """
+    short_side = min(width, height)
+    long_side = max(width, height)
+    scale = min(1.0, tile_dim / short_side)
+    tile_long = min(long_side, math.ceil(tile_dim / scale))
+    step = tile_long * (1.0 - overlap)
+    count = 1 if tile_long >= long_side else math.ceil((long_side - tile_long) / step) + 1
+    if count > max_tiles:
+        count = max(1, max_tiles)
+        tile_long = min(long_side, math.ceil(long_side / (1 + (count - 1) * (1.0 - overlap))))
+    boxes: list[Box] = []
+    for index in range(count):
+        start = 0 if count == 1 else round(index * (long_side - tile_long) / (count - 1))
+        end = start + tile_long
+        if height >= width:
+            boxes.append((0, start, width, end))
+        else:
+            boxes.append((start, 0, end, height))
+    return boxes
+
+
+def plan_grid(count: int, canvas_dim: int) -> list[Box]:
+    """Cells for a near-square montage of `count` images on a `canvas_dim` square canvas."""
+    if count <= 0:
+        return []
+    columns = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / columns)
+    cell_width = canvas_dim // columns
+    cell_height = canvas_dim // rows
+    return [
+        (
+            (index % columns) * cell_width,
+            (index // columns) * cell_height,
+            (index % columns + 1) * cell_width,
+            (index // columns + 1) * cell_height,
+        )
+        for index in range(count)
+    ]
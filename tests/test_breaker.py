@@ -0,0 +1,37 @@
+import time
+
+from discord_crypto_spam_destroyer.vision.breaker import CircuitBreaker
+
+
+def test_breaker_opens_after_consecutive_failures() -> None:
+    breaker = CircuitBreaker("vision", failure_threshold=2, reset_after_s=60.0)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_lets_one_trial_through_after_reset() -> None:
+    breaker = CircuitBreaker("vision", failure_threshold=1, reset_after_s=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    breaker.reset_after_s = 60.0
+    breaker._opened_at = time.monotonic() - 120
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    breaker._opened_at = time.monotonic() - 120
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_zero_threshold_never_opens() -> None:
+    breaker = CircuitBreaker("vision", failure_threshold=0, reset_after_s=60.0)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow()
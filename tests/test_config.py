@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from discord_crypto_spam_destroyer.config import (
+    load_settings,
+    reload_multi_server_config,
+    resolve_settings,
+)
+
+
+@pytest.fixture
+def multi_server_path(tmp_path, monkeypatch):
+    path = tmp_path / "multi_server_config.json"
+    path.write_text(json.dumps({"1": {"mod_channel": "mods", "mod_role_id": 2}}), encoding="utf-8")
+    monkeypatch.setenv("DISCORD_TOKEN", "token")
+    monkeypatch.setenv("MULTI_SERVER_CONFIG_PATH", str(path))
+    return path
+
+
+def test_reload_picks_up_new_guilds(multi_server_path) -> None:
+    settings = load_settings()
+    multi_server_path.write_text(
+        json.dumps(
+            {
+                "1": {"mod_channel": "mods", "mod_role_id": 2},
+                "3": {"mod_channel": "alerts", "mod_role_id": 4, "confidence_high": 0.9},
+            }
+        ),
+        encoding="utf-8",
+    )
+    reloaded = reload_multi_server_config(settings)
+    assert resolve_settings(reloaded, 3).confidence_high == 0.9
+    assert 3 not in settings.multi_server_config
+
+
+def test_reload_rejects_invalid_file(multi_server_path) -> None:
+    settings = load_settings()
+    multi_server_path.write_text(json.dumps({"1": {"not_a_setting": 1}}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        reload_multi_server_config(settings)
+    multi_server_path.write_text("{", encoding="utf-8")
+    with pytest.raises(ValueError):
+        reload_multi_server_config(settings)
+
+
+def test_shard_ids_require_shard_count(multi_server_path, monkeypatch) -> None:
+    monkeypatch.setenv("SHARD_IDS", "0-1,4")
+    with pytest.raises(ValueError):
+        load_settings()
+    monkeypatch.setenv("SHARD_COUNT", "6")
+    assert load_settings().shard_ids == (0, 1, 4)
@@ -1,4 +1,8 @@
-from discord_crypto_spam_destroyer.moderation.decision import confidence_band, decision_from_result
+from discord_crypto_spam_destroyer.moderation.decision import (
+    confidence_band,
+    decision_from_result,
+    merge_vision_results,
+)
 from discord_crypto_spam_destroyer.models import ConfidenceBand, VisionIndicators, VisionResult
 
 
@@ -42,3 +46,13 @@ def test_decision_flow_medium_confidence() -> None:
     decision = decision_from_result(result, 0.85, 0.65)
     assert decision.is_scam is True
     assert decision.confidence_band == ConfidenceBand.MEDIUM
+
+
+def test_merge_vision_results_prefers_strongest_scam() -> None:
+    indicators = VisionIndicators(domains=[], amounts=[], wallet_addresses=[])
+    clean = VisionResult(is_crypto_scam=False, confidence=0.95, reasons=[], indicators=indicators)
+    weak = VisionResult(is_crypto_scam=True, confidence=0.6, reasons=[], indicators=indicators)
+    strong = VisionResult(is_crypto_scam=True, confidence=0.9, reasons=[], indicators=indicators)
+    assert merge_vision_results([clean, weak, strong]) is strong
+    assert merge_vision_results([clean]) is clean
+    assert merge_vision_results([]) is None
@@ -0,0 +1,47 @@
+import asyncio
+
+from discord_crypto_spam_destroyer.pipeline.delay import DelayScheduler
+
+
+def _recorder(fired: list, label: str):
+    async def callback(stale: bool) -> None:
+        fired.append((label, stale))
+
+    return callback
+
+
+async def test_fires_in_due_order() -> None:
+    scheduler = DelayScheduler()
+    scheduler.start()
+    fired: list = []
+    scheduler.schedule(1, 0.05, _recorder(fired, "late"))
+    scheduler.schedule(2, 0.01, _recorder(fired, "early"))
+    await asyncio.sleep(0.1)
+    await scheduler.stop()
+    assert fired == [("early", False), ("late", False)]
+
+
+async def test_discarded_messages_never_fire() -> None:
+    scheduler = DelayScheduler()
+    scheduler.start()
+    fired: list = []
+    scheduler.schedule(1, 0.01, _recorder(fired, "deleted"))
+    scheduler.schedule(2, 0.02, _recorder(fired, "kept"))
+    assert scheduler.discard(1)
+    assert not scheduler.discard(1)
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+    assert fired == [("kept", False)]
+    assert scheduler.pending == 0
+
+
+async def test_stale_flag_is_passed_through() -> None:
+    scheduler = DelayScheduler()
+    scheduler.start()
+    fired: list = []
+    scheduler.schedule(1, 0.01, _recorder(fired, "edited"))
+    scheduler.mark_stale(1)
+    scheduler.mark_stale(99)
+    await asyncio.sleep(0.03)
+    await scheduler.stop()
+    assert fired == [("edited", True)]
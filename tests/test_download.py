@@ -0,0 +1,165 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+from discord_crypto_spam_destroyer.utils.download import (
+    AttachmentDownloader,
+    ByteBudget,
+    media_proxy_url,
+    rendition_size,
+)
+
+
+def _attachment(url: str, size: int = 0, proxy_url: str = "") -> SimpleNamespace:
+    return SimpleNamespace(
+        url=url,
+        proxy_url=proxy_url,
+        size=size,
+        content_type="image/png",
+        filename="a.png",
+    )
+
+
+def _downloader(handler, concurrency: int = 4, budget: int = 1_000_000) -> AttachmentDownloader:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AttachmentDownloader(concurrency, budget, client=client)
+
+
+async def test_download_many_keeps_order_and_drops_failures() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, content=request.url.path.encode())
+
+    downloader = _downloader(handler)
+    images = await downloader.download_many(
+        [_attachment("https://cdn.test/a"), _attachment("https://cdn.test/missing"), _attachment("https://cdn.test/b")],
+        max_bytes=100,
+        timeout_s=1.0,
+    )
+    await downloader.aclose()
+    assert [image.data for image in images] == [b"/a", b"/b"]
+
+
+async def test_download_aborts_when_stream_exceeds_cap() -> None:
+    async def body():
+        for _ in range(10):
+            yield b"x" * 64
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        # No content-length: the cap has to be enforced while streaming.
+        return httpx.Response(200, content=body())
+
+    downloader = _downloader(handler)
+    assert await downloader.download(_attachment("https://cdn.test/big"), 256, 1.0) is None
+    assert await downloader.download(_attachment("https://cdn.test/big"), 1024, 1.0) is not None
+    assert downloader.budget.in_flight == 0
+    await downloader.aclose()
+
+
+async def test_download_skips_reported_oversize() -> None:
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, content=b"x")
+
+    downloader = _downloader(handler)
+    assert await downloader.download(_attachment("https://cdn.test/a", size=500), 100, 1.0) is None
+    assert calls == 0
+    await downloader.aclose()
+
+
+async def test_reservation_grows_past_understated_size() -> None:
+    peak = 0
+
+    async def body():
+        nonlocal peak
+        for _ in range(4):
+            peak = max(peak, downloader.budget.in_flight)
+            yield b"x" * 64
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body(), headers={"content-type": "application/octet-stream"})
+
+    downloader = _downloader(handler)
+    image = await downloader.download(_attachment("https://cdn.test/a", size=10), 1024, 1.0)
+    assert image is not None and len(image.data) == 256
+    # Reserved 10 up front, then grown as chunks arrived (checked before the last one).
+    assert peak == 192
+    assert downloader.budget.in_flight == 0
+    await downloader.aclose()
+
+
+async def test_download_fails_when_reservation_cannot_grow() -> None:
+    async def body():
+        yield b"x" * 64
+        yield b"x" * 64
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=body())
+
+    downloader = _downloader(handler, budget=100)
+    await downloader.budget.acquire(50)
+    # Reserved 10 for the stated size; the body needs more than the 50 left.
+    assert await downloader.download(_attachment("https://cdn.test/a", size=10), 1024, 1.0) is None
+    assert downloader.budget.in_flight == 50
+    await downloader.aclose()
+
+
+async def test_byte_budget_blocks_until_released() -> None:
+    budget = ByteBudget(100)
+    await budget.acquire(80)
+    waiter = asyncio.create_task(budget.acquire(50))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    await budget.release(80)
+    assert await waiter == 50
+    assert budget.in_flight == 50
+
+
+def test_rendition_size() -> None:
+    assert rendition_size(2048, 1024, 512) == (512, 256)
+    assert rendition_size(400, 300, 512) is None
+    assert rendition_size(None, None, 512) is None
+    assert rendition_size(1170, 4000, 512, tile_aspect_ratio=2.0) == (512, 1750)
+
+
+def test_media_proxy_url_keeps_signature_params() -> None:
+    attachment = _attachment("https://cdn.test/a.png", proxy_url="https://media.test/a.png?ex=1&hm=abc")
+    url = media_proxy_url(attachment, (512, 256))
+    assert url == "https://media.test/a.png?ex=1&hm=abc&width=512&height=256&format=webp"
+    attachment.content_type = "image/gif"
+    assert media_proxy_url(attachment, (512, 256)) is None
+
+
+async def test_download_falls_back_to_original_when_proxy_fails() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "media.test":
+            return httpx.Response(415, content=b"unsupported")
+        return httpx.Response(200, content=b"original", headers={"content-type": "image/png"})
+
+    downloader = _downloader(handler)
+    attachment = _attachment("https://cdn.test/a.png", proxy_url="https://media.test/a.png")
+    image = await downloader.download(attachment, 1000, 1.0, proxy_size=(512, 256))
+    await downloader.aclose()
+    assert image is not None
+    assert image.data == b"original"
+    assert image.from_proxy is False
+
+
+async def test_download_uses_proxy_rendition() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["width"] == "512"
+        return httpx.Response(200, content=b"small", headers={"content-type": "image/webp"})
+
+    downloader = _downloader(handler)
+    attachment = _attachment("https://cdn.test/a.png", proxy_url="https://media.test/a.png")
+    image = await downloader.download(attachment, 1000, 1.0, proxy_size=(512, 256))
+    await downloader.aclose()
+    assert image is not None
+    assert image.from_proxy is True
+    assert image.content_type == "image/webp"
+    assert image.url == "https://cdn.test/a.png"
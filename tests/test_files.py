@@ -0,0 +1,39 @@
+import os
+
+from discord_crypto_spam_destroyer.hashes.store import FileHashStore
+from discord_crypto_spam_destroyer.utils.files import LineSetFile, atomic_write_text
+
+
+def test_line_set_file_sees_writes_from_other_instances(tmp_path) -> None:
+    path = tmp_path / "hashes.txt"
+    first = LineSetFile(path)
+    second = LineSetFile(path)
+    assert first.load() == set()
+    assert first.add_many(["b", "a"]) == 2
+    assert second.load() == {"a", "b"}
+    assert second.add_many(["a", "c"]) == 1
+    assert first.load() == {"a", "b", "c"}
+    assert path.read_text(encoding="utf-8") == "a\nb\nc\n"
+
+
+def test_line_set_file_caches_until_file_changes(tmp_path) -> None:
+    path = tmp_path / "hashes.txt"
+    path.write_text("a\n", encoding="utf-8")
+    lines = LineSetFile(path)
+    assert lines.load() == {"a"}
+    # Same size and mtime: the cached set is returned without re-reading.
+    stat = path.stat()
+    with open(path, "r+", encoding="utf-8") as handle:
+        handle.write("b")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert lines.load() == {"a"}
+    atomic_write_text(path, "b\n")
+    assert lines.load() == {"b"}
+
+
+def test_file_hash_store_add_is_idempotent(tmp_path) -> None:
+    store = FileHashStore(tmp_path / "data" / "bad_hashes.txt")
+    store.add("ff")
+    store.add("ff")
+    assert store.load() == {"ff"}
+    assert list(tmp_path.joinpath("data").glob("*.tmp")) == []
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from discord_crypto_spam_destroyer.utils.guild_cache import GuildMetadataCache, MemberCache
+
+
+class _Guild:
+    def __init__(self, names: list[str]) -> None:
+        self.id = 1
+        self.lookups = 0
+        self._channels = [SimpleNamespace(name=name) for name in names]
+
+    @property
+    def text_channels(self) -> list[SimpleNamespace]:
+        self.lookups += 1
+        return self._channels
+
+
+def test_mod_channel_is_resolved_once_until_invalidated() -> None:
+    cache = GuildMetadataCache()
+    guild = _Guild(["general", "mods"])
+    assert cache.mod_channel(guild, "mods").name == "mods"
+    assert cache.mod_channel(guild, "mods").name == "mods"
+    assert guild.lookups == 1
+    cache.invalidate(guild.id)
+    cache.mod_channel(guild, "mods")
+    assert guild.lookups == 2
+
+
+def test_missing_mod_channel_is_cached_too() -> None:
+    cache = GuildMetadataCache()
+    guild = _Guild(["general"])
+    assert cache.mod_channel(guild, "mods") is None
+    assert cache.mod_channel(guild, "mods") is None
+    assert guild.lookups == 1
+    assert cache.mod_channel(guild, None) is None
+
+
+def test_member_cache_hits_misses_and_expiry() -> None:
+    cache = MemberCache(ttl_s=60)
+    assert cache.get(1, 2) == (False, None)
+    cache.put(1, 2, None)
+    assert cache.get(1, 2) == (True, None)
+    member = SimpleNamespace(id=3)
+    cache.put(1, 3, member)
+    assert cache.get(1, 3) == (True, member)
+    cache.put(2, 3, member)
+    cache.invalidate(1)
+    assert cache.get(1, 2) == (False, None)
+    assert cache.get(1, 3) == (False, None)
+    assert cache.get(2, 3) == (True, member)
+
+
+def test_member_cache_disabled_with_zero_ttl() -> None:
+    cache = MemberCache(ttl_s=0)
+    cache.put(1, 2, None)
+    assert cache.get(1, 2) == (False, None)
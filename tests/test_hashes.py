@@ -1,6 +1,18 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from discord_crypto_spam_destroyer.hashes.fingerprint import (
+    FileFingerprintStore,
+    attachment_fingerprint,
+    match_fingerprints,
+)
 from discord_crypto_spam_destroyer.hashes.store import match_hashes
 
 
+def _attachment(size: int, width: int | None = 1170, height: int | None = 2532) -> SimpleNamespace:
+    return SimpleNamespace(size=size, width=width, height=height, content_type="image/png")
+
+
 def test_match_hashes() -> None:
     known = {"abc", "def"}
     result = match_hashes(["abc", "zzz"], known)
@@ -13,3 +25,36 @@ def test_match_hashes_no_match() -> None:
     result = match_hashes(["zzz"], known)
     assert result.matched is False
     assert result.matched_hashes == []
+
+
+def test_attachment_fingerprint() -> None:
+    assert attachment_fingerprint(_attachment(1234)) == "1234:1170:2532:image/png"
+    assert attachment_fingerprint(_attachment(1234, width=None)) is None
+
+
+def test_match_fingerprints_requires_every_attachment() -> None:
+    known = {attachment_fingerprint(_attachment(1))}
+    assert match_fingerprints([_attachment(1)], known)
+    assert not match_fingerprints([_attachment(1), _attachment(2)], known)
+    assert not match_fingerprints([], known)
+
+
+def test_file_fingerprint_store_round_trip(tmp_path: Path) -> None:
+    store = FileFingerprintStore(tmp_path / "fingerprints.txt")
+    assert store.load() == set()
+    store.add_many(["b", "a"])
+    store.add_many(["a"])
+    assert store.load() == {"a", "b"}
+    assert (tmp_path / "fingerprints.txt").read_text() == "a\nb\n"
+
+
+def test_file_fingerprint_store_cached_does_no_io(tmp_path: Path) -> None:
+    path = tmp_path / "fingerprints.txt"
+    store = FileFingerprintStore(path)
+    assert store.cached() == frozenset()
+    store.add_many(["a"])
+    assert store.cached() == {"a"}
+    path.write_text("a\nb\n")
+    assert store.cached() == {"a"}
+    store.load()
+    assert store.cached() == {"a", "b"}
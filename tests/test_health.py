@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from discord_crypto_spam_destroyer.telemetry.health import LoopMonitor
+from discord_crypto_spam_destroyer.telemetry.metrics import JSON_CONTENT_TYPE, MetricsServer
+
+
+def _block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def test_loop_monitor_records_lag_and_logs_blocking_stack(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    caplog.set_level(logging.WARNING, logger="discord_crypto_spam_destroyer")
+    monitor = LoopMonitor(stall_threshold_s=0.1, interval_s=0.02)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        _block_loop(0.3)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+    assert monitor.max_lag_s >= 0.2
+    assert monitor.stalls == 1
+    (record,) = [r for r in caplog.records if "Event loop blocked" in r.getMessage()]
+    assert "_block_loop" in record.getMessage()
+
+
+async def test_loop_monitor_quiet_when_loop_is_free(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.WARNING, logger="discord_crypto_spam_destroyer")
+    monitor = LoopMonitor(stall_threshold_s=0.5, interval_s=0.02)
+    monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+    assert monitor.stalls == 0
+    assert monitor.stalled_for_s < 0.5
+    assert not caplog.records
+
+
+async def test_server_serves_json_routes_with_status() -> None:
+    server = MetricsServer("127.0.0.1", 0)
+
+    async def _readyz() -> tuple[int, str]:
+        return 503, '{"status": "not_ready"}'
+
+    server.routes["/readyz"] = _readyz
+    server.content_types["/readyz"] = JSON_CONTENT_TYPE
+    await server.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.bound_port)
+        writer.write(b"GET /readyz HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await writer.drain()
+        response = (await reader.read()).decode()
+        writer.close()
+    finally:
+        await server.stop()
+    assert response.startswith("HTTP/1.0 503 Service Unavailable")
+    assert f"Content-Type: {JSON_CONTENT_TYPE}" in response
+    assert response.endswith('{"status": "not_ready"}')
@@ -0,0 +1,118 @@
+from io import BytesIO
+
+from PIL import Image
+
+from discord_crypto_spam_destroyer.hashes.phash import compute_phash
+from discord_crypto_spam_destroyer.utils.image import (
+    DownloadedImage,
+    ImageEncoderOptions,
+    decode_batch,
+    encode_batch,
+    prepare_batch,
+    prepare_image,
+)
+
+
+def _image(width: int, height: int, fmt: str = "PNG") -> DownloadedImage:
+    buffer = BytesIO()
+    Image.linear_gradient("L").resize((width, height)).convert("RGB").save(buffer, format=fmt)
+    return DownloadedImage(
+        data=buffer.getvalue(),
+        content_type=f"image/{fmt.lower()}",
+        filename=f"test.{fmt.lower()}",
+        url="https://example.invalid/test",
+    )
+
+
+def test_prepare_image_hashes_and_resizes_in_one_pass() -> None:
+    image = _image(1200, 800)
+    prepared = prepare_image(image, 512)
+    assert prepared.phash == compute_phash(image.data)
+    assert (prepared.width, prepared.height) == (1200, 800)
+    assert prepared.payload is not None
+    assert max(prepared.payload.width or 0, prepared.payload.height or 0) == 512
+    assert prepared.payload.data_url.startswith("data:image/jpeg;base64,")
+
+
+def test_prepare_image_keeps_small_images_untouched() -> None:
+    image = _image(300, 200)
+    prepared = prepare_image(image, 512)
+    assert prepared.payload is not None
+    assert prepared.payload.byte_size == len(image.data)
+    assert prepared.payload.quality is None
+
+
+def test_prepare_image_hash_only() -> None:
+    image = _image(640, 480, "JPEG")
+    prepared = prepare_image(image, 512, encode=False)
+    assert prepared.phash == compute_phash(image.data)
+    assert prepared.payload is None
+    assert prepared.image is None
+
+
+def test_prepare_image_invalid_bytes() -> None:
+    image = DownloadedImage(data=b"not an image", content_type="image/png", filename="x.png", url="")
+    prepared = prepare_image(image, 512)
+    assert prepared.phash is None
+    assert prepared.payload is not None
+    assert prepared.payload.byte_size == len(image.data)
+
+
+def test_prepare_image_webp_encoder() -> None:
+    image = _image(1600, 900)
+    options = ImageEncoderOptions(format="webp", quality=70, resample="bilinear", reducing_gap=0)
+    prepared = prepare_image(image, 400, options=options)
+    assert prepared.payload is not None
+    assert prepared.payload.content_type == "image/webp"
+    assert prepared.payload.data_url.startswith("data:image/webp;base64,")
+    assert (prepared.payload.width, prepared.payload.height) == (400, 225)
+    assert prepared.payload.quality == 70
+
+
+def test_prepare_image_tiles_tall_screenshots() -> None:
+    image = _image(600, 2400)
+    options = ImageEncoderOptions(tile_aspect_ratio=2.0, max_tiles=6)
+    prepared = prepare_image(image, 512, options=options)
+    assert prepared.payload is None
+    assert len(prepared.tiles) > 1
+    assert all(max(tile.width or 0, tile.height or 0) <= 512 for tile in prepared.tiles)
+    assert prepare_image(image, 512).tiles == []
+
+
+def test_prepare_batch_composite_montage() -> None:
+    images = [_image(900, 1200), _image(1200, 900), _image(400, 400)]
+    batch = prepare_batch(images, 512, composite=True)
+    assert batch.montage is not None
+    assert (batch.montage.width, batch.montage.height) == (512, 512)
+    assert batch.classification_requests() == [[batch.montage]]
+    assert batch.phashes == [compute_phash(image.data) for image in images]
+
+    single = prepare_batch(images[:1], 512, composite=True)
+    assert single.montage is None
+    assert len(single.classification_requests()) == 1
+
+
+def test_prepare_batch_montage_sends_undecodable_images_separately() -> None:
+    broken = DownloadedImage(data=b"not an image", content_type="image/png", filename="x.png", url="")
+    batch = prepare_batch([_image(900, 1200), _image(400, 400), broken], 512, composite=True)
+    assert batch.montage is not None
+    requests = batch.classification_requests()
+    assert len(requests) == 2
+    assert requests[1][0].byte_size == len(broken.data)
+
+    only_broken = prepare_batch([broken, broken], 512, composite=True)
+    assert only_broken.montage is None
+    assert len(only_broken.classification_requests()) == 2
+
+
+def test_decode_batch_hashes_without_encoding() -> None:
+    images = [_image(1200, 800), _image(400, 400)]
+    decoded = decode_batch(images, keep_images=True)
+    assert decoded.phashes == [compute_phash(image.data) for image in images]
+    assert all(image.payload is None and image.image is not None for image in decoded.images)
+
+    encoded = encode_batch(decoded, 512)
+    assert encoded.phashes == decoded.phashes
+    assert [request[0].byte_size for request in encoded.classification_requests()] == [
+        request[0].byte_size for request in prepare_batch(images, 512).classification_requests()
+    ]
@@ -0,0 +1,7 @@
+from discord_crypto_spam_destroyer.launcher import shard_ranges
+
+
+def test_shard_ranges_are_contiguous_and_balanced() -> None:
+    assert shard_ranges(10, 3) == [range(0, 4), range(4, 7), range(7, 10)]
+    assert shard_ranges(2, 5) == [range(0, 1), range(1, 2)]
+    assert shard_ranges(4, 1) == [range(0, 4)]
@@ -0,0 +1,53 @@
+import asyncio
+
+from discord_crypto_spam_destroyer.telemetry.metrics import MetricsRegistry, MetricsServer
+
+
+def test_render_counters_and_histograms() -> None:
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total", "Hits.", ("guild",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("guild",), buckets=(0.1, 1.0))
+    hits.inc(guild=1)
+    hits.inc(2, guild=1)
+    latency.observe(0.05, guild=1)
+    latency.observe(0.5, guild=1)
+    latency.observe(5.0, guild=1)
+    text = registry.render()
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{guild="1"} 3' in text
+    assert 'latency_seconds_bucket{guild="1",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{guild="1",le="1"} 2' in text
+    assert 'latency_seconds_bucket{guild="1",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{guild="1"} 3' in text
+    assert 'latency_seconds_sum{guild="1"} 5.55' in text
+
+
+def test_collectors_run_before_render() -> None:
+    registry = MetricsRegistry()
+    depth = registry.gauge("depth", "Depth.")
+    registry.add_collector(lambda: depth.set(7))
+    assert "depth 7" in registry.render()
+
+
+async def _get(port: int, path: str) -> str:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response.decode()
+
+
+async def test_server_serves_metrics() -> None:
+    registry = MetricsRegistry()
+    registry.counter("up_total", "Up.").inc()
+    server = MetricsServer("127.0.0.1", 0, registry)
+    await server.start()
+    port = server.bound_port
+    try:
+        response = await _get(port, "/metrics")
+        assert response.startswith("HTTP/1.0 200")
+        assert "up_total 1" in response
+        assert (await _get(port, "/missing")).startswith("HTTP/1.0 404")
+    finally:
+        await server.stop()
@@ -0,0 +1,89 @@
+import asyncio
+
+from discord_crypto_spam_destroyer.pipeline.queue import FairWorkQueue
+
+
+def _recorder(order: list, label: str):
+    async def job(degraded: bool) -> None:
+        order.append((label, degraded))
+
+    return job
+
+
+async def test_guilds_are_served_round_robin() -> None:
+    queue = FairWorkQueue(workers=1, max_depth=100)
+    order: list = []
+    for index in range(3):
+        queue.submit(1, _recorder(order, f"a{index}"))
+    queue.submit(2, _recorder(order, "b0"))
+    queue.submit(3, _recorder(order, "c0"))
+    queue.start()
+    while queue.depth or len(order) < 5:
+        await asyncio.sleep(0)
+    await queue.stop()
+    assert [label for label, _ in order] == ["a0", "b0", "c0", "a1", "a2"]
+    assert queue.stats.processed == 5
+
+
+async def test_sheds_past_total_and_per_guild_depth() -> None:
+    queue = FairWorkQueue(workers=1, max_depth=3, max_per_guild=2)
+    order: list = []
+    assert queue.submit(1, _recorder(order, "a0"))
+    assert queue.submit(1, _recorder(order, "a1"))
+    assert not queue.submit(1, _recorder(order, "a2"))
+    assert queue.submit(2, _recorder(order, "b0"))
+    assert not queue.submit(3, _recorder(order, "c0"))
+    assert queue.stats.dropped == 2
+    assert queue.depth == 3
+
+
+async def test_deep_backlog_runs_degraded() -> None:
+    queue = FairWorkQueue(workers=1, max_depth=10, hash_only_depth=3)
+    order: list = []
+    for index in range(4):
+        queue.submit(1, _recorder(order, str(index)))
+    queue.start()
+    while len(order) < 4:
+        await asyncio.sleep(0)
+    await queue.stop()
+    assert order == [("0", True), ("1", True), ("2", False), ("3", False)]
+    assert queue.stats.degraded == 2
+
+
+async def test_failing_job_does_not_stop_worker() -> None:
+    queue = FairWorkQueue(workers=1, max_depth=10)
+    order: list = []
+
+    async def boom(degraded: bool) -> None:
+        raise RuntimeError("boom")
+
+    queue.submit(1, boom)
+    queue.submit(1, _recorder(order, "after"))
+    queue.start()
+    while not order:
+        await asyncio.sleep(0)
+    await queue.stop()
+    assert queue.stats.failed == 1
+    assert order == [("after", False)]
+
+
+async def test_priority_jobs_jump_the_guild_backlog() -> None:
+    queue = FairWorkQueue(workers=1, max_depth=10, max_per_guild=2)
+    order: list = []
+    queue.submit(1, _recorder(order, "a0"))
+    queue.submit(1, _recorder(order, "a1"))
+    assert queue.submit(1, _recorder(order, "urgent"), priority=True)
+    queue.start()
+    while len(order) < 3:
+        await asyncio.sleep(0)
+    await queue.stop()
+    assert [label for label, _ in order] == ["urgent", "a0", "a1"]
+
+
+async def test_oldest_wait_tracks_queued_jobs() -> None:
+    queue = FairWorkQueue(workers=1, max_depth=10)
+    assert queue.oldest_wait_s() == 0.0
+    queue.submit(1, _recorder([], "a0"))
+    await asyncio.sleep(0.02)
+    queue.submit(2, _recorder([], "b0"), priority=True)
+    assert queue.oldest_wait_s() >= 0.02
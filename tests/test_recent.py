@@ -0,0 +1,39 @@
+from discord_crypto_spam_destroyer.moderation.cleanup import group_by_channel
+from discord_crypto_spam_destroyer.pipeline.recent import RecentMessageIndex
+
+
+def test_recent_filters_author_age_and_deletions() -> None:
+    index = RecentMessageIndex(retention_s=60)
+    index.add(1, 7, 100, 10)
+    index.add(1, 7, 101, 11)
+    index.add(1, 7, 102, 11)
+    index.add(1, 8, 103, 10)
+    index.add(2, 7, 104, 10)
+    index.discard(101)
+    entries = index.recent(1, 7, within_s=30, exclude={100})
+    assert [entry.message_id for entry in entries] == [102]
+
+
+def test_recent_respects_window() -> None:
+    index = RecentMessageIndex(retention_s=60)
+    index.add(1, 7, 100, 10)
+    entries = index._authors[(1, 7)]
+    old = entries.popleft()
+    entries.appendleft(type(old)(old.message_id, old.channel_id, old.seen_at - 45))
+    index.add(1, 7, 101, 10)
+    assert [entry.message_id for entry in index.recent(1, 7, within_s=30)] == [101]
+    assert len(index.recent(1, 7, within_s=120)) == 2
+
+
+def test_per_author_cap() -> None:
+    index = RecentMessageIndex(max_per_author=3)
+    for message_id in range(5):
+        index.add(1, 7, message_id, 10)
+    assert [entry.message_id for entry in index.recent(1, 7, within_s=60)] == [2, 3, 4]
+
+
+def test_group_by_channel() -> None:
+    index = RecentMessageIndex()
+    for message_id, channel_id in [(1, 10), (2, 11), (3, 10)]:
+        index.add(1, 7, message_id, channel_id)
+    assert group_by_channel(index.recent(1, 7, within_s=60)) == {10: [1, 3], 11: [2]}
@@ -0,0 +1,37 @@
+from io import BytesIO
+
+from PIL import Image
+
+from discord_crypto_spam_destroyer.discord_ui.report_media import build_report_files
+from discord_crypto_spam_destroyer.utils.image import DownloadedImage
+
+
+def _image(size: tuple[int, int], name: str = "shot.png") -> DownloadedImage:
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format="PNG")
+    return DownloadedImage(data=buffer.getvalue(), content_type="image/png", filename=name, url=name)
+
+
+def _decoded(file) -> Image.Image:
+    file.fp.seek(0)
+    return Image.open(BytesIO(file.fp.read()))
+
+
+def test_original_mode_uploads_originals() -> None:
+    files = build_report_files([_image((64, 64))], "original", 32)
+    assert [file.filename for file in files] == ["shot.png"]
+
+
+def test_thumbnails_are_downscaled() -> None:
+    files = build_report_files([_image((1200, 2400)), _image((100, 50))], "thumbnails", 256)
+    assert [file.filename for file in files] == ["thumb_1.jpg", "thumb_2.jpg"]
+    assert _decoded(files[0]).size == (128, 256)
+    assert _decoded(files[1]).size == (100, 50)
+
+
+def test_contact_sheet_is_one_file_and_keeps_undecodable_originals() -> None:
+    broken = DownloadedImage(data=b"nope", content_type="image/png", filename="bad.png", url="bad")
+    files = build_report_files([_image((800, 800)), _image((800, 400)), broken], "contact_sheet", 256)
+    assert [file.filename for file in files] == ["contact_sheet.jpg", "bad.png"]
+    assert _decoded(files[0]).size == (512, 512)
+
@@ -0,0 +1,118 @@
+import json
+import sqlite3
+import time
+
+from discord_crypto_spam_destroyer.discord_ui.report_store import ReportRecord, ReportStore
+
+
+def _record(
+    message_id: int,
+    created_at: float | None = None,
+    guild_id: int = 1,
+    report_key: int | None = None,
+) -> ReportRecord:
+    return ReportRecord(
+        message_id=message_id,
+        channel_id=10,
+        guild_id=guild_id,
+        author_id=20,
+        mod_role_id=None,
+        allow_hash_add=True,
+        kick_disabled=False,
+        all_hashes=["abcd"],
+        created_at=created_at if created_at is not None else time.time(),
+        report_key=report_key,
+    )
+
+
+def test_save_get_and_delete(tmp_path) -> None:
+    store = ReportStore(tmp_path / "reports.sqlite3")
+    store.save_report(_record(1))
+    store.save_report(_record(2))
+    store.save_report(_record(1, guild_id=5))
+    assert store.get_report(1).guild_id == 5
+    assert store.get_report(1).all_hashes == ["abcd"]
+    store.delete_reports([1, 3])
+    assert store.get_report(1) is None
+    assert [record.message_id for record in store.load_reports()] == [2]
+    store.close()
+
+
+def test_prune_removes_expired_rows(tmp_path) -> None:
+    store = ReportStore(tmp_path / "reports.sqlite3")
+    store.save_report(_record(1, created_at=time.time() - 7200))
+    store.save_report(_record(2))
+    assert store.prune(3600) == 1
+    assert [record.message_id for record in store.load_reports()] == [2]
+    store.close()
+
+
+def test_migrates_legacy_json_once(tmp_path) -> None:
+    legacy = tmp_path / "report_store.json"
+    legacy.write_text(
+        json.dumps(
+            {
+                "reports": [
+                    {
+                        "message_id": 7,
+                        "channel_id": 10,
+                        "guild_id": 1,
+                        "author_id": 20,
+                        "mod_role_id": 3,
+                        "allow_hash_add": False,
+                        "kick_disabled": True,
+                        "all_hashes": ["ff"],
+                        "created_at": 100.0,
+                    }
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    store = ReportStore(tmp_path / "reports.sqlite3", legacy_path=legacy)
+    record = store.get_report(7)
+    assert record is not None
+    assert record.mod_role_id == 3
+    assert record.allow_hash_add is False
+    assert not legacy.exists()
+    assert (tmp_path / "report_store.json.migrated").exists()
+    store.close()
+
+
+def test_lookup_by_report_key_and_legacy_filter(tmp_path) -> None:
+    store = ReportStore(tmp_path / "reports.sqlite3")
+    store.save_report(_record(1))
+    store.save_report(_record(2, report_key=500))
+    assert store.get_report_by_key(500).message_id == 2
+    assert store.get_report_by_key(501) is None
+    assert [record.message_id for record in store.load_legacy_reports()] == [1]
+    store.close()
+
+
+def test_adds_report_key_to_existing_database(tmp_path) -> None:
+    path = tmp_path / "reports.sqlite3"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE reports (
+            message_id INTEGER PRIMARY KEY,
+            channel_id INTEGER NOT NULL,
+            guild_id INTEGER NOT NULL,
+            author_id INTEGER NOT NULL,
+            mod_role_id INTEGER,
+            allow_hash_add INTEGER NOT NULL,
+            kick_disabled INTEGER NOT NULL,
+            all_hashes TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        INSERT INTO reports VALUES (1, 10, 1, 20, NULL, 1, 0, '[]', 100.0);
+        """
+    )
+    conn.close()
+    store = ReportStore(path)
+    assert store.get_report(1).report_key is None
+    store.save_report(_record(2, report_key=9))
+    store.close()
+    store = ReportStore(path)
+    assert store.get_report_by_key(9).message_id == 2
+    store.close()
@@ -0,0 +1,197 @@
+import asyncio
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from discord_crypto_spam_destroyer.moderation import actions
+from discord_crypto_spam_destroyer.moderation.actions import with_retries
+from discord_crypto_spam_destroyer.moderation.scheduler import ActionScheduler
+
+
+def _http_error(status: int, retry_after: str | None = None) -> discord.HTTPException:
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    return discord.HTTPException(SimpleNamespace(status=status, reason="", headers=headers), "")
+
+
+async def test_runs_higher_priority_first() -> None:
+    scheduler = ActionScheduler(concurrency=1)
+    order: list[str] = []
+
+    def call(label: str):
+        async def run() -> bool:
+            order.append(label)
+            return True
+
+        return run
+
+    pending = [
+        asyncio.create_task(scheduler.run("report", 1, call("report"))),
+        asyncio.create_task(scheduler.run("moderate", 2, call("kick"))),
+        asyncio.create_task(scheduler.run("delete", 3, call("delete"))),
+    ]
+    await asyncio.sleep(0)
+    scheduler.start()
+    await asyncio.gather(*pending)
+    await scheduler.stop()
+    assert order == ["delete", "kick", "report"]
+    assert scheduler.outcomes[("delete", "ok")] == 1
+
+
+async def test_serializes_per_bucket() -> None:
+    scheduler = ActionScheduler(concurrency=4)
+    scheduler.start()
+    active = 0
+    peak = 0
+
+    async def call() -> bool:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return False
+
+    await asyncio.gather(*(scheduler.run("delete", 1, call) for _ in range(3)))
+    await scheduler.stop()
+    assert peak == 1
+    assert scheduler.outcomes[("delete", "failed")] == 3
+
+
+async def test_errors_reach_the_caller() -> None:
+    scheduler = ActionScheduler()
+    scheduler.start()
+
+    async def call() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await scheduler.run("report", 1, call)
+    await scheduler.stop()
+    assert scheduler.outcomes[("report", "error")] == 1
+
+
+async def test_with_retries_backs_off_on_429(monkeypatch: pytest.MonkeyPatch) -> None:
+    delays: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+
+    monkeypatch.setattr(actions.asyncio, "sleep", fake_sleep)
+    attempts = 0
+
+    async def call() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise _http_error(429, retry_after="2.5")
+        if attempts == 2:
+            raise _http_error(503)
+        return "ok"
+
+    assert await with_retries(call) == "ok"
+    assert delays == [2.5, 2.0]
+
+
+async def test_with_retries_does_not_retry_client_errors() -> None:
+    attempts = 0
+
+    async def call() -> None:
+        nonlocal attempts
+        attempts += 1
+        raise _http_error(403)
+
+    with pytest.raises(discord.HTTPException):
+        await with_retries(call)
+    assert attempts == 1
+
+
+async def test_backoff_frees_the_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(actions, "RETRY_BASE_DELAY_S", 0.05)
+    scheduler = ActionScheduler(concurrency=1)
+    scheduler.start()
+    order: list[str] = []
+    attempts = 0
+
+    async def throttled() -> str:
+        nonlocal attempts
+        attempts += 1
+        order.append(f"throttled{attempts}")
+        if attempts == 1:
+            raise _http_error(429, retry_after="0.05")
+        return "ok"
+
+    async def other() -> bool:
+        order.append("other")
+        return True
+
+    first = asyncio.create_task(scheduler.run("delete", 1, lambda: with_retries(throttled)))
+    await asyncio.sleep(0.01)
+    assert await scheduler.run("delete", 2, other) is True
+    assert await first == "ok"
+    await scheduler.stop()
+    assert order == ["throttled1", "other", "throttled2"]
+    assert scheduler.outcomes[("delete", "retry")] == 1
+
+
+async def test_softban_retries_the_throttled_unban_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(actions, "RETRY_BASE_DELAY_S", 0.01)
+    scheduler = ActionScheduler(concurrency=1)
+    scheduler.start()
+    calls: list[str] = []
+
+    async def ban(*args: object, **kwargs: object) -> None:
+        calls.append("ban")
+
+    async def unban(*args: object, **kwargs: object) -> None:
+        calls.append("unban")
+        if calls.count("unban") == 1:
+            raise _http_error(429, retry_after="0.01")
+
+    guild = SimpleNamespace(get_member=lambda user_id: None, ban=ban, unban=unban)
+    result = await scheduler.run(
+        "moderate", 1, lambda: actions.apply_high_action(guild, 7, "softban", "spam")
+    )
+    await scheduler.stop()
+    assert result is True
+    assert calls == ["ban", "unban", "unban"]
+
+
+async def test_reports_are_capped() -> None:
+    scheduler = ActionScheduler(concurrency=3, report_concurrency=1)
+    scheduler.start()
+    active = 0
+    peak = 0
+
+    async def upload() -> bool:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return True
+
+    await asyncio.gather(*(scheduler.run("report", channel, upload) for channel in range(3)))
+    await scheduler.stop()
+    assert peak == 1
+
+
+async def test_cancelled_caller_drops_queued_job() -> None:
+    scheduler = ActionScheduler(concurrency=1)
+    ran: list[str] = []
+
+    async def call() -> bool:
+        ran.append("call")
+        return True
+
+    waiter = asyncio.create_task(scheduler.run("delete", 1, call))
+    await asyncio.sleep(0)
+    assert scheduler.pending == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.pending == 0
+    scheduler.start()
+    await asyncio.sleep(0.01)
+    await scheduler.stop()
+    assert ran == []
@@ -0,0 +1,32 @@
+from discord_crypto_spam_destroyer.vision.tiling import plan_grid, plan_tiles, should_tile
+
+
+def test_should_tile_only_elongated_images() -> None:
+    assert should_tile(1170, 4000, 512, 2.0) is True
+    assert should_tile(1200, 900, 512, 2.0) is False
+    assert should_tile(200, 500, 512, 2.0) is False
+    assert should_tile(1170, 4000, 512, 0.0) is False
+
+
+def test_plan_tiles_tall_screenshot() -> None:
+    boxes = plan_tiles(1170, 4000, 512, max_tiles=6)
+    assert len(boxes) == 4
+    assert boxes[0] == (0, 0, 1170, 1170)
+    assert boxes[-1][3] == 4000
+    for previous, current in zip(boxes, boxes[1:]):
+        assert current[1] < previous[3]
+
+
+def test_plan_tiles_wide_image_respects_max_tiles() -> None:
+    boxes = plan_tiles(6000, 600, 512, max_tiles=3)
+    assert len(boxes) == 3
+    assert boxes[0][0] == 0
+    assert boxes[-1][2] == 6000
+    assert all(box[1] == 0 and box[3] == 600 for box in boxes)
+
+
+def test_plan_grid_layouts() -> None:
+    assert plan_grid(0, 512) == []
+    assert plan_grid(1, 512) == [(0, 0, 512, 512)]
+    assert plan_grid(3, 512) == [(0, 0, 256, 256), (256, 0, 512, 256), (0, 256, 256, 512)]
+    assert len(plan_grid(4, 512)) == 4
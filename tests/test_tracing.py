@@ -0,0 +1,72 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from discord_crypto_spam_destroyer.telemetry.tracing import Tracer, span
+
+
+def _traces(caplog: pytest.LogCaptureFixture) -> list[dict]:
+    return [
+        json.loads(record.getMessage())
+        for record in caplog.records
+        if record.name == "discord_crypto_spam_destroyer.trace"
+    ]
+
+
+async def test_spans_nest_across_threads_and_tasks(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO, logger="discord_crypto_spam_destroyer.trace")
+
+    def _work() -> None:
+        with span("prepare", images=2) as prepare:
+            prepare.set(hashes=2)
+
+    async def _child() -> None:
+        with span("action", kind="delete"):
+            await asyncio.sleep(0)
+
+    with Tracer(sample_rate=1.0).trace("message", message_id=1):
+        await asyncio.to_thread(_work)
+        await asyncio.create_task(_child())
+
+    (trace,) = _traces(caplog)
+    assert trace["name"] == "message"
+    assert trace["attrs"] == {"message_id": 1}
+    assert [child["name"] for child in trace["children"]] == ["prepare", "action"]
+    assert trace["children"][0]["attrs"] == {"images": 2, "hashes": 2}
+    assert trace["slow"] is False
+
+
+def test_unsampled_traces_emit_only_when_slow(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO, logger="discord_crypto_spam_destroyer.trace")
+    with Tracer(sample_rate=0.0, slow_threshold_s=60.0).trace("message"):
+        pass
+    assert _traces(caplog) == []
+    with Tracer(sample_rate=0.0, slow_threshold_s=1e-9).trace("message"):
+        pass
+    (trace,) = _traces(caplog)
+    assert trace["slow"] is True
+
+
+def test_spans_are_noops_without_a_trace(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO, logger="discord_crypto_spam_destroyer.trace")
+    with span("download") as orphan:
+        orphan.set(bytes=10)
+    with Tracer().trace("message") as root:
+        with span("download"):
+            pass
+    assert root.children == []
+    assert _traces(caplog) == []
+
+
+def test_errors_mark_spans(caplog: pytest.LogCaptureFixture) -> None:
+    caplog.set_level(logging.INFO, logger="discord_crypto_spam_destroyer.trace")
+    with pytest.raises(RuntimeError):
+        with Tracer(sample_rate=1.0).trace("message"):
+            with span("vision"):
+                raise RuntimeError("boom")
+    (trace,) = _traces(caplog)
+    assert trace["status"] == "error"
+    assert trace["children"][0]["status"] == "error"
+    assert trace["children"][0]["attrs"] == {"error": "RuntimeError"}
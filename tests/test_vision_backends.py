@@ -0,0 +1,45 @@
+import pytest
+
+from discord_crypto_spam_destroyer.config import load_settings, resolve_settings
+from discord_crypto_spam_destroyer.vision.backends import (
+    FakeVisionBackend,
+    OpenAICompatibleVisionBackend,
+    build_vision_backend,
+)
+
+
+@pytest.fixture
+def base_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DISCORD_TOKEN", "token")
+    monkeypatch.setenv("MOD_CHANNEL", "mods")
+    monkeypatch.setenv("MOD_ROLE_ID", "1")
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENAI_BASE_URL", raising=False)
+    monkeypatch.delenv("VISION_BACKEND", raising=False)
+
+
+def test_fake_backend_is_deterministic() -> None:
+    backend = FakeVisionBackend()
+    first = backend.classify(["data:image/png;base64,AAAA"], "low")
+    second = backend.classify(["data:image/png;base64,AAAA"], "low")
+    assert first == second
+    assert backend.calls == 2
+
+
+def test_openai_backend_requires_api_key(base_env: None) -> None:
+    settings = resolve_settings(load_settings(), 1)
+    assert build_vision_backend(settings) is None
+
+
+def test_compatible_backend_uses_base_url(base_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("VISION_BACKEND", "openai_compatible")
+    assert build_vision_backend(resolve_settings(load_settings(), 1)) is None
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:8000/v1")
+    backend = build_vision_backend(resolve_settings(load_settings(), 1))
+    assert isinstance(backend, OpenAICompatibleVisionBackend)
+    assert backend.base_url == "http://127.0.0.1:8000/v1"
+
+
+def test_fake_backend_selected(base_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("VISION_BACKEND", "fake")
+    assert isinstance(build_vision_backend(resolve_settings(load_settings(), 1)), FakeVisionBackend)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+from discord_crypto_spam_destroyer.discord_ui.mod_report import build_wave_text
+from discord_crypto_spam_destroyer.pipeline.waves import WaveAggregator, attachment_signature
+
+
+def _attachment(size: int, width: int = 100, height: int = 100) -> SimpleNamespace:
+    return SimpleNamespace(size=size, width=width, height=height, content_type="image/png")
+
+
+def _message(message_id: int, author_id: int = 7, channel_id: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id,
+        guild=SimpleNamespace(id=1),
+        author=SimpleNamespace(id=author_id),
+        channel=SimpleNamespace(id=channel_id),
+        jump_url=f"https://discord.test/{channel_id}/{message_id}",
+    )
+
+
+def test_signature_ignores_attachment_order() -> None:
+    assert attachment_signature([_attachment(1), _attachment(2)]) == attachment_signature(
+        [_attachment(2), _attachment(1)]
+    )
+    assert attachment_signature([_attachment(1)]) != attachment_signature([_attachment(2)])
+
+
+def test_repeats_join_the_leaders_wave() -> None:
+    waves = WaveAggregator()
+    signature = attachment_signature([_attachment(10)])
+    wave, is_leader = waves.join(_message(1), signature, 5.0)
+    assert is_leader
+    follower_wave, is_leader = waves.join(_message(2, channel_id=2), signature, 5.0)
+    assert follower_wave is wave and not is_leader
+    _, is_leader = waves.join(_message(3, author_id=8), signature, 5.0)
+    assert is_leader
+    _, is_leader = waves.join(_message(4), attachment_signature([_attachment(11)]), 5.0)
+    assert is_leader
+    assert [message.id for message in wave.messages] == [1, 2]
+
+
+def test_clean_verdict_releases_followers_and_closes_wave() -> None:
+    waves = WaveAggregator()
+    signature = attachment_signature([_attachment(10)])
+    wave, _ = waves.join(_message(1), signature, 5.0)
+    waves.join(_message(2), signature, 5.0)
+    released = waves.resolve(wave, flagged=False)
+    assert [message.id for message in released] == [2]
+    _, is_leader = waves.join(_message(3), signature, 5.0)
+    assert is_leader
+
+
+def test_flagged_wave_keeps_collecting() -> None:
+    waves = WaveAggregator()
+    signature = attachment_signature([_attachment(10)])
+    wave, _ = waves.join(_message(1), signature, 5.0)
+    waves.resolve(wave, flagged=True)
+    later_wave, is_leader = waves.join(_message(2), signature, 5.0)
+    assert later_wave is wave and not is_leader
+    assert later_wave.flagged
+
+
+def test_expired_wave_starts_over() -> None:
+    waves = WaveAggregator()
+    signature = attachment_signature([_attachment(10)])
+    wave, _ = waves.join(_message(1), signature, 5.0)
+    wave.last_seen -= 10
+    new_wave, is_leader = waves.join(_message(2), signature, 5.0)
+    assert is_leader and new_wave is not wave
+    assert len(waves) == 1
+
+
+def test_wave_text_truncates() -> None:
+    messages = [_message(index, channel_id=index % 3) for index in range(50)]
+    text = build_wave_text(messages, {0, 1})
+    assert text.startswith("50 messages in 3 channels, 2 deleted")
+    assert "more" in text
+    assert len(text) <= 1024
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+try:
+    from discord_crypto_spam_destroyer.moderation.decision import (
+        decision_from_result,
+        merge_vision_results,
+    )
+    from discord_crypto_spam_destroyer.utils.image import DownloadedImage, prepare_batch
+    from discord_crypto_spam_destroyer.vision.backends import (
+        FakeVisionBackend,
+        OpenAICompatibleVisionBackend,
+        OpenAIVisionBackend,
+        VisionBackend,
+    )
+except ModuleNotFoundError:
+    sys.path.append(str(Path("src").resolve()))
+    from discord_crypto_spam_destroyer.moderation.decision import (
+        decision_from_result,
+        merge_vision_results,
+    )
+    from discord_crypto_spam_destroyer.utils.image import DownloadedImage, prepare_batch
+    from discord_crypto_spam_destroyer.vision.backends import (
+        FakeVisionBackend,
+        OpenAICompatibleVisionBackend,
+        OpenAIVisionBackend,
+        VisionBackend,
+    )
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+}
+
+
+def build_backend(model: str) -> VisionBackend:
+    backend = os.getenv("VISION_BACKEND", "openai")
+    if backend == "fake":
+        return FakeVisionBackend()
+    base_url = os.getenv("OPENAI_BASE_URL")
+    if backend == "openai_compatible":
+        if not base_url:
+            raise SystemExit("OPENAI_BASE_URL not set")
+        return OpenAICompatibleVisionBackend(base_url, model, api_key=os.getenv("OPENAI_API_KEY"))
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise SystemExit("OPENAI_API_KEY not set (or use VISION_BACKEND=fake)")
+    return OpenAIVisionBackend(api_key, model, base_url=base_url)
+
+
+def load_posts(image_dir: Path, post_size: int) -> list[list[DownloadedImage]]:
+    images = [
+        DownloadedImage(
+            data=path.read_bytes(),
+            content_type=CONTENT_TYPES[path.suffix.lower()],
+            filename=path.name,
+            url=str(path),
+        )
+        for path in sorted(image_dir.iterdir())
+        if path.is_file() and path.suffix.lower() in CONTENT_TYPES
+    ]
+    return [images[index : index + post_size] for index in range(0, len(images), post_size)]
+
+
+def run_mode(
+    backend: VisionBackend,
+    posts: list[list[DownloadedImage]],
+    composite: bool,
+    max_dim: int,
+    detail: str,
+    high: float,
+    medium: float,
+) -> tuple[int, int, int, float]:
+    flagged = 0
+    calls = 0
+    payload_bytes = 0
+    start = time.monotonic()
+    for post in posts:
+        batch = prepare_batch(post, max_dim, composite=composite)
+        results = []
+        for payloads in batch.classification_requests():
+            calls += 1
+            payload_bytes += sum(payload.byte_size for payload in payloads)
+            result = backend.classify(
+                [payload.data_url for payload in payloads],
+                detail,
+                [payload.meta() for payload in payloads],
+            )
+            results.append(result)
+            if result.is_crypto_scam and result.confidence >= high:
+                break
+        merged = merge_vision_results(results)
+        if merged and decision_from_result(merged, high, medium).is_scam:
+            flagged += 1
+    return flagged, calls, payload_bytes, time.monotonic() - start
+
+
+def main() -> None:
+    model = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    detail = os.getenv("OPENAI_IMAGE_DETAIL", "low")
+    max_dim = int(os.getenv("OPENAI_MAX_IMAGE_DIM", "512"))
+    post_size = int(os.getenv("POST_SIZE", "4"))
+    high = float(os.getenv("CONFIDENCE_HIGH", "0.85"))
+    medium = float(os.getenv("CONFIDENCE_MEDIUM", "0.65"))
+    backend = build_backend(model)
+
+    corpora = [("scam", Path(os.getenv("IMAGE_DIR", "data/known_bad_scam_images")))]
+    clean_dir = os.getenv("CLEAN_IMAGE_DIR")
+    if clean_dir:
+        corpora.append(("clean", Path(clean_dir)))
+
+    print(f"backend={backend.name} model={model} detail={detail} max_dim={max_dim} post_size={post_size}")
+    print(f"{'corpus':<6} {'mode':<10} {'flagged':>9} {'calls':>6} {'kB sent':>8} {'seconds':>8}")
+    for label, image_dir in corpora:
+        posts = load_posts(image_dir, post_size)
+        if not posts:
+            raise SystemExit(f"No images found in {image_dir}")
+        for composite in (False, True):
+            flagged, calls, payload_bytes, elapsed = run_mode(
+                backend, posts, composite, max_dim, detail, high, medium
+            )
+            mode = "composite" if composite else "per-image"
+            print(
+                f"{label:<6} {mode:<10} {flagged:>4}/{len(posts):<4} {calls:>6} "
+                f"{payload_bytes / 1000:>8.1f} {elapsed:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+try:
+    from discord_crypto_spam_destroyer.utils.image import (
+        ImageEncoderOptions,
+        encode_image,
+        resize_to_fit,
+    )
+except ModuleNotFoundError:
+    sys.path.append(str(Path("src").resolve()))
+    from discord_crypto_spam_destroyer.utils.image import (
+        ImageEncoderOptions,
+        encode_image,
+        resize_to_fit,
+    )
+
+SETTINGS = [
+    ImageEncoderOptions(format="jpeg", quality=82, resample="lanczos", reducing_gap=0),
+    ImageEncoderOptions(format="jpeg", quality=82, resample="lanczos", reducing_gap=2.0),
+    ImageEncoderOptions(format="jpeg", quality=82, resample="bicubic", reducing_gap=2.0),
+    ImageEncoderOptions(format="jpeg", quality=75, resample="bilinear", reducing_gap=2.0),
+    ImageEncoderOptions(format="webp", quality=82, resample="lanczos", reducing_gap=2.0),
+    ImageEncoderOptions(format="webp", quality=75, resample="bicubic", reducing_gap=2.0),
+]
+
+
+def legacy_encode(image: Image.Image, max_dim: int) -> int:
+    scale = max_dim / float(max(image.size))
+    resized = image.resize(
+        (int(image.width * scale), int(image.height * scale)),
+        resample=Image.Resampling.LANCZOS,
+    )
+    buffer = BytesIO()
+    resized.save(buffer, format="JPEG", quality=82, optimize=True)
+    return len(buffer.getvalue())
+
+
+def load_images(image_dir: Path) -> list[Image.Image]:
+    images: list[Image.Image] = []
+    for path in sorted(image_dir.iterdir()):
+        if not path.is_file():
+            continue
+        try:
+            with Image.open(path) as image:
+                images.append(image.convert("RGB"))
+        except OSError:
+            continue
+    return images
+
+
+def main() -> None:
+    image_dir = Path(os.getenv("IMAGE_DIR", "data/known_bad_scam_images"))
+    max_dim = int(os.getenv("MAX_DIM", "512"))
+    rounds = int(os.getenv("ROUNDS", "3"))
+    images = [image for image in load_images(image_dir) if max(image.size) > max_dim]
+    if not images:
+        raise SystemExit(f"No images larger than {max_dim}px found in {image_dir}")
+
+    count = len(images) * rounds
+    print(f"{len(images)} images from {image_dir}, max_dim={max_dim}, rounds={rounds}")
+    print(f"{'setting':<44} {'cpu ms/img':>10} {'avg bytes':>10}")
+
+    start = time.process_time()
+    total_bytes = sum(legacy_encode(image, max_dim) for _ in range(rounds) for image in images)
+    elapsed = time.process_time() - start
+    print(f"{'legacy jpeg q82 lanczos optimize':<44} {elapsed * 1000 / count:>10.1f} {total_bytes // count:>10}")
+
+    for options in SETTINGS:
+        start = time.process_time()
+        total_bytes = 0
+        for _ in range(rounds):
+            for image in images:
+                resized = resize_to_fit(image, image.width, image.height, max_dim, options)
+                total_bytes += encode_image(resized, options).byte_size
+        elapsed = time.process_time() - start
+        label = (
+            f"{options.format} q{options.quality} {options.resample} "
+            f"reducing_gap={options.reducing_gap:g}"
+        )
+        print(f"{label:<44} {elapsed * 1000 / count:>10.1f} {total_bytes // count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 import sys
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -10,22 +11,18 @@ import discord
 try:
     from discord_crypto_spam_destroyer.config import load_settings, resolve_settings
     from discord_crypto_spam_destroyer.discord_ui.mod_report import (
-        ReportContext,
-        ReportView,
         build_report_embed,
+        build_report_view,
     )
-    from discord_crypto_spam_destroyer.discord_ui.report_store import ReportStore
-    from discord_crypto_spam_destroyer.hashes.store import FileHashStore
+    from discord_crypto_spam_destroyer.discord_ui.report_store import ReportRecord, ReportStore
 except ModuleNotFoundError:
     sys.path.append(str(Path("src").resolve()))
     from discord_crypto_spam_destroyer.config import load_settings, resolve_settings
     from discord_crypto_spam_destroyer.discord_ui.mod_report import (
-        ReportContext,
-        ReportView,
         build_report_embed,
+        build_report_view,
     )
-    from discord_crypto_spam_destroyer.discord_ui.report_store import ReportStore
-    from discord_crypto_spam_destroyer.hashes.store import FileHashStore
+    from discord_crypto_spam_destroyer.discord_ui.report_store import ReportRecord, ReportStore
 
 @dataclass(frozen=True)
 class TargetInfo:
@@ -57,21 +54,6 @@ class TestReportBot(discord.Client):
         if last_message is None:
             last_message = await target.channel.send("Test report baseline message.")
 
-        context = ReportContext(
-            guild=target.guild,
-            channel=target.channel,
-            message=last_message,
-            author=target.author,
-            images=[],
-            hash_store=FileHashStore(Path("data") / "bad_hashes.txt"),
-            all_hashes=[],
-            mod_role_id=target.mod_role_id,
-            allow_hash_add=True,
-            kick_disabled=False,
-            report_store=ReportStore(Path("data") / "report_store.json"),
-            report_record=None,
-        )
-
         embed = build_report_embed(
             last_message,
             target.author,
@@ -83,8 +65,28 @@ class TestReportBot(discord.Client):
             author_roles="(test roles)",
         )
 
-        view = ReportView(context)
-        await target.channel.send(embed=embed, view=view)
+        view = build_report_view(last_message.id, kick_disabled=False, allow_hash_add=True)
+        sent = await target.channel.send(embed=embed, view=view)
+        # The running bot handles the button presses once the record is in its store.
+        report_store = ReportStore(
+            Path("data") / "report_store.sqlite3",
+            legacy_path=Path("data") / "report_store.json",
+        )
+        report_store.save_report(
+            ReportRecord(
+                message_id=sent.id,
+                channel_id=target.channel.id,
+                guild_id=target.guild.id,
+                author_id=target.author.id,
+                mod_role_id=target.mod_role_id,
+                allow_hash_add=True,
+                kick_disabled=False,
+                all_hashes=[],
+                created_at=time.time(),
+                report_key=last_message.id,
+            )
+        )
+        report_store.close()
         await self.close()
 
     def run_bot(self) -> None: